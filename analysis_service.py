@@ -0,0 +1,611 @@
+# analysis_service.py
+"""
+Long-running local analysis service: an HTTP job queue in front of warm
+worker processes.
+
+    python analysis_service.py --port 8765 --workers 4 --out-dir results/
+    python analysis_service.py --socket /tmp/editdna.sock --queue-size 32
+
+Each worker process imports the pipeline and loads OpenCV, the Haar
+cascade, the TransNet model and its OCR engines once at start-up, then
+runs jobs one at a time, so short clips do not pay import and model-load
+time per job. Only the standard library is needed on top of the pipeline.
+
+    POST /jobs              {"path": "/videos/clip.mp4", "options": {...}}
+                            202 + job, or 503 + Retry-After when the queue is
+                            full (?wait=SECONDS waits that long for a slot)
+    GET  /jobs/<id>         job status
+    GET  /jobs/<id>/result  the result file once the job is done
+    GET  /stats             queue depth and per-worker utilization
+    GET  /health            200 once at least one worker is warm
+
+`options` are analyze_video keyword arguments (see ALLOWED_OPTIONS) plus
+"format" ("json", "ndjson" or "msgpack") for the result file.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+ALLOWED_OPTIONS = (
+    "transcript_outline", "video_meta", "shot_engine", "shot_engine_kwargs",
+    "overlay_sample_fps", "classify_kwargs", "perf", "audio_hop_ms", "profile", "budget",
+)
+RESULT_EXTENSIONS = {"json": ".json", "ndjson": ".ndjson", "msgpack": ".msgpack"}
+CONTENT_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson",
+                 "msgpack": "application/octet-stream"}
+MAX_BODY_BYTES = 1 << 20
+DISPATCH_POLL_S = 0.2  # how often idle dispatchers check for shutdown
+
+JobRunner = Callable[[str, Dict[str, Any], str, str], Dict[str, Any]]
+
+
+# ---------- Worker process ---------- #
+
+_worker_cache = None  # per-worker StageCache
+
+
+def warm_up() -> Dict[str, str]:
+    """
+    Import the pipeline and load every model a job may need, so the first
+    job does not pay for it. Returns {component: "ok" | reason} per component;
+    missing optional components are reported, not fatal.
+    """
+    status: Dict[str, str] = {}
+    import numpy as np
+    import video_analysis_pipeline  # noqa: F401  (imports OpenCV and every stage)
+    from src.processing.face_detection import get_face_detector, release_face_detector
+    from src.processing.ocr_pool import get_ocr_pool
+    from src.shot_detection import get_transnet_model
+
+    def attempt(name: str, load: Callable[[], Any]) -> None:
+        try:
+            load()
+            status[name] = "ok"
+        except Exception as e:
+            status[name] = f"{type(e).__name__}: {e}"
+
+    # same options as classify_shots' defaults, so jobs find it in the pool
+    attempt("haar", lambda: release_face_detector(get_face_detector("haar")))
+    attempt("transnetv2", get_transnet_model)
+
+    def start_ocr() -> None:
+        pool = get_ocr_pool()
+        blank = np.zeros((32, 32), dtype=np.uint8)
+        # one tiny task per OCR process starts it and loads its engine
+        for fut in [pool.submit(blank) for _ in range(pool.workers)]:
+            fut.result()
+
+    attempt("ocr", start_ocr)
+    return status
+
+
+def run_analysis_job(path: str, options: Dict[str, Any], output: str, fmt: str) -> Dict[str, Any]:
+    """Default job runner: analyze_video + write_result in the worker."""
+    from src.utils.result_io import write_result
+    from video_analysis_pipeline import analyze_video
+
+    result = analyze_video(path, cache=_worker_cache, **options)
+    write_result(result, output, fmt)
+    return {"media_seconds": result["analysis_json"]["video"].get("duration_seconds") or 0.0}
+
+
+def _worker_main(conn, runner: JobRunner, warm: bool, cache_dir: Optional[str],
+                 ocr_workers: Optional[int]) -> None:
+    """Worker loop: warm up, report ready, then run jobs sent over `conn`."""
+    global _worker_cache
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl-C
+    if ocr_workers:
+        from src.processing.ocr_pool import OCR_WORKERS_ENV
+        os.environ[OCR_WORKERS_ENV] = str(ocr_workers)
+    started = time.perf_counter()
+    status = warm_up() if warm else {}
+    if cache_dir:
+        from src.utils.stage_cache import StageCache
+        _worker_cache = StageCache(cache_dir)
+    conn.send(("ready", os.getpid(), {"warm_up_s": time.perf_counter() - started,
+                                      "components": status}))
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        job_id, path, options, output, fmt = task
+        try:
+            info = runner(path, options, output, fmt)
+            conn.send(("done", job_id, info or {}))
+        except Exception as e:
+            conn.send(("failed", job_id, f"{type(e).__name__}: {e}", traceback.format_exc()))
+
+
+# ---------- Jobs and workers (parent side) ---------- #
+
+@dataclass
+class Job:
+    id: str
+    path: str
+    options: Dict[str, Any]
+    format: str
+    output: str
+    state: str = "queued"            # queued | running | done | failed
+    submitted_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    worker: Optional[int] = None     # worker slot that ran it
+    error: Optional[str] = None
+    info: Optional[Dict[str, Any]] = None
+
+    def status(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("options")
+        data["queued_s"] = ((self.started_at or time.time()) - self.submitted_at)
+        if self.started_at is not None:
+            data["run_s"] = (self.finished_at or time.time()) - self.started_at
+        return data
+
+
+class WorkerSlot:
+    """One warm worker process and its parent-side bookkeeping."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.pid: Optional[int] = None
+        self.ready_at: Optional[float] = None
+        self.warm_up: Dict[str, Any] = {}
+        self.job_id: Optional[str] = None
+        self.busy_since: Optional[float] = None
+        self.busy_s = 0.0
+        self.jobs_done = 0
+        self.jobs_failed = 0
+        self.restarts = 0
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        """Counters and utilization (busy share of the time since it became ready)."""
+        busy = self.busy_s + (now - self.busy_since if self.busy_since is not None else 0.0)
+        uptime = now - self.ready_at if self.ready_at is not None else 0.0
+        return {
+            "index": self.index,
+            "pid": self.pid,
+            "state": "starting" if self.ready_at is None else ("busy" if self.job_id else "idle"),
+            "job": self.job_id,
+            "jobs_done": self.jobs_done,
+            "jobs_failed": self.jobs_failed,
+            "restarts": self.restarts,
+            "busy_s": busy,
+            "uptime_s": uptime,
+            "utilization": busy / uptime if uptime > 0 else 0.0,
+            "warm_up": self.warm_up,
+        }
+
+
+class QueueFull(Exception):
+    """The job queue is at capacity; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AnalysisService:
+    """
+    Bounded job queue dispatching to `workers` warm processes.
+
+    One dispatcher thread per worker takes the next queued job, sends it to
+    its process and waits for the outcome; a worker that dies or exceeds
+    `job_timeout` fails its job and is replaced. Finished job records beyond
+    `max_finished` are forgotten oldest first (their result files stay).
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        workers: int = 2,
+        queue_size: int = 16,
+        runner: JobRunner = run_analysis_job,
+        warm: bool = True,
+        cache_dir: Optional[str] = None,
+        ocr_workers: Optional[int] = None,
+        job_timeout: Optional[float] = None,
+        max_finished: int = 1000,
+    ):
+        self.out_dir = out_dir
+        self.queue_size = queue_size
+        self.runner = runner
+        self.warm = warm
+        self.cache_dir = cache_dir
+        # default: share the CPUs between the workers' OCR pools
+        self.ocr_workers = ocr_workers or max(1, (os.cpu_count() or 1) // workers)
+        self.job_timeout = job_timeout
+        self.max_finished = max_finished
+        self.started_at = time.time()
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_size)
+        self._jobs: Dict[str, Job] = {}
+        self._finished: Deque[str] = deque()
+        self._lock = threading.Lock()
+        self._mean_job_s: Optional[float] = None
+        self._slots = [WorkerSlot(i) for i in range(workers)]
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+
+    # ----- lifecycle ----- #
+
+    def start(self) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        for slot in self._slots:
+            thread = threading.Thread(target=self._dispatch, args=(slot,),
+                                      name=f"editdna-worker-{slot.index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop taking jobs, let running ones finish (up to `timeout`, then kill them) and stop the workers."""
+        self._stop.set()
+        while True:
+            try:
+                self._fail_queued(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        deadline = time.time() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.time()))
+        for slot, thread in zip(self._slots, self._threads):
+            # a worker still running a job past the deadline is killed
+            self._stop_worker(slot, kill=thread.is_alive())
+
+    def _start_worker(self, slot: WorkerSlot) -> None:
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.runner, self.warm, self.cache_dir, self.ocr_workers),
+            name=f"editdna-worker-{slot.index}",
+            daemon=False,  # workers start their own OCR pools
+        )
+        process.start()
+        child_conn.close()
+        slot.process, slot.conn = process, parent_conn
+        kind, pid, warm_up = parent_conn.recv()  # EOFError if it died warming up
+        slot.pid, slot.warm_up, slot.ready_at = pid, warm_up, time.time()
+        slot.busy_s = 0.0  # utilization is per process lifetime
+        print(f"[INFO] Worker {slot.index} (pid {pid}) ready in {warm_up['warm_up_s']:.1f}s")
+        for name, state in warm_up.get("components", {}).items():
+            if state != "ok":
+                print(f"[WARN] Worker {slot.index}: {name} not preloaded ({state})")
+
+    def _stop_worker(self, slot: WorkerSlot, kill: bool = False) -> None:
+        # detach first: close() and the slot's dispatcher may both stop it
+        with self._lock:
+            process, conn = slot.process, slot.conn
+            slot.process = slot.conn = slot.ready_at = None
+        if process is None:
+            return
+        try:
+            if kill:
+                process.terminate()
+            else:
+                conn.send(None)
+        except (OSError, EOFError):
+            pass
+        process.join(5.0)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        conn.close()
+
+    # ----- dispatch ----- #
+
+    def _fail_queued(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.state, job.error, job.finished_at = "failed", "Service shut down", time.time()
+
+    def _dispatch(self, slot: WorkerSlot) -> None:
+        while not self._stop.is_set():
+            try:
+                process = slot.process
+                if process is not None and not process.is_alive():
+                    slot.restarts += 1
+                    self._stop_worker(slot)
+                if slot.process is None:
+                    self._start_worker(slot)
+            except (OSError, EOFError) as e:
+                print(f"[ERROR] Worker {slot.index} failed to start: {e}")
+                time.sleep(1.0)
+                continue
+            try:
+                job_id = self._queue.get(timeout=DISPATCH_POLL_S)
+            except queue.Empty:
+                continue
+            if self._stop.is_set():
+                self._fail_queued(job_id)
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job.state, job.started_at, job.worker = "running", time.time(), slot.index
+                slot.job_id, slot.busy_since = job_id, time.time()
+            outcome = self._run_on(slot, job)
+            with self._lock:
+                slot.busy_s += time.time() - slot.busy_since
+                slot.job_id = slot.busy_since = None
+                self._finish(job, slot, outcome)
+
+    def _run_on(self, slot: WorkerSlot, job: Job) -> Tuple:
+        try:
+            conn = slot.conn
+            conn.send((job.id, job.path, job.options, job.output, job.format))
+            if self.job_timeout is not None and not conn.poll(self.job_timeout):
+                error = f"Timed out after {self.job_timeout:g}s"
+            else:
+                return conn.recv()
+        except (OSError, EOFError):
+            error = "Worker process died"
+        # the next dispatch round starts a fresh worker
+        self._stop_worker(slot, kill=True)
+        slot.restarts += 1
+        return ("failed", job.id, error, None)
+
+    def _finish(self, job: Job, slot: WorkerSlot, outcome: Tuple) -> None:
+        job.finished_at = time.time()
+        if outcome[0] == "done":
+            job.state, job.info = "done", outcome[2]
+            slot.jobs_done += 1
+            run_s = job.finished_at - job.started_at
+            self._mean_job_s = run_s if self._mean_job_s is None else 0.8 * self._mean_job_s + 0.2 * run_s
+        else:
+            job.state, job.error = "failed", outcome[2]
+            slot.jobs_failed += 1
+            print(f"[ERROR] Job {job.id} ({job.path}) failed: {job.error}")
+            if outcome[3]:
+                print(outcome[3], end="")
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    # ----- public API ----- #
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up (one job finishing)."""
+        per_job = self._mean_job_s or 5.0
+        return max(1, math.ceil(per_job / len(self._slots)))
+
+    def submit(self, path: str, options: Optional[Dict[str, Any]] = None,
+               wait: float = 0.0) -> Job:
+        """
+        Queue a job. Raises ValueError for bad input and QueueFull if no slot
+        frees up within `wait` seconds.
+        """
+        if self._stop.is_set():
+            raise QueueFull(self.retry_after())
+        options = dict(options or {})
+        fmt = options.pop("format", "json")
+        if fmt not in RESULT_EXTENSIONS:
+            raise ValueError(f"Unknown result format: {fmt}")
+        unknown = sorted(set(options) - set(ALLOWED_OPTIONS))
+        if unknown:
+            raise ValueError(f"Unsupported options: {', '.join(unknown)}")
+        if not isinstance(path, str) or not os.path.isfile(path):
+            raise ValueError(f"No such video file: {path}")
+
+        job_id = uuid.uuid4().hex
+        job = Job(
+            id=job_id,
+            path=os.path.abspath(path),
+            options=options,
+            format=fmt,
+            output=os.path.join(self.out_dir, job_id + RESULT_EXTENSIONS[fmt]),
+            submitted_at=time.time(),
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+        try:
+            if wait > 0:
+                self._queue.put(job_id, timeout=wait)
+            else:
+                self._queue.put_nowait(job_id)
+        except queue.Full:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            raise QueueFull(self.retry_after())
+        return job
+
+    def job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            states: Dict[str, int] = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            workers = [slot.stats(now) for slot in self._slots]
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.queue_size,
+            "running": sum(1 for w in workers if w["state"] == "busy"),
+            "jobs": states,
+            "mean_job_s": self._mean_job_s,
+            "uptime_s": time.time() - self.started_at,
+            "workers": workers,
+        }
+
+    def ready_workers(self) -> int:
+        return sum(1 for slot in self._slots if slot.ready_at is not None and slot.process is not None)
+
+
+# ---------- HTTP front end ---------- #
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "EditDNA/1"
+    service: AnalysisService  # set on the subclass made by make_server
+
+    def address_string(self) -> str:
+        # Unix socket peers have no address
+        return str(self.client_address[0]) if self.client_address else "local"
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, code: int, data: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_or_404(self, job_id: str) -> Optional[Job]:
+        job = self.service.job(job_id)
+        if job is None:
+            self._send_json(404, {"error": f"Unknown job: {job_id}"})
+        return job
+
+    def do_GET(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            ready = self.service.ready_workers()
+            self._send_json(200 if ready else 503, {"ok": bool(ready), "workers_ready": ready})
+        elif parts == ["stats"]:
+            self._send_json(200, self.service.stats())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_or_404(parts[1])
+            if job is not None:
+                self._send_json(200, job.status())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "result":
+            job = self._job_or_404(parts[1])
+            if job is None:
+                return
+            if job.state != "done":
+                self._send_json(409, job.status())
+                return
+            if not os.path.exists(job.output):
+                self._send_json(410, {"error": f"Result file was removed: {job.output}"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPES[job.format])
+            self.send_header("Content-Length", str(os.path.getsize(job.output)))
+            self.end_headers()
+            with open(job.output, "rb") as f:
+                while True:
+                    chunk = f.read(1 << 16)
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+        else:
+            self._send_json(404, {"error": f"No route for GET {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": f"No route for POST {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(f"Invalid Content-Length: {length}")
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "Request body too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            wait = float(parse_qs(url.query).get("wait", ["0"])[0])
+            job = self.service.submit(body.get("path"), body.get("options"), wait=wait)
+        except QueueFull as e:
+            self._send_json(503, {"error": str(e), "retry_after": e.retry_after},
+                            {"Retry-After": str(e.retry_after)})
+            return
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        self._send_json(202, job.status(), {"Location": f"/jobs/{job.id}"})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def make_server(service: AnalysisService, host: str = "127.0.0.1", port: int = 8765,
+                socket_path: Optional[str] = None):
+    """HTTP server for `service` on host:port, or on a Unix socket if given."""
+    handler = type("Handler", (_Handler,), {"service": service})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return _UnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve analyze_video jobs from warm workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=2, help="warm worker processes")
+    parser.add_argument("--queue-size", type=int, default=16, help="queued jobs before 503")
+    parser.add_argument("--out-dir", default="analysis_results", help="where results are written")
+    parser.add_argument("--cache-dir", help="per-stage result cache shared by the workers")
+    parser.add_argument("--ocr-workers", type=int, help="OCR processes per worker")
+    parser.add_argument("--job-timeout", type=float, help="seconds before a job's worker is killed")
+    args = parser.parse_args(argv)
+
+    service = AnalysisService(
+        out_dir=args.out_dir,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        cache_dir=args.cache_dir,
+        ocr_workers=args.ocr_workers,
+        job_timeout=args.job_timeout,
+    )
+    service.start()
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"[INFO] Listening on {where} ({args.workers} workers, queue {args.queue_size})")
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
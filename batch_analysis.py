@@ -0,0 +1,271 @@
+# batch_analysis.py
+"""
+Analyze a corpus of videos with a process pool.
+
+    python batch_analysis.py videos/ --out-dir results/
+    python batch_analysis.py "footage/**/*.mp4" --workers 16 --engine histogram
+    python batch_analysis.py --manifest todo.txt --out-dir results/
+    python batch_analysis.py videos/ --profile full
+
+One result per video is written to --out-dir (JSON by default; --format
+ndjson or msgpack for streamed / compact output). Videos whose result
+already exists are skipped (resume), per-file failures are collected and
+reported at the end instead of stopping the run.
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from src.processing.ocr_pool import OCR_WORKERS_ENV
+from src.utils.result_io import write_result
+from src.utils.stage_cache import StageCache
+from config import ANALYSIS_PROFILES
+from video_analysis_pipeline import analyze_video
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".mkv", ".webm", ".avi", ".m4v")
+RESULT_EXTENSIONS = {"json": ".json", "ndjson": ".ndjson", "msgpack": ".msgpack"}
+
+
+def _is_video(path: str) -> bool:
+    return path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def _read_manifest(manifest_path: str) -> List[Dict[str, Any]]:
+    """
+    One job per line: a plain path, or a JSON object with "path" and
+    optional "video_meta" / "transcript_outline". Blank lines and lines
+    starting with '#' are ignored.
+    """
+    jobs = []
+    with open(manifest_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            jobs.append(json.loads(line) if line.startswith("{") else {"path": line})
+    return jobs
+
+
+def collect_jobs(inputs: List[str], manifest: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Expand directories, globs and files (plus an optional manifest) into jobs."""
+    jobs: List[Dict[str, Any]] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                jobs.extend({"path": os.path.join(root, f)} for f in sorted(files) if _is_video(f))
+        elif os.path.isfile(item):
+            jobs.append({"path": item})
+        else:
+            jobs.extend({"path": p} for p in sorted(glob.glob(item, recursive=True)) if _is_video(p))
+    if manifest:
+        jobs.extend(_read_manifest(manifest))
+
+    # de-duplicate while keeping order
+    seen = set()
+    unique = []
+    for job in jobs:
+        key = os.path.abspath(job["path"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(job)
+    return unique
+
+
+def assign_output_paths(jobs: List[Dict[str, Any]], out_dir: str, fmt: str = "json") -> None:
+    """
+    Name each result after its video; stems shared by several inputs get a
+    short path hash so names stay stable across resumed runs.
+    """
+    stems: Dict[str, int] = {}
+    for job in jobs:
+        stem = os.path.splitext(os.path.basename(job["path"]))[0]
+        stems[stem] = stems.get(stem, 0) + 1
+    for job in jobs:
+        stem = os.path.splitext(os.path.basename(job["path"]))[0]
+        if stems[stem] > 1:
+            digest = hashlib.sha1(os.path.abspath(job["path"]).encode()).hexdigest()[:8]
+            stem = f"{stem}.{digest}"
+        job["output"] = os.path.join(out_dir, stem + RESULT_EXTENSIONS[fmt])
+
+
+def _write_json_atomic(path: str, data: Any) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)  # readers and resumed runs never see partial files
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _init_worker(ocr_workers: int) -> None:
+    """Size this worker's OCR pool so the batch shares the CPUs instead of
+    starting one tesseract process per CPU in every worker."""
+    os.environ[OCR_WORKERS_ENV] = str(ocr_workers)
+
+
+def _analyze_one(
+    job: Dict[str, Any],
+    shot_engine: str,
+    shot_engine_kwargs: Dict[str, Any],
+    cache_dir: Optional[str],
+    profile: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Worker: analyze one video, write its result, never raise."""
+    started = time.perf_counter()
+    try:
+        result = analyze_video(
+            job["path"],
+            transcript_outline=job.get("transcript_outline"),
+            video_meta=job.get("video_meta"),
+            shot_engine=shot_engine,
+            shot_engine_kwargs=shot_engine_kwargs,
+            cache=StageCache(cache_dir) if cache_dir else None,
+            profile=profile,
+        )
+        write_result(result, job["output"])
+        media_seconds = result["analysis_json"]["video"].get("duration_seconds") or 0.0
+        return {"path": job["path"], "ok": True, "media_seconds": media_seconds,
+                "elapsed": time.perf_counter() - started}
+    except Exception as e:
+        return {"path": job["path"], "ok": False, "error": f"{type(e).__name__}: {e}",
+                "traceback": traceback.format_exc(), "elapsed": time.perf_counter() - started}
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    out_dir: str,
+    workers: Optional[int] = None,
+    shot_engine: str = "pyscenedetect",
+    shot_engine_kwargs: Optional[Dict[str, Any]] = None,
+    resume: bool = True,
+    cache_dir: Optional[str] = None,
+    fmt: str = "json",
+    profile: Optional[str] = None,
+    ocr_workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fan `jobs` out over a process pool and return a run summary.
+
+    Args:
+        jobs: Dicts with at least "path"; see collect_jobs()
+        out_dir: Directory for per-video result files
+        workers: Pool size; defaults to the number of CPUs
+        shot_engine: Engine passed to analyze_video
+        shot_engine_kwargs: Engine params passed to analyze_video
+        resume: Skip videos whose result file already exists
+        cache_dir: Shared StageCache directory, reused across runs
+        fmt: Result format: "json", "ndjson" or "msgpack"
+        profile: config.ANALYSIS_PROFILES entry; replaces shot_engine and
+            merges shot_engine_kwargs over the profile's engine params
+        ocr_workers: OCR processes per worker; defaults to $EDITDNA_OCR_WORKERS
+            or the CPUs divided among the workers
+
+    Returns:
+        Summary with counts, throughput and the list of failures
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    assign_output_paths(jobs, out_dir, fmt)
+    pending = [j for j in jobs if not (resume and os.path.exists(j["output"]))]
+    skipped = len(jobs) - len(pending)
+    workers = workers or os.cpu_count() or 1
+    ocr_workers = (ocr_workers or int(os.environ.get(OCR_WORKERS_ENV) or 0)
+                   or max(1, (os.cpu_count() or 1) // workers))
+    print(f"[INFO] {len(pending)} videos to analyze ({skipped} already done) on {workers} workers "
+          f"({ocr_workers} OCR processes each)")
+
+    failures = []
+    done = 0
+    media_seconds = 0.0
+    started = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ocr_workers,)) as pool:
+            futures = [
+                pool.submit(_analyze_one, job, shot_engine, shot_engine_kwargs or {}, cache_dir,
+                            profile)
+                for job in pending
+            ]
+            for n, fut in enumerate(as_completed(futures), start=1):
+                res = fut.result()
+                if res["ok"]:
+                    done += 1
+                    media_seconds += res["media_seconds"]
+                    print(f"[INFO] [{n}/{len(pending)}] ok   {res['path']} ({res['elapsed']:.1f}s)")
+                else:
+                    failures.append(res)
+                    print(f"[ERROR] [{n}/{len(pending)}] fail {res['path']}: {res['error']}")
+    wall = time.perf_counter() - started
+
+    summary = {
+        "total": len(jobs),
+        "skipped": skipped,
+        "succeeded": done,
+        "failed": len(failures),
+        "wall_seconds": wall,
+        "videos_per_minute": done / wall * 60.0 if wall > 0 else 0.0,
+        "media_seconds_per_second": media_seconds / wall if wall > 0 else 0.0,
+        "failures": [{"path": f["path"], "error": f["error"], "traceback": f["traceback"]}
+                     for f in failures],
+    }
+    _write_json_atomic(os.path.join(out_dir, "_batch_summary.json"), summary)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch-analyze videos with analyze_video.")
+    parser.add_argument("inputs", nargs="*", help="video files, directories or glob patterns")
+    parser.add_argument("--manifest", help="file with one video path (or JSON job) per line")
+    parser.add_argument("--out-dir", default="analysis_results")
+    parser.add_argument("--workers", type=int, default=None, help="default: number of CPUs")
+    parser.add_argument("--engine", default="pyscenedetect", help="shot detection engine")
+    parser.add_argument("--engine-kwargs", default="{}", help="JSON dict of engine params")
+    parser.add_argument("--profile", choices=list(ANALYSIS_PROFILES),
+                        help="analysis profile from config.py (overrides --engine)")
+    parser.add_argument("--no-resume", action="store_true", help="re-analyze videos with existing results")
+    parser.add_argument("--cache-dir", help="per-stage result cache shared by all workers")
+    parser.add_argument("--ocr-workers", type=int, default=None,
+                        help="OCR processes per worker (default: CPUs / workers)")
+    parser.add_argument("--format", default="json", choices=sorted(RESULT_EXTENSIONS),
+                        help="result file format (msgpack needs the msgpack package)")
+    args = parser.parse_args(argv)
+
+    jobs = collect_jobs(args.inputs, args.manifest)
+    if not jobs:
+        parser.error("no input videos found")
+
+    summary = run_batch(
+        jobs,
+        out_dir=args.out_dir,
+        workers=args.workers,
+        shot_engine=args.engine,
+        shot_engine_kwargs=json.loads(args.engine_kwargs),
+        resume=not args.no_resume,
+        cache_dir=args.cache_dir,
+        fmt=args.format,
+        profile=args.profile,
+        ocr_workers=args.ocr_workers,
+    )
+
+    print(f"[INFO] {summary['succeeded']} ok, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {summary['wall_seconds']:.1f}s")
+    print(f"[INFO] Throughput: {summary['videos_per_minute']:.1f} videos/min, "
+          f"{summary['media_seconds_per_second']:.1f} media-seconds/sec")
+    for f in summary["failures"]:
+        print(f"[ERROR] {f['path']}: {f['error']}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
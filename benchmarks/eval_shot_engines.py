@@ -0,0 +1,313 @@
+"""
+Accuracy-vs-speed evaluation of shot detection engines and presets.
+
+    python -m benchmarks.eval_shot_engines                       # synthetic set
+    python -m benchmarks.eval_shot_engines --annotations labels/*.json --tolerance 2
+
+Every preset in config.SHOT_ENGINE_CONFIGS and every engine in ENGINE_FUNCS
+(with its default parameters) is run over each labelled video in a fresh
+process. Detected cuts are matched one-to-one to the labelled cuts within
+`tolerance` frames to get precision/recall/F1; speed is decoded frames per
+wall-clock second. Configurations on the F1-vs-speed Pareto front are marked.
+
+An annotation file is JSON with the video path (relative to the file) and
+either cut times in seconds or cut frame numbers:
+
+    {"video": "clip.mp4", "content_type": "vlog", "cut_times": [3.2, 7.96]}
+    {"video": "clip.mp4", "fps": 25, "cut_frames": [80, 199]}
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.run_benchmarks import _maxrss_mb
+from benchmarks.synthetic import SyntheticSpec, make_synthetic_video, synthetic_probe
+
+
+@dataclass
+class LabelledVideo:
+    path: str
+    cut_times: List[float]
+    content_type: str = "unlabelled"
+    probe: Any = None  # VideoProbe; None means probe_video() in the worker
+
+
+@dataclass
+class EvalResult:
+    config: str
+    engine: str
+    video: str
+    content_type: str
+    tp: int = 0
+    fp: int = 0
+    fn: int = 0
+    wall_s: float = 0.0
+    frames_per_s: Optional[float] = None
+    peak_rss_mb: Optional[float] = None
+    refined_fraction: Optional[float] = None  # cascade: share of frames sent to TransNet
+    error: Optional[str] = None
+
+
+@dataclass
+class ConfigSummary:
+    config: str
+    engine: str
+    precision: float
+    recall: float
+    f1: float
+    frames_per_s: float
+    peak_rss_mb: float
+    videos: int
+    refined_fraction: Optional[float] = None
+    pareto: bool = False
+    errors: List[str] = field(default_factory=list)
+
+
+def match_cuts(predicted: List[float], truth: List[float], tolerance_s: float) -> Tuple[int, int, int]:
+    """
+    One-to-one matching of predicted to true cut times within `tolerance_s`.
+
+    Both lists are walked in time order and each true cut is claimed by at
+    most one prediction. Returns (true positives, false positives, false
+    negatives).
+    """
+    predicted, truth = sorted(predicted), sorted(truth)
+    i = j = tp = 0
+    while i < len(predicted) and j < len(truth):
+        d = predicted[i] - truth[j]
+        if abs(d) <= tolerance_s:
+            tp += 1
+            i += 1
+            j += 1
+        elif d < 0:
+            i += 1
+        else:
+            j += 1
+    return tp, len(predicted) - tp, len(truth) - tp
+
+
+def _prf(tp: int, fp: int, fn: int) -> Tuple[float, float, float]:
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def pareto_front(points: List[Tuple[float, float]]) -> List[bool]:
+    """Mark points not dominated in both coordinates (higher is better)."""
+    return [
+        not any(
+            (qa >= pa and qb >= pb) and (qa > pa or qb > pb)
+            for qa, qb in points
+        )
+        for pa, pb in points
+    ]
+
+
+def eval_configs() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Presets from config.py plus every engine with its default parameters."""
+    from config import SHOT_ENGINE_CONFIGS
+    from src.shot_detection import ENGINE_FUNCS
+
+    configs = {
+        name: (preset["engine"], dict(preset.get("params", {})))
+        for name, preset in SHOT_ENGINE_CONFIGS.items()
+    }
+    for engine in ENGINE_FUNCS:
+        configs[f"{engine}:defaults"] = (engine, {})
+    return configs
+
+
+def _run_detection(video: LabelledVideo, engine: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: detect shots once, return cut times, timing and memory."""
+    from src.shot_detection import detect_shots
+    from src.utils.video_probe import probe_video
+
+    probe = video.probe or probe_video(video.path)
+    stats: Dict[str, Any] = {}
+    if engine == "cascade":
+        params = dict(params, stats=stats)
+    wall0 = time.perf_counter()
+    shots = detect_shots(video.path, engine=engine, probe=probe, **params)
+    wall = time.perf_counter() - wall0
+    return {
+        "cuts": [s.t_start for s in shots[1:]],
+        "refined_fraction": stats.get("refined_fraction"),
+        "wall_s": wall,
+        "fps": probe.fps or 25.0,
+        "frames": probe.frame_count or int(probe.duration * (probe.fps or 25.0)),
+        "peak_rss_mb": _maxrss_mb(resource.RUSAGE_SELF),
+    }
+
+
+def evaluate(
+    videos: List[LabelledVideo],
+    configs: Dict[str, Tuple[str, Dict[str, Any]]],
+    tolerance_frames: float = 2.0,
+) -> List[EvalResult]:
+    results = []
+    for video in videos:
+        for name, (engine, params) in configs.items():
+            res = EvalResult(config=name, engine=engine, video=os.path.basename(video.path),
+                             content_type=video.content_type)
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+                try:
+                    out = ex.submit(_run_detection, video, engine, params).result()
+                except Exception as e:
+                    res.error = f"{type(e).__name__}: {e}"
+                    print(f"[WARN] {name} on {res.video} failed: {res.error}")
+                    results.append(res)
+                    continue
+            res.tp, res.fp, res.fn = match_cuts(
+                out["cuts"], video.cut_times, tolerance_frames / out["fps"]
+            )
+            res.wall_s = out["wall_s"]
+            res.frames_per_s = out["frames"] / out["wall_s"] if out["wall_s"] > 0 else None
+            res.peak_rss_mb = out["peak_rss_mb"]
+            res.refined_fraction = out["refined_fraction"]
+            print(f"[INFO] {name:<22} {res.video:<28} tp={res.tp} fp={res.fp} fn={res.fn} "
+                  f"{res.wall_s:.2f}s")
+            results.append(res)
+    return results
+
+
+def summarize(results: List[EvalResult]) -> List[ConfigSummary]:
+    """Micro-averaged P/R/F1 per config, total frames/s, worst-case RSS."""
+    by_config: Dict[str, List[EvalResult]] = {}
+    for r in results:
+        by_config.setdefault(r.config, []).append(r)
+
+    summaries = []
+    for name, rows in by_config.items():
+        ok = [r for r in rows if r.error is None]
+        if not ok:
+            continue
+        tp, fp, fn = (sum(getattr(r, k) for r in ok) for k in ("tp", "fp", "fn"))
+        precision, recall, f1 = _prf(tp, fp, fn)
+        frames = sum((r.frames_per_s or 0.0) * r.wall_s for r in ok)
+        wall = sum(r.wall_s for r in ok)
+        refined = [r.refined_fraction for r in ok if r.refined_fraction is not None]
+        summaries.append(ConfigSummary(
+            config=name,
+            engine=ok[0].engine,
+            precision=precision,
+            recall=recall,
+            f1=f1,
+            frames_per_s=frames / wall if wall > 0 else 0.0,
+            peak_rss_mb=max(r.peak_rss_mb or 0.0 for r in ok),
+            videos=len(ok),
+            refined_fraction=sum(refined) / len(refined) if refined else None,
+            errors=[r.error for r in rows if r.error],
+        ))
+    for s, on_front in zip(summaries, pareto_front([(s.f1, s.frames_per_s) for s in summaries])):
+        s.pareto = on_front
+    summaries.sort(key=lambda s: -s.frames_per_s)
+    return summaries
+
+
+def format_table(summaries: List[ConfigSummary], title: str) -> str:
+    lines = [
+        title,
+        f"  {'config':<24} {'engine':<14} {'P':>6} {'R':>6} {'F1':>6} {'frames/s':>10} {'RSS MB':>8}",
+    ]
+    for s in summaries:
+        mark = "*" if s.pareto else " "
+        lines.append(
+            f"{mark} {s.config:<24} {s.engine:<14} {s.precision:6.3f} {s.recall:6.3f} "
+            f"{s.f1:6.3f} {s.frames_per_s:10.1f} {s.peak_rss_mb:8.1f}"
+        )
+    for s in summaries:
+        if s.refined_fraction is not None:
+            lines.append(f"  {s.config}: {s.refined_fraction:.1%} of frames went to TransNet")
+    lines.append("  (* = Pareto-optimal in F1 vs frames/s)")
+    return "\n".join(lines)
+
+
+def load_annotation(path: str) -> LabelledVideo:
+    with open(path) as f:
+        data = json.load(f)
+    video = os.path.join(os.path.dirname(os.path.abspath(path)), data["video"])
+    if "cut_times" in data:
+        cuts = [float(t) for t in data["cut_times"]]
+    elif "cut_frames" in data:
+        if not data.get("fps"):
+            raise ValueError(f"{path}: cut_frames needs fps")
+        cuts = [int(f) / float(data["fps"]) for f in data["cut_frames"]]
+    else:
+        raise ValueError(f"{path}: needs cut_times or cut_frames")
+    return LabelledVideo(path=video, cut_times=cuts,
+                         content_type=data.get("content_type", "unlabelled"))
+
+
+def synthetic_set(work_dir: str, sizes: List[Tuple[int, int]], duration: float) -> List[LabelledVideo]:
+    """Synthetic videos with short and long shots at each size."""
+    videos = []
+    for w, h in sizes:
+        for label, (lo, hi) in (("short_shots", (0.5, 1.5)), ("long_shots", (2.0, 6.0))):
+            spec = SyntheticSpec(name=f"eval_{label}_{w}x{h}", width=w, height=h,
+                                 duration=duration, min_shot=lo, max_shot=hi, seed=7)
+            path, truth = make_synthetic_video(spec, work_dir)
+            videos.append(LabelledVideo(path=path, cut_times=truth.cut_times,
+                                        content_type=f"synthetic_{label}",
+                                        probe=synthetic_probe(spec, path)))
+    return videos
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--annotations", nargs="*", default=[],
+                        help="annotation JSON files; synthetic videos are used if none are given")
+    parser.add_argument("--configs", default="",
+                        help="comma-separated subset of configs to run (default: all)")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="match tolerance in frames")
+    parser.add_argument("--work-dir", default=os.path.join("benchmarks", ".videos"))
+    parser.add_argument("--sizes", default="640x360", help="synthetic video sizes, WxH list")
+    parser.add_argument("--duration", type=float, default=30.0, help="synthetic video length (s)")
+    parser.add_argument("--out", help="write per-video results and summaries as JSON")
+    args = parser.parse_args(argv)
+
+    if args.annotations:
+        videos = [load_annotation(p) for p in args.annotations]
+    else:
+        sizes = [tuple(int(v) for v in s.lower().split("x")) for s in args.sizes.split(",") if s]
+        videos = synthetic_set(args.work_dir, sizes, args.duration)
+
+    configs = eval_configs()
+    if args.configs:
+        wanted = set(args.configs.split(","))
+        configs = {k: v for k, v in configs.items() if k in wanted}
+
+    results = evaluate(videos, configs, tolerance_frames=args.tolerance)
+    overall = summarize(results)
+    print(format_table(overall, f"\nAll videos (tolerance {args.tolerance:g} frames):"))
+    failed = sorted({r.config for r in results} - {s.config for s in overall})
+    if failed:
+        print(f"[WARN] No successful runs for: {', '.join(failed)}")
+    by_type: Dict[str, List[ConfigSummary]] = {}
+    content_types = sorted({r.content_type for r in results})
+    if len(content_types) > 1:
+        for ct in content_types:
+            by_type[ct] = summarize([r for r in results if r.content_type == ct])
+            print(format_table(by_type[ct], f"\n{ct}:"))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "tolerance_frames": args.tolerance,
+                "results": [asdict(r) for r in results],
+                "summary": [asdict(s) for s in overall],
+                "by_content_type": {k: [asdict(s) for s in v] for k, v in by_type.items()},
+            }, f, indent=2)
+        print(f"[INFO] Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Per-stage benchmark over synthetic videos.
+
+    python -m benchmarks.run_benchmarks --out bench.json
+    python -m benchmarks.run_benchmarks --sizes 1280x720 --durations 60 \\
+        --engines histogram,ffmpeg --compare bench_before.json
+
+Every (video, stage) measurement runs in a fresh process so peak RSS is
+attributable to that stage alone. Throughput is reported as seconds of media
+processed per wall-clock second. Downstream stages (classification, OCR,
+analysis JSON) are fed the ground-truth shots, so their timings do not
+depend on which shot engine ran first.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.synthetic import SyntheticSpec, default_specs, make_synthetic_video, synthetic_probe
+
+DOWNSTREAM_STAGES = ["classify_shots", "extract_ocr", "extract_audio_segments", "build_analysis_json"]
+
+
+def _maxrss_mb(who: int) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024.0
+
+
+def _truth_shots(cut_times: List[float], duration: float):
+    from src.models.data_models import Shot
+    bounds = [0.0] + list(cut_times) + [duration]
+    return [Shot(index=i, t_start=a, t_end=b) for i, (a, b) in enumerate(zip(bounds, bounds[1:]))]
+
+
+def _run_stage(stage: str, spec: SyntheticSpec, path: str, cut_times: List[float],
+               engine: Optional[str], engine_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: run one stage once and measure it. Imports happen before timing."""
+    from src.shot_detection import detect_shots
+    from src.processing.shot_classification import classify_shots
+    from src.processing.ocr_processor import extract_ocr
+    from src.processing.ocr_pool import OCREnginePool
+    from src.processing.audio_processor import extract_audio_segments
+    from src.analysis.video_analyzer import build_analysis_json
+
+    probe = synthetic_probe(spec, path)
+    shots = _truth_shots(cut_times, spec.duration)
+    baseline_rss = _maxrss_mb(resource.RUSAGE_SELF)
+    extra: Dict[str, Any] = {}
+
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    if stage == "detect_shots":
+        detected = detect_shots(path, engine=engine, probe=probe, **engine_kwargs)
+        extra["shots"] = len(detected)
+    elif stage == "classify_shots":
+        classify_shots(path, shots, probe=probe)
+        extra["faces"] = sum(s.faces_present or 0 for s in shots)
+    elif stage == "extract_ocr":
+        # explicit pool so its workers are reaped and counted in children RSS
+        with OCREnginePool() as pool:
+            extract_ocr(path, shots, probe=probe, pool=pool)
+        extra["overlay_words"] = sum(len(s.overlay_texts or []) for s in shots)
+    elif stage == "extract_audio_segments":
+        extra["segments"] = len(extract_audio_segments(path, probe=probe))
+    elif stage == "build_analysis_json":
+        # the stage itself is tiny; repeat it so the timing is measurable
+        repeats = 100
+        for _ in range(repeats):
+            build_analysis_json({"id": spec.name, "duration_seconds": spec.duration},
+                                shots, [], {})
+        extra["repeats"] = repeats
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+    if stage == "build_analysis_json":
+        wall, cpu = wall / extra["repeats"], cpu / extra["repeats"]
+
+    return {
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "media_s_per_s": spec.duration / wall if wall > 0 else None,
+        "peak_rss_mb": _maxrss_mb(resource.RUSAGE_SELF),
+        "baseline_rss_mb": baseline_rss,
+        "children_peak_rss_mb": _maxrss_mb(resource.RUSAGE_CHILDREN),
+        **extra,
+    }
+
+
+def _measure(stage: str, spec: SyntheticSpec, path: str, cut_times: List[float],
+             engine: Optional[str] = None, engine_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    row: Dict[str, Any] = {
+        "video": spec.name,
+        "resolution": f"{spec.width}x{spec.height}",
+        "duration_s": spec.duration,
+        "stage": stage,
+        "engine": engine,
+    }
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+        try:
+            row.update(ex.submit(_run_stage, stage, spec, path, cut_times,
+                                 engine, engine_kwargs or {}).result())
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    specs: List[SyntheticSpec],
+    engines: List[str],
+    stages: List[str],
+    work_dir: str,
+    engine_kwargs: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Render `specs` into `work_dir` and benchmark every stage on each."""
+    import cv2
+    engine_kwargs = engine_kwargs or {}
+    results = []
+    for spec in specs:
+        print(f"[INFO] Rendering {spec.name} ...")
+        path, truth = make_synthetic_video(spec, work_dir)
+        if "detect_shots" in stages:
+            for engine in engines:
+                row = _measure("detect_shots", spec, path, truth.cut_times,
+                               engine=engine, engine_kwargs=engine_kwargs.get(engine))
+                _report(row)
+                results.append(row)
+        for stage in stages:
+            if stage == "detect_shots":
+                continue
+            row = _measure(stage, spec, path, truth.cut_times)
+            _report(row)
+            results.append(row)
+    return {
+        "meta": {
+            "git_revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+        },
+        "specs": [asdict(s) for s in specs],
+        "results": results,
+    }
+
+
+def _row_key(row: Dict[str, Any]) -> Tuple:
+    return (row["video"], row["stage"], row.get("engine"))
+
+
+def _report(row: Dict[str, Any]) -> None:
+    name = row["stage"] + (f"[{row['engine']}]" if row.get("engine") else "")
+    if "error" in row:
+        print(f"[WARN] {row['video']:>24} {name:<28} failed: {row['error']}")
+        return
+    print(f"[INFO] {row['video']:>24} {name:<28} {row['wall_s']:8.3f}s "
+          f"{row['media_s_per_s']:9.1f} media-s/s  peak {row['peak_rss_mb']:7.1f} MB")
+
+
+def compare_results(old: Dict[str, Any], new: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per (video, stage, engine) wall-time ratio new/old; >1 means slower."""
+    before = {_row_key(r): r for r in old.get("results", []) if "error" not in r}
+    rows = []
+    for r in new.get("results", []):
+        o = before.get(_row_key(r))
+        if o is None or "error" in r:
+            continue
+        rows.append({
+            "video": r["video"],
+            "stage": r["stage"],
+            "engine": r.get("engine"),
+            "wall_ratio": r["wall_s"] / o["wall_s"] if o["wall_s"] else None,
+            "rss_delta_mb": r["peak_rss_mb"] - o["peak_rss_mb"],
+        })
+    return rows
+
+
+def _parse_sizes(text: str) -> List[Tuple[int, int]]:
+    return [tuple(int(v) for v in s.lower().split("x")) for s in text.split(",") if s]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.shot_detection import ENGINE_FUNCS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON file to write")
+    parser.add_argument("--work-dir", default=os.path.join("benchmarks", ".videos"),
+                        help="where synthetic videos are rendered and reused")
+    parser.add_argument("--sizes", default="640x360,1280x720", help="comma-separated WxH list")
+    parser.add_argument("--durations", default="10,30", help="comma-separated seconds")
+    parser.add_argument("--engines", default=",".join(ENGINE_FUNCS),
+                        help="shot engines to time (comma-separated)")
+    parser.add_argument("--stages", default=",".join(["detect_shots"] + DOWNSTREAM_STAGES),
+                        help="stages to time (comma-separated)")
+    parser.add_argument("--engine-kwargs", default="{}",
+                        help='JSON of per-engine kwargs, e.g. \'{"histogram": {"threshold": 0.3}}\'')
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    specs = default_specs(_parse_sizes(args.sizes),
+                          [float(d) for d in args.durations.split(",") if d])
+    results = run_benchmarks(
+        specs,
+        engines=[e for e in args.engines.split(",") if e],
+        stages=[s for s in args.stages.split(",") if s],
+        work_dir=args.work_dir,
+        engine_kwargs=json.loads(args.engine_kwargs),
+    )
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[INFO] Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        for row in compare_results(old, results):
+            if row["wall_ratio"] is None:
+                continue
+            name = row["stage"] + (f"[{row['engine']}]" if row["engine"] else "")
+            ratio = row["wall_ratio"]
+            flag = "  <-- slower" if ratio > 1.1 else ""
+            print(f"[INFO] {row['video']:>24} {name:<28} x{ratio:.2f} wall, "
+                  f"{row['rss_delta_mb']:+.1f} MB{flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Deterministic synthetic test videos with known ground truth.
+
+Each video is a sequence of flat-coloured shots with a moving shape (so
+there is motion but no false cuts), a caption burned into every other shot,
+a cartoon face in every third shot, and an audio track alternating between
+tones and silence. Frames are written with cv2.VideoWriter and muxed with the
+audio by ffmpeg into an H.264/AAC mp4, like the files the pipeline sees in
+production. The same spec always produces the same pixels and samples.
+"""
+import json
+import os
+import subprocess
+import tempfile
+import wave
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.utils.video_probe import AudioStreamInfo, VideoProbe
+
+AUDIO_RATE = 16000
+
+
+@dataclass
+class SyntheticSpec:
+    """Parameters of one synthetic video."""
+    name: str
+    width: int = 640
+    height: int = 360
+    duration: float = 10.0
+    fps: float = 25.0
+    min_shot: float = 1.0      # shot lengths are drawn from [min_shot, max_shot]
+    max_shot: float = 4.0
+    audio_block: float = 2.0   # tone/silence alternation period
+    gop: int = 50              # keyframe interval in frames
+    seed: int = 0
+
+
+@dataclass
+class SyntheticTruth:
+    """What was rendered, in seconds."""
+    cut_times: List[float]
+    text_spans: List[Tuple[float, float, str]] = field(default_factory=list)
+    face_spans: List[Tuple[float, float]] = field(default_factory=list)
+    tone_spans: List[Tuple[float, float]] = field(default_factory=list)
+    silence_spans: List[Tuple[float, float]] = field(default_factory=list)
+
+
+def _shot_bounds(spec: SyntheticSpec) -> List[Tuple[int, int]]:
+    """Shot boundaries as [start_frame, end_frame) pairs."""
+    rng = np.random.default_rng(spec.seed)
+    total = int(round(spec.duration * spec.fps))
+    bounds, start = [], 0
+    while start < total:
+        length = int(round(rng.uniform(spec.min_shot, spec.max_shot) * spec.fps))
+        end = min(total, start + max(1, length))
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _draw_face(frame: np.ndarray, cx: int, cy: int, size: int) -> None:
+    cv2.ellipse(frame, (cx, cy), (size, int(size * 1.3)), 0, 0, 360, (150, 180, 225), -1)
+    eye_dx, eye_y, eye_r = size // 2, cy - size // 3, max(2, size // 7)
+    cv2.circle(frame, (cx - eye_dx, eye_y), eye_r, (40, 30, 30), -1)
+    cv2.circle(frame, (cx + eye_dx, eye_y), eye_r, (40, 30, 30), -1)
+    cv2.ellipse(frame, (cx, cy + size // 2), (size // 2, size // 5), 0, 0, 180,
+                (60, 60, 160), max(2, size // 12))
+
+
+def _render_frames(spec: SyntheticSpec, path: str, truth: SyntheticTruth) -> None:
+    rng = np.random.default_rng(spec.seed + 1)
+    w, h = spec.width, spec.height
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), spec.fps, (w, h))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open VideoWriter for {path}")
+    font_scale = h / 360.0
+    try:
+        for k, (start, end) in enumerate(_shot_bounds(spec)):
+            t0, t1 = start / spec.fps, end / spec.fps
+            bg = tuple(int(c) for c in rng.integers(30, 226, 3))
+            fg = tuple(255 - c for c in bg)
+            caption = f"Caption number {k}" if k % 2 == 0 else None
+            face = k % 3 == 1
+            if caption:
+                truth.text_spans.append((t0, t1, caption))
+            if face:
+                truth.face_spans.append((t0, t1))
+            for i in range(start, end):
+                frame = np.empty((h, w, 3), dtype=np.uint8)
+                frame[:] = bg
+                x = int((i * w / (2 * spec.fps)) % w)
+                cv2.circle(frame, (x, h // 4), h // 12, fg, -1)
+                if face:
+                    _draw_face(frame, w // 2, h // 2, h // 6)
+                if caption:
+                    cv2.putText(frame, caption, (w // 10, int(h * 0.9)),
+                                cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255),
+                                max(1, int(2 * font_scale)), cv2.LINE_AA)
+                writer.write(frame)
+            if k > 0:
+                truth.cut_times.append(t0)
+    finally:
+        writer.release()
+
+
+def _render_audio(spec: SyntheticSpec, path: str, truth: SyntheticTruth) -> None:
+    n = int(round(spec.duration * AUDIO_RATE))
+    t = np.arange(n) / AUDIO_RATE
+    block = np.floor(t / spec.audio_block).astype(np.int64)
+    tone = 0.3 * np.sin(2 * np.pi * (220.0 * (1 + block % 3)) * t)
+    samples = np.where(block % 2 == 0, tone, 0.0)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(AUDIO_RATE)
+        f.writeframes((samples * 32767).astype("<i2").tobytes())
+    for b in range(int(np.ceil(spec.duration / spec.audio_block))):
+        span = (b * spec.audio_block, min(spec.duration, (b + 1) * spec.audio_block))
+        (truth.tone_spans if b % 2 == 0 else truth.silence_spans).append(span)
+
+
+def make_synthetic_video(spec: SyntheticSpec, out_dir: str) -> Tuple[str, SyntheticTruth]:
+    """
+    Render `spec` to `out_dir/<name>.mp4` (reused if already present) and
+    return the path together with its ground truth.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, spec.name + ".mp4")
+    truth_path = os.path.join(out_dir, spec.name + ".truth.json")
+    if os.path.exists(path) and os.path.exists(truth_path):
+        with open(truth_path) as f:
+            saved = json.load(f)
+        if saved.get("spec") == asdict(spec):
+            return path, SyntheticTruth(**saved["truth"])
+
+    truth = SyntheticTruth(cut_times=[])
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        frames_path = os.path.join(tmp, "frames.avi")
+        audio_path = os.path.join(tmp, "audio.wav")
+        _render_frames(spec, frames_path, truth)
+        _render_audio(spec, audio_path, truth)
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-i", frames_path, "-i", audio_path,
+                "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+                "-g", str(spec.gop), "-keyint_min", str(spec.gop), "-sc_threshold", "0",
+                "-c:a", "aac", "-shortest",
+                path,
+            ],
+            check=True,
+        )
+    with open(truth_path, "w") as f:
+        json.dump({"spec": asdict(spec), "truth": asdict(truth)}, f)
+    return path, truth
+
+
+def synthetic_probe(spec: SyntheticSpec, path: str) -> VideoProbe:
+    """VideoProbe for a rendered spec, without running ffprobe."""
+    frame_count = int(round(spec.duration * spec.fps))
+    return VideoProbe(
+        path=path,
+        duration=spec.duration,
+        fps=spec.fps,
+        frame_count=frame_count,
+        width=spec.width,
+        height=spec.height,
+        codec="h264",
+        audio_streams=[AudioStreamInfo(index=1, codec="aac", sample_rate=AUDIO_RATE, channels=1)],
+        keyframes=[i / spec.fps for i in range(0, frame_count, spec.gop)],
+    )
+
+
+def default_specs(
+    resolutions: Optional[List[Tuple[int, int]]] = None,
+    durations: Optional[List[float]] = None,
+) -> List[SyntheticSpec]:
+    """One spec per resolution x duration."""
+    specs = []
+    for w, h in resolutions or [(640, 360), (1280, 720)]:
+        for d in durations or [10.0, 30.0]:
+            specs.append(SyntheticSpec(name=f"synth_{w}x{h}_{int(d)}s", width=w, height=h, duration=d))
+    return specs
@@ -3,6 +3,10 @@ SHOT_ENGINE_CONFIGS = {
         "engine": "pyscenedetect",
         "params": {"threshold": 27.0, "min_scene_len": 15},
     },
+    "fast_histogram": {
+        "engine": "histogram",
+        "params": {},
+    },
     "fast_ffmpeg": {
         "engine": "ffmpeg",
         "params": {"scene_threshold": 0.4},
@@ -11,4 +15,54 @@ SHOT_ENGINE_CONFIGS = {
         "engine": "transnetv2",
         "params": {"probability_threshold": 0.6, "min_gap_frames": 5},
     },
+    # histogram everywhere, TransNet only around borderline scores
+    "cascade": {
+        "engine": "cascade",
+        "params": {"cheap_engine": "histogram", "probability_threshold": 0.6, "min_gap_frames": 5},
+    },
+}
+
+# Analysis profiles: per-stage settings for analyze_video(profile=...), ordered
+# cheapest first. `budget` mode picks the last one expected to fit the
+# latency target. stage_costs are nominal wall seconds per media-second at
+# 720p (per stage, see src.utils.profiles); measured rates replace them.
+ANALYSIS_PROFILES = {
+    "interactive": {
+        "shot_preset": "fast_histogram",
+        "shot_params": {"min_scene_len": 8, "adaptive_window": 4},  # in sampled frames
+        "frame_step": 2,
+        "face_detector": "haar",
+        "analysis_width": 320,
+        "overlay_sample_fps": None,
+        "audio_hop_ms": 500,
+        "stage_costs": {"detect_shots": 0.04, "classify_shots+extract_ocr": 0.03,
+                        "extract_audio_segments": 0.01},
+    },
+    "fast": {
+        "shot_preset": "fast_ffmpeg",
+        "face_detector": "haar",
+        "analysis_width": 480,
+        "overlay_sample_fps": 0.5,
+        "audio_hop_ms": 500,
+        "stage_costs": {"detect_shots": 0.08, "classify_shots+extract_ocr": 0.08,
+                        "extract_audio_segments": 0.01},
+    },
+    "balanced": {
+        "shot_preset": "cascade",
+        "face_detector": "dnn",
+        "analysis_width": 640,
+        "overlay_sample_fps": 1.0,
+        "audio_hop_ms": 500,
+        "stage_costs": {"detect_shots": 0.12, "classify_shots+extract_ocr": 0.15,
+                        "extract_audio_segments": 0.01},
+    },
+    "full": {
+        "shot_preset": "high_precision",
+        "face_detector": "dnn",
+        "analysis_width": 960,
+        "overlay_sample_fps": 2.0,
+        "audio_hop_ms": 250,
+        "stage_costs": {"detect_shots": 0.4, "classify_shots+extract_ocr": 0.3,
+                        "extract_audio_segments": 0.02},
+    },
 }
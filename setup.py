@@ -9,9 +9,14 @@ setup(
         "numpy>=1.21.0",
         "opencv-python>=4.5.0",
         "pytesseract>=0.3.8",
-        "pydub>=0.25.1",
         "ffmpeg-python>=0.2.0",
         "python-dotenv>=0.19.0",
     ],
+    extras_require={
+        # persistent in-process tesseract handles for the OCR worker pool
+        "fast-ocr": ["tesserocr>=2.5"],
+        # compact binary result files (batch_analysis.py --format msgpack)
+        "msgpack": ["msgpack>=1.0"],
+    },
     python_requires=">=3.8",
 )
\ No newline at end of file
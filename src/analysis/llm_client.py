@@ -0,0 +1,170 @@
+"""
+Minimal client for OpenAI-compatible chat completion endpoints.
+
+Uses only the standard library: keep-alive connections are pooled per
+client, the number of requests in flight is capped by a semaphore (the pool
+size), and transient failures (connection errors, 408/409/429/5xx) are
+retried with exponential backoff and jitter, honouring Retry-After.
+"""
+import http.client
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+LLM_BASE_URL_ENV = "EDITDNA_LLM_BASE_URL"
+LLM_API_KEY_ENV = "EDITDNA_LLM_API_KEY"
+LLM_MODEL_ENV = "EDITDNA_LLM_MODEL"
+LLM_MAX_CONCURRENCY_ENV = "EDITDNA_LLM_MAX_CONCURRENCY"
+
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(RuntimeError):
+    """Request failed for good (non-retryable status or retries exhausted)."""
+
+
+class LLMClient:
+    """Thread-safe chat-completions client with a bounded connection pool."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: float = 120.0,
+        max_retries: int = 4,
+        backoff: float = 1.0,
+        max_backoff: float = 30.0,
+    ):
+        base_url = base_url or os.environ.get(LLM_BASE_URL_ENV)
+        if not base_url:
+            raise ValueError(f"No LLM endpoint configured (set {LLM_BASE_URL_ENV})")
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported LLM endpoint: {base_url}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._path = parts.path  # e.g. "/v1"
+        self.api_key = api_key or os.environ.get(LLM_API_KEY_ENV) or os.environ.get("OPENAI_API_KEY")
+        self.model = model or os.environ.get(LLM_MODEL_ENV) or "gpt-4.1-mini"
+        self.max_concurrency = max_concurrency or int(os.environ.get(LLM_MAX_CONCURRENCY_ENV, "4"))
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self.requests_sent = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            return cls(self._host, self._port, timeout=self.timeout)
+
+    def _post_once(self, path: str, body: bytes) -> Any:
+        """One request on a pooled connection; returns (status, headers, body)."""
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        conn = self._connect()
+        try:
+            conn.request("POST", self._path + path, body=body, headers=headers)
+            resp = conn.getresponse()
+            payload = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        self.requests_sent += 1
+        if resp.will_close:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        return resp.status, resp.headers, payload
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        base = min(self.max_backoff, self.backoff * (2 ** attempt))
+        return base * (0.5 + random.random() / 2)
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST `payload` to `path` under the base URL, with retries."""
+        body = json.dumps(payload).encode()
+        with self._slots:
+            attempt = 0
+            while True:
+                retry_after = None
+                try:
+                    status, headers, data = self._post_once(path, body)
+                except (OSError, http.client.HTTPException) as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if 200 <= status < 300:
+                        return json.loads(data)
+                    error = f"HTTP {status}: {data[:200].decode(errors='replace')}"
+                    if status not in RETRY_STATUS:
+                        raise LLMError(error)
+                    retry_after = headers.get("Retry-After")
+                if attempt >= self.max_retries:
+                    raise LLMError(f"Giving up after {attempt + 1} attempts: {error}")
+                delay = self._delay(attempt, retry_after)
+                print(f"[WARN] LLM request failed ({error}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        temperature: float = 0.2,
+        json_mode: bool = True,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Run one chat completion and return the first choice's content."""
+        payload: Dict[str, Any] = {
+            "model": model or self.model,
+            "messages": messages,
+            "temperature": temperature,
+        }
+        if json_mode:
+            payload["response_format"] = {"type": "json_object"}
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        response = self.post_json("/chat/completions", payload)
+        try:
+            return response["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise LLMError(f"Unexpected completion response: {str(response)[:200]}")
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client() -> Optional[LLMClient]:
+    """Shared client built from the environment, or None if no endpoint is set."""
+    global _llm_client
+    if _llm_client is None and os.environ.get(LLM_BASE_URL_ENV):
+        with _llm_client_lock:
+            if _llm_client is None:
+                _llm_client = LLMClient()
+    return _llm_client
@@ -1,26 +1,24 @@
 """
 LLM integration for generating editing blueprints.
 """
-from typing import Dict, Any
+import hashlib
+import json
+from typing import Dict, Any, Optional
+from .llm_client import LLMClient, LLMError, get_llm_client
+from .prompt_compaction import compact_analysis, estimate_tokens
+from ..utils.stage_cache import StageCache
 
-def call_llm_blueprint(
-    analysis_json: Dict[str, Any],
-    model_name: str = "gpt-4.1-mini"
-) -> Dict[str, Any]:
-    """
-    Generate editing blueprint using LLM.
-    
-    Args:
-        analysis_json: Analysis results
-        model_name: Name of the LLM model to use
-        
-    Returns:
-        Editing blueprint as a dictionary
-    """
-    # TODO: Implement actual LLM integration
-    print(f"[INFO] Generating editing blueprint using {model_name}...")
-    
-    # Placeholder response - replace with actual LLM call
+SYSTEM_PROMPT = (
+    "You are a video editor. You receive a compact analysis of a video: edit "
+    "statistics, shot and audio timelines as run-length [label, t_start, t_end, "
+    "count] entries or time bins [t_start, t_end, dominant_label, share, "
+    "changes], and distinct on-screen texts. Reply with a JSON object with the "
+    "keys editing_style, recommended_aspect_ratio, music_suggestion, "
+    "transitions (list of {type, usage}), color_grading ({style, brightness, "
+    "contrast, saturation}) and text_overlays ({style, font, animation})."
+)
+
+def _placeholder_blueprint() -> Dict[str, Any]:
     return {
         "editing_style": "dynamic",
         "recommended_aspect_ratio": "16:9",
@@ -40,4 +38,61 @@ def call_llm_blueprint(
             "font": "sans-serif",
             "animation": "fade"
         }
-    }
\ No newline at end of file
+    }
+
+def call_llm_blueprint(
+    analysis_json: Dict[str, Any],
+    model_name: Optional[str] = None,
+    client: Optional[LLMClient] = None,
+    cache: Optional[StageCache] = None,
+    token_budget: int = 3000,
+) -> Dict[str, Any]:
+    """
+    Generate editing blueprint using LLM.
+
+    The analysis is compacted to fit `token_budget` before it is sent, and
+    responses are cached on the compacted prompt + model, so re-running an
+    unchanged video (or one whose compact form is unchanged) costs no call.
+
+    Args:
+        analysis_json: Analysis results
+        model_name: Name of the LLM model to use; defaults to the client's
+        client: LLMClient to use; defaults to the shared client configured
+            from EDITDNA_LLM_BASE_URL. Without one a placeholder is returned.
+        cache: StageCache for responses
+        token_budget: Approximate token budget for the analysis payload
+
+    Returns:
+        Editing blueprint as a dictionary
+    """
+    client = client or get_llm_client()
+    if client is None:
+        print("[WARN] No LLM endpoint configured; returning placeholder blueprint")
+        return _placeholder_blueprint()
+
+    model = model_name or client.model
+    compact = compact_analysis(analysis_json, token_budget=token_budget)
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": json.dumps(compact, separators=(",", ":"))},
+    ]
+    prompt_key = hashlib.blake2b(
+        json.dumps([model, messages], sort_keys=True).encode(), digest_size=20
+    ).hexdigest()
+    if cache is not None:
+        cached = cache.get("call_llm_blueprint", prompt_key, {"model": model})
+        if cached is not None:
+            print(f"[INFO] Editing blueprint for {model} served from cache")
+            return cached
+
+    print(f"[INFO] Generating editing blueprint using {model} "
+          f"(~{estimate_tokens(messages[1]['content'])} prompt tokens) ...")
+    content = client.chat(messages, model=model)
+    try:
+        blueprint = json.loads(content)
+    except json.JSONDecodeError:
+        raise LLMError(f"Blueprint is not valid JSON: {content[:200]}")
+
+    if cache is not None:
+        cache.put("call_llm_blueprint", prompt_key, {"model": model}, blueprint)
+    return blueprint
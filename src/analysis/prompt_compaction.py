@@ -0,0 +1,182 @@
+"""
+Compact analysis_json into an LLM prompt payload within a token budget.
+
+The full analysis carries one entry per shot, per 500 ms audio window and
+per OCR word box, which is far more than a model needs to suggest an edit.
+The compacted form keeps the edit statistics, turns shots and audio windows
+into run-length timelines (coarsened into time bins when there are too many
+runs), and keeps each distinct overlay text once without boxes. Detail is
+reduced step by step until the payload fits `token_budget`.
+"""
+import json
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+CHARS_PER_TOKEN = 4  # rough average for English/JSON with BPE tokenizers
+QUIET_DB = -50.0
+
+Run = Tuple[str, float, float, int]  # label, t_start, t_end, items merged
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Cheap token estimate of a JSON payload (compact separators)."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, separators=(",", ":"))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _runs(items: List[Tuple[str, float, float]]) -> List[Run]:
+    """Merge consecutive items with the same label."""
+    runs: List[Run] = []
+    for label, t0, t1 in items:
+        if runs and runs[-1][0] == label:
+            prev = runs[-1]
+            runs[-1] = (label, prev[1], t1, prev[3] + 1)
+        else:
+            runs.append((label, t0, t1, 1))
+    return runs
+
+
+def _bin_runs(runs: List[Run], n_bins: int) -> List[List[Any]]:
+    """
+    Summarize runs into `n_bins` equal time bins:
+    [t_start, t_end, dominant label, share of dominant label, runs starting in bin].
+    """
+    if not runs:
+        return []
+    labels = sorted({r[0] for r in runs})
+    codes = np.array([labels.index(r[0]) for r in runs])
+    t0 = np.array([r[1] for r in runs])
+    t1 = np.array([r[2] for r in runs])
+    edges = np.linspace(t0[0], t1[-1], n_bins + 1)
+    lo, hi = edges[:-1, None], edges[1:, None]
+    # [bins, runs] seconds of each run inside each bin
+    overlap = np.clip(np.minimum(t1, hi) - np.maximum(t0, lo), 0.0, None)
+    per_label = np.zeros((n_bins, len(labels)))
+    for code in range(len(labels)):
+        per_label[:, code] = overlap[:, codes == code].sum(axis=1)
+    starts = np.histogram(t0, bins=edges)[0]
+    width = np.maximum(edges[1:] - edges[:-1], 1e-9)
+    bins = []
+    for b in range(n_bins):
+        if per_label[b].sum() <= 0:
+            continue
+        code = int(per_label[b].argmax())
+        bins.append([round(float(edges[b]), 2), round(float(edges[b + 1]), 2), labels[code],
+                     round(float(per_label[b, code] / width[b]), 2), int(starts[b])])
+    return bins
+
+
+def _timeline(runs: List[Run], max_runs: int) -> Dict[str, Any]:
+    if len(runs) <= max_runs:
+        return {"runs": [[label, round(t0, 2), round(t1, 2), n] for label, t0, t1, n in runs]}
+    return {"bins": _bin_runs(runs, max_runs)}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    arr = np.asarray(values, dtype=np.float64)
+    p10, p50, p90 = np.percentile(arr, [10, 50, 90])
+    return {
+        "min": round(float(arr.min()), 2),
+        "p10": round(float(p10), 2),
+        "median": round(float(p50), 2),
+        "p90": round(float(p90), 2),
+        "max": round(float(arr.max()), 2),
+    }
+
+
+def _audio_label(seg: Dict[str, Any]) -> str:
+    if seg.get("loudness_db", 0.0) <= QUIET_DB:
+        return "silence"
+    flags = [name for name in ("speech", "music", "sfx") if seg.get(f"has_{name}")]
+    return "+".join(flags) or "other"
+
+
+def _overlay_entries(analysis: Dict[str, Any], max_chars: int) -> List[List[Any]]:
+    """Distinct overlay texts: [t_start, t_end, position, text]."""
+    blocks = analysis.get("overlay_text_blocks") or []
+    if not blocks:
+        # fall back to the per-shot OCR words
+        blocks = []
+        for shot in analysis.get("shots", []):
+            words = [o.get("text", "") for o in shot.get("overlay_text") or []]
+            if words:
+                blocks.append({"t_start": shot["t_start"], "t_end": shot["t_end"],
+                               "position": "", "text": " ".join(words)})
+    seen = set()
+    entries = []
+    for b in blocks:
+        text = " ".join(str(b.get("text", "")).split())[:max_chars]
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        entries.append([round(b["t_start"], 2), round(b["t_end"], 2), b.get("position", ""), text])
+    return entries
+
+
+def _truncate(value: Any, max_chars: int) -> Any:
+    text = json.dumps(value, separators=(",", ":"))
+    if len(text) <= max_chars:
+        return value
+    return text[:max_chars] + "..."
+
+
+def compact_analysis(
+    analysis_json: Dict[str, Any],
+    token_budget: int = 3000,
+    max_runs: int = 120,
+    max_overlays: int = 60,
+    max_text_chars: int = 80,
+    max_transcript_chars: int = 4000,
+) -> Dict[str, Any]:
+    """
+    Build the compact prompt payload for `analysis_json`.
+
+    Starts from the given detail limits and halves them until the estimated
+    token count fits `token_budget` (or the limits bottom out).
+    """
+    shots = analysis_json.get("shots", [])
+    segments = analysis_json.get("audio_pattern", {}).get("segments", [])
+    shot_runs = _runs([(s.get("shot_type") or "UNKNOWN", s["t_start"], s["t_end"]) for s in shots])
+    audio_runs = _runs([(_audio_label(a), a["t_start"], a["t_end"]) for a in segments])
+    loud = [a["loudness_db"] for a in segments if a.get("loudness_db", QUIET_DB) > QUIET_DB]
+    audio_seconds = sum(a["t_end"] - a["t_start"] for a in segments) or 1.0
+
+    def ratio(flag: str) -> float:
+        return round(sum(a["t_end"] - a["t_start"] for a in segments if a.get(flag)) / audio_seconds, 3)
+
+    video = analysis_json.get("video", {})
+    base = {
+        "video": {"title": video.get("title"), "duration_seconds": video.get("duration_seconds")},
+        "edit_stats": analysis_json.get("edit_stats", {}),
+        "shot_length_s": _percentiles([s["t_end"] - s["t_start"] for s in shots]),
+        "audio_stats": {
+            "speech_ratio": ratio("has_speech"),
+            "music_ratio": ratio("has_music"),
+            "sfx_ratio": ratio("has_sfx"),
+            "silence_ratio": round(sum(r[2] - r[1] for r in audio_runs if r[0] == "silence")
+                                   / audio_seconds, 3),
+            "loudness_db": _percentiles(loud),
+        },
+    }
+    transcript = analysis_json.get("transcript_outline") or {}
+
+    while True:
+        compact = dict(base)
+        compact["shot_timeline"] = _timeline(shot_runs, max_runs)
+        compact["audio_timeline"] = _timeline(audio_runs, max_runs)
+        compact["overlay_text"] = _overlay_entries(analysis_json, max_text_chars)[:max_overlays]
+        if transcript:
+            compact["transcript_outline"] = _truncate(transcript, max_transcript_chars)
+        if estimate_tokens(compact) <= token_budget:
+            return compact
+        if max_runs <= 4 and max_overlays <= 4 and max_transcript_chars <= 200:
+            print(f"[WARN] Compacted analysis still ~{estimate_tokens(compact)} tokens "
+                  f"(budget {token_budget})")
+            return compact
+        max_runs = max(4, max_runs // 2)
+        max_overlays = max(4, max_overlays // 2)
+        max_text_chars = max(40, max_text_chars // 2)
+        max_transcript_chars = max(200, max_transcript_chars // 2)
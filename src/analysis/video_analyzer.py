@@ -1,37 +1,47 @@
 """
 Video analysis and statistics generation.
 """
-from typing import Dict, Any, List
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional, Union
 import numpy as np
-from ..models.data_models import Shot, AudioSegmentInfo
+from ..models.data_models import Shot, AudioSegmentInfo, OverlayTextBlock
+from ..models.tables import (
+    AudioSegmentTable, ShotTable, MUSIC, NO_FACES, NO_TYPE, SFX, SPEECH,
+)
 
 def build_analysis_json(
     video_meta: Dict[str, Any],
-    shots: List[Shot],
-    audio_segments: List[AudioSegmentInfo],
-    transcript_outline: Dict[str, Any]
+    shots: Union[List[Shot], ShotTable],
+    audio_segments: Union[List[AudioSegmentInfo], AudioSegmentTable],
+    transcript_outline: Dict[str, Any],
+    overlay_blocks: Optional[List[OverlayTextBlock]] = None,
 ) -> Dict[str, Any]:
     """
     Build comprehensive analysis JSON from processed data.
     
     Args:
         video_meta: Video metadata
-        shots: List of processed shots
-        audio_segments: List of audio segments
+        shots: Processed shots (list or ShotTable)
+        audio_segments: Audio segments (list or AudioSegmentTable)
         transcript_outline: Transcript data
+        overlay_blocks: Overlay text spans from extract_overlay_blocks
         
     Returns:
         Analysis results as a dictionary
     """
     duration = video_meta.get("duration_seconds", 0.0)
-    shot_lengths = [s.t_end - s.t_start for s in shots] or [0.0]
-    total_time = sum(shot_lengths) or 1.0
+    shot_table = ShotTable.from_shots(shots)
+    audio_table = AudioSegmentTable.from_segments(audio_segments)
+
+    # Calculate statistics (one pass over the arrays, bincount per type)
+    shot_lengths = shot_table.durations if len(shot_table) else np.zeros(1)
+    total_time = float(shot_lengths.sum()) or 1.0
+    type_seconds = shot_table.seconds_by_type()
 
-    # Calculate statistics
     def ratio_for_type(t):
-        return float(sum(
-            (s.t_end - s.t_start) for s in shots if s.shot_type == t
-        ) / total_time)
+        return type_seconds.get(t, 0.0) / total_time
+
+    faces = [None if f == NO_FACES else f for f in shot_table.faces.tolist()]
 
     # Build the analysis dictionary
     analysis = {
@@ -43,35 +53,51 @@ def build_analysis_json(
             "metrics": video_meta.get("metrics", {})
         },
         "edit_stats": {
-            "total_shots": len(shots),
+            "total_shots": len(shot_table),
             "avg_shot_length": float(np.mean(shot_lengths)),
             "median_shot_length": float(np.median(shot_lengths)),
             "talking_head_ratio": ratio_for_type("TALKING_HEAD"),
             "broll_ratio": ratio_for_type("BROLL"),
-            "screen_record_ratio": ratio_for_type("SCREEN") if any(s.shot_type == "SCREEN" for s in shots) else 0.0,
+            "screen_record_ratio": ratio_for_type("SCREEN"),
         },
         "shots": [
             {
-                "index": s.index,
-                "t_start": s.t_start,
-                "t_end": s.t_end,
-                "shot_type": s.shot_type,
-                "faces_present": s.faces_present,
-                "overlay_text": s.overlay_texts or []
+                "index": index,
+                "t_start": t_start,
+                "t_end": t_end,
+                "shot_type": None if code == NO_TYPE else shot_table.type_names[code],
+                "faces_present": faces_present,
+                "overlay_text": overlay or []
             }
-            for s in shots
+            for index, t_start, t_end, code, faces_present, overlay in zip(
+                shot_table.index.tolist(),
+                shot_table.t_start.tolist(),
+                shot_table.t_end.tolist(),
+                shot_table.type_code.tolist(),
+                faces,
+                shot_table.overlay_texts,
+            )
         ],
         "audio_pattern": {
             "segments": [{
-                "index": seg.index,
-                "t_start": seg.t_start,
-                "t_end": seg.t_end,
-                "has_speech": seg.has_speech,
-                "has_music": seg.has_music,
-                "has_sfx": seg.has_sfx,
-                "loudness_db": seg.loudness_db
-            } for seg in audio_segments]
+                "index": index,
+                "t_start": t_start,
+                "t_end": t_end,
+                "has_speech": has_speech,
+                "has_music": has_music,
+                "has_sfx": has_sfx,
+                "loudness_db": loudness_db
+            } for index, t_start, t_end, has_speech, has_music, has_sfx, loudness_db in zip(
+                range(len(audio_table)),
+                audio_table.t_start.tolist(),
+                audio_table.t_end.tolist(),
+                audio_table.flag(SPEECH).tolist(),
+                audio_table.flag(MUSIC).tolist(),
+                audio_table.flag(SFX).tolist(),
+                audio_table.loudness_db.tolist(),
+            )]
         },
+        "overlay_text_blocks": [asdict(b) for b in overlay_blocks or []],
         "transcript_outline": transcript_outline or {}
     }
 
@@ -0,0 +1,284 @@
+"""
+Columnar, NumPy-backed containers for shots and audio segments.
+
+A long video produces tens of thousands of audio windows; holding each as a
+dataclass costs a few hundred bytes per row and every statistic becomes a
+Python loop. The tables below store one array per field instead and hand
+out lightweight row views with the same attributes as Shot and
+AudioSegmentInfo, so code that iterates or indexes keeps working.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from .data_models import Shot, AudioSegmentInfo
+
+SHOT_TYPES = ("UNKNOWN", "TALKING_HEAD", "BROLL", "SCREEN")
+NO_TYPE = -1    # shot_type None
+NO_FACES = -1   # faces_present None
+
+SPEECH, MUSIC, SFX = 1, 2, 4  # AudioSegmentTable.flags bits
+
+
+class ShotRow:
+    """View of one ShotTable row; reads and writes go to the table."""
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "ShotTable", i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def index(self) -> int:
+        return int(self._table.index[self._i])
+
+    @index.setter
+    def index(self, value: int) -> None:
+        self._table.index[self._i] = value
+
+    @property
+    def t_start(self) -> float:
+        return float(self._table.t_start[self._i])
+
+    @t_start.setter
+    def t_start(self, value: float) -> None:
+        self._table.t_start[self._i] = value
+
+    @property
+    def t_end(self) -> float:
+        return float(self._table.t_end[self._i])
+
+    @t_end.setter
+    def t_end(self, value: float) -> None:
+        self._table.t_end[self._i] = value
+
+    @property
+    def shot_type(self) -> Optional[str]:
+        code = int(self._table.type_code[self._i])
+        return None if code == NO_TYPE else self._table.type_names[code]
+
+    @shot_type.setter
+    def shot_type(self, value: Optional[str]) -> None:
+        self._table.type_code[self._i] = self._table.type_to_code(value)
+
+    @property
+    def faces_present(self) -> Optional[int]:
+        faces = int(self._table.faces[self._i])
+        return None if faces == NO_FACES else faces
+
+    @faces_present.setter
+    def faces_present(self, value: Optional[int]) -> None:
+        self._table.faces[self._i] = NO_FACES if value is None else value
+
+    @property
+    def overlay_texts(self) -> Optional[List[Dict[str, Any]]]:
+        return self._table.overlay_texts[self._i]
+
+    @overlay_texts.setter
+    def overlay_texts(self, value: Optional[List[Dict[str, Any]]]) -> None:
+        self._table.overlay_texts[self._i] = value
+
+    def to_shot(self) -> Shot:
+        return Shot(self.index, self.t_start, self.t_end, self.shot_type,
+                    self.faces_present, self.overlay_texts)
+
+    def __repr__(self) -> str:
+        return f"ShotRow({self.to_shot()!r})"
+
+
+class ShotTable:
+    """Shots as parallel arrays (start/end, type codes, face counts)."""
+
+    def __init__(
+        self,
+        t_start: np.ndarray,
+        t_end: np.ndarray,
+        type_code: Optional[np.ndarray] = None,
+        faces: Optional[np.ndarray] = None,
+        index: Optional[np.ndarray] = None,
+        overlay_texts: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+        type_names: Iterable[str] = SHOT_TYPES,
+    ):
+        n = len(t_start)
+        self.t_start = np.asarray(t_start, dtype=np.float64)
+        self.t_end = np.asarray(t_end, dtype=np.float64)
+        self.type_code = (np.full(n, NO_TYPE, dtype=np.int8) if type_code is None
+                          else np.asarray(type_code, dtype=np.int8))
+        self.faces = (np.full(n, NO_FACES, dtype=np.int32) if faces is None
+                      else np.asarray(faces, dtype=np.int32))
+        self.index = (np.arange(n, dtype=np.int32) if index is None
+                      else np.asarray(index, dtype=np.int32))
+        self.overlay_texts = list(overlay_texts) if overlay_texts is not None else [None] * n
+        self.type_names = list(type_names)
+
+    @classmethod
+    def from_shots(cls, shots: Iterable[Any]) -> "ShotTable":
+        """Build from Shot objects (or anything with the same attributes)."""
+        if isinstance(shots, cls):
+            return shots
+        shots = list(shots)
+        table = cls(
+            t_start=np.fromiter((s.t_start for s in shots), np.float64, len(shots)),
+            t_end=np.fromiter((s.t_end for s in shots), np.float64, len(shots)),
+            index=np.fromiter((s.index for s in shots), np.int32, len(shots)),
+            faces=np.fromiter(
+                (NO_FACES if s.faces_present is None else s.faces_present for s in shots),
+                np.int32, len(shots),
+            ),
+            overlay_texts=[s.overlay_texts for s in shots],
+        )
+        table.type_code = np.fromiter(
+            (table.type_to_code(s.shot_type) for s in shots), np.int8, len(shots)
+        )
+        return table
+
+    def type_to_code(self, name: Optional[str]) -> int:
+        if name is None:
+            return NO_TYPE
+        try:
+            return self.type_names.index(name)
+        except ValueError:
+            self.type_names.append(name)
+            return len(self.type_names) - 1
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.t_end - self.t_start
+
+    def seconds_by_type(self) -> Dict[str, float]:
+        """Total duration per shot type (shots without a type are skipped)."""
+        typed = self.type_code >= 0
+        totals = np.bincount(self.type_code[typed], weights=self.durations[typed],
+                             minlength=len(self.type_names))
+        return {name: float(totals[i]) for i, name in enumerate(self.type_names)}
+
+    def to_shots(self) -> List[Shot]:
+        return [row.to_shot() for row in self]
+
+    def __len__(self) -> int:
+        return len(self.t_start)
+
+    def __getitem__(self, i: int) -> ShotRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return ShotRow(self, i)
+
+    def __iter__(self) -> Iterator[ShotRow]:
+        return (ShotRow(self, i) for i in range(len(self)))
+
+
+class AudioSegmentRow:
+    """Read-only view of one AudioSegmentTable row."""
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table: "AudioSegmentTable", i: int):
+        self._table = table
+        self._i = i
+
+    @property
+    def index(self) -> int:
+        return self._i
+
+    @property
+    def t_start(self) -> float:
+        return float(self._table.t_start[self._i])
+
+    @property
+    def t_end(self) -> float:
+        return float(self._table.t_end[self._i])
+
+    @property
+    def loudness_db(self) -> float:
+        return float(self._table.loudness_db[self._i])
+
+    @property
+    def has_speech(self) -> bool:
+        return bool(self._table.flags[self._i] & SPEECH)
+
+    @property
+    def has_music(self) -> bool:
+        return bool(self._table.flags[self._i] & MUSIC)
+
+    @property
+    def has_sfx(self) -> bool:
+        return bool(self._table.flags[self._i] & SFX)
+
+    def to_segment(self) -> AudioSegmentInfo:
+        return AudioSegmentInfo(self.index, self.t_start, self.t_end, self.has_speech,
+                                self.has_music, self.has_sfx, self.loudness_db)
+
+    def __repr__(self) -> str:
+        return f"AudioSegmentRow({self.to_segment()!r})"
+
+
+class AudioSegmentTable:
+    """Audio windows as parallel arrays; speech/music/sfx packed into `flags`."""
+
+    def __init__(
+        self,
+        t_start: np.ndarray,
+        t_end: np.ndarray,
+        loudness_db: np.ndarray,
+        flags: Optional[np.ndarray] = None,
+    ):
+        self.t_start = np.asarray(t_start, dtype=np.float64)
+        self.t_end = np.asarray(t_end, dtype=np.float64)
+        self.loudness_db = np.asarray(loudness_db, dtype=np.float64)
+        self.flags = (np.zeros(len(self.t_start), dtype=np.uint8) if flags is None
+                      else np.asarray(flags, dtype=np.uint8))
+
+    @classmethod
+    def empty(cls) -> "AudioSegmentTable":
+        return cls(np.empty(0), np.empty(0), np.empty(0))
+
+    @classmethod
+    def concatenate(cls, tables: List["AudioSegmentTable"]) -> "AudioSegmentTable":
+        if not tables:
+            return cls.empty()
+        return cls(
+            np.concatenate([t.t_start for t in tables]),
+            np.concatenate([t.t_end for t in tables]),
+            np.concatenate([t.loudness_db for t in tables]),
+            np.concatenate([t.flags for t in tables]),
+        )
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "AudioSegmentTable":
+        """Build from AudioSegmentInfo objects (or anything with the same attributes)."""
+        if isinstance(segments, cls):
+            return segments
+        segments = list(segments)
+        n = len(segments)
+        flags = np.fromiter(
+            (SPEECH * bool(s.has_speech) | MUSIC * bool(s.has_music) | SFX * bool(s.has_sfx)
+             for s in segments),
+            np.uint8, n,
+        )
+        return cls(
+            np.fromiter((s.t_start for s in segments), np.float64, n),
+            np.fromiter((s.t_end for s in segments), np.float64, n),
+            np.fromiter((s.loudness_db for s in segments), np.float64, n),
+            flags,
+        )
+
+    def flag(self, bit: int) -> np.ndarray:
+        """Boolean array of one flag (SPEECH, MUSIC or SFX)."""
+        return (self.flags & bit) != 0
+
+    def to_segments(self) -> List[AudioSegmentInfo]:
+        return [row.to_segment() for row in self]
+
+    def __len__(self) -> int:
+        return len(self.t_start)
+
+    def __getitem__(self, i: int) -> AudioSegmentRow:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return AudioSegmentRow(self, i)
+
+    def __iter__(self) -> Iterator[AudioSegmentRow]:
+        return (AudioSegmentRow(self, i) for i in range(len(self)))
@@ -0,0 +1,179 @@
+"""
+Speech / music / sfx flags for audio windows from one batched STFT.
+
+Each PCM chunk is framed once (32 ms frames at 16 kHz, 10 ms hop) and transformed
+with a single rfft call. Every per-frame feature is derived from that one
+magnitude spectrogram (plus the same time-domain frames for the zero
+crossing rate), and per-window statistics are cumulative sums over frames,
+so the cost per window is a few array lookups.
+
+Frames sit on a fixed FRAME_HOP_MS grid counted from the start of the
+stream, whatever the window hop, and window features only use frames that
+lie entirely inside the window, so the result does not depend on how the
+audio was chunked.
+"""
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ..models.tables import SPEECH, MUSIC, SFX
+
+FRAME_MS = 25
+FRAME_HOP_MS = 10
+SPEECH_BAND_HZ = (300.0, 3400.0)
+FLATNESS_BAND_HZ = (100.0, 8000.0)
+
+VAD_THRESHOLD_DB = -45.0    # frame energy (dBFS) counted as activity
+MIN_ACTIVE_RATIO = 0.2      # share of active frames for a window to count as audible
+SPEECH_MIN_BAND_RATIO = 0.5
+SPEECH_MIN_MODULATION_DB = 4.0   # syllables: frame energy varies a lot
+SPEECH_MAX_ZCR = 0.25
+MUSIC_MIN_TONALITY = 0.6
+MUSIC_MAX_FLUX = 0.25
+MUSIC_MAX_MODULATION_DB = 6.0
+
+_FULL_SCALE = 32768.0
+_EPS = 1e-10
+
+FEATURES = ("active", "energy_db", "flux", "zcr", "speech_ratio", "tonality")
+
+
+def stft_params(sample_rate: int):
+    """(n_fft, frame_hop): FRAME_MS rounded up to a power of two, and FRAME_HOP_MS."""
+    n_fft = 1 << int(np.ceil(np.log2(max(16, sample_rate * FRAME_MS // 1000))))
+    frame_hop = max(1, sample_rate * FRAME_HOP_MS // 1000)
+    return n_fft, frame_hop
+
+
+def frame_features(samples: np.ndarray, sample_rate: int, n_fft: int, frame_hop: int) -> Dict[str, np.ndarray]:
+    """
+    Per-frame features of frames starting every `frame_hop` samples.
+
+    One rfft over all frames; energy, speech-band ratio, flatness (tonality)
+    and flux come from the same magnitude spectrogram. flux[j] compares
+    frame j with frame j - 1 (0 for the first frame).
+    """
+    if len(samples) < n_fft:
+        return {name: np.zeros(0, dtype=np.float32) for name in FEATURES}
+    x = samples.astype(np.float32) / _FULL_SCALE
+    frames = sliding_window_view(x, n_fft)[::frame_hop]            # [F, n_fft] view
+    window = np.hanning(n_fft).astype(np.float32)
+    mag = np.abs(np.fft.rfft(frames * window, axis=1)).astype(np.float32)  # [F, bins]
+    power = mag * mag
+
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    total = power.sum(axis=1) + _EPS
+    # Parseval with the Hann window's energy: mean square of the frame
+    energy_db = 10.0 * np.log10(total / (n_fft * float((window ** 2).sum())) * 2.0 + _EPS)
+
+    lo, hi = SPEECH_BAND_HZ
+    speech_ratio = power[:, (freqs >= lo) & (freqs <= hi)].sum(axis=1) / total
+
+    lo, hi = FLATNESS_BAND_HZ
+    band = power[:, (freqs >= lo) & (freqs <= hi)] + _EPS
+    flatness = np.exp(np.log(band).mean(axis=1)) / band.mean(axis=1)
+    tonality = 1.0 - flatness
+
+    flux = np.zeros(len(mag), dtype=np.float32)
+    if len(mag) > 1:
+        rise = np.maximum(mag[1:] - mag[:-1], 0.0).sum(axis=1)
+        flux[1:] = rise / (mag[1:].sum(axis=1) + _EPS)
+
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(n_fft - 1)
+
+    return {
+        "active": (energy_db > VAD_THRESHOLD_DB).astype(np.float32),
+        "energy_db": energy_db.astype(np.float32),
+        "flux": flux,
+        "zcr": zcr.astype(np.float32),
+        "speech_ratio": speech_ratio.astype(np.float32),
+        "tonality": tonality.astype(np.float32),
+    }
+
+
+def window_features(
+    samples: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray,
+    sample_rate: int,
+    offset: int = 0,
+) -> Dict[str, np.ndarray]:
+    """
+    Per-window features over each window [starts, ends) of `samples` (sample
+    offsets into `samples`): the share of active frames, mean frame energy,
+    the means of zcr / speech_ratio / tonality / flux over active frames and
+    `modulation_db` (std of frame energy over active frames). Windows shorter
+    than one frame get zeros.
+
+    `offset` is the stream position of samples[0]; frames start at stream
+    positions that are multiples of the frame hop.
+    """
+    n_fft, frame_hop = stft_params(sample_rate)
+    phase = -offset % frame_hop
+    if phase:
+        samples, starts, ends = samples[phase:], starts - phase, ends - phase
+    feats = frame_features(samples, sample_rate, n_fft, frame_hop)
+    n_frames = len(feats["energy_db"])
+
+    # frames fully inside the window: j * hop >= start and j * hop + n_fft <= end
+    first = -(-starts // frame_hop)
+    last = np.minimum((ends - n_fft) // frame_hop + 1, n_frames)
+    last = np.maximum(last, first)
+    n = np.maximum(last - first, 1)
+    first = np.minimum(first, n_frames)
+    last = np.minimum(last, n_frames)
+    empty = last <= first
+
+    def window_sum(values: np.ndarray, lo: np.ndarray = first) -> np.ndarray:
+        csum = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+        return csum[last] - csum[lo]
+
+    active = feats["active"]
+    n_active = np.maximum(window_sum(active), 1)
+    out = {"active": window_sum(active) / n, "energy_db": window_sum(feats["energy_db"]) / n}
+    # spectral shape only means something where there is signal
+    for name in ("zcr", "speech_ratio", "tonality"):
+        out[name] = window_sum(feats[name] * active) / n_active
+    # flux pairs (j - 1, j) with both frames in the window
+    pairs_lo = np.minimum(first + 1, last)
+    flux_active = active.copy()
+    if len(flux_active):
+        flux_active[0] = 0.0
+    out["flux"] = (window_sum(feats["flux"] * flux_active, pairs_lo)
+                   / np.maximum(window_sum(flux_active, pairs_lo), 1))
+
+    e = feats["energy_db"].astype(np.float64) * active
+    mean = window_sum(e) / n_active
+    var = window_sum(e * e) / n_active - mean * mean
+    out["modulation_db"] = np.sqrt(np.maximum(var, 0.0))
+
+    for values in out.values():
+        values[empty] = 0.0
+    return out
+
+
+def classify_windows(features: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    SPEECH / MUSIC / SFX flag bits per window from window_features().
+
+    Heuristics: speech is audible, mostly in the 300-3400 Hz band, strongly
+    energy-modulated and not noise-like; music is audible, tonal and steady
+    (low flux, low modulation); anything else audible is sfx.
+    """
+    audible = features["active"] >= MIN_ACTIVE_RATIO
+    speech = (
+        audible
+        & (features["speech_ratio"] >= SPEECH_MIN_BAND_RATIO)
+        & (features["modulation_db"] >= SPEECH_MIN_MODULATION_DB)
+        & (features["zcr"] <= SPEECH_MAX_ZCR)
+    )
+    music = (
+        audible
+        & (features["tonality"] >= MUSIC_MIN_TONALITY)
+        & (features["flux"] <= MUSIC_MAX_FLUX)
+        & (features["modulation_db"] <= MUSIC_MAX_MODULATION_DB)
+    )
+    sfx = audible & ~speech & ~music
+    return (SPEECH * speech | MUSIC * music | SFX * sfx).astype(np.uint8)
@@ -1,66 +1,175 @@
 """
 Audio processing module for video analysis.
 """
-import os
-from pydub import AudioSegment
 import subprocess
-from typing import List
-from ..models.data_models import AudioSegmentInfo
+from typing import Iterator, Optional, Tuple
+import numpy as np
+from ..models.tables import AudioSegmentTable
+from ..utils.perf import count
+from ..utils.video_probe import VideoProbe
+from .audio_features import classify_windows, window_features
 
-def extract_audio_to_wav(video_path: str, out_path: str) -> None:
-    """Extract audio from video to WAV file using ffmpeg."""
+SAMPLE_RATE = 16000
+SILENCE_DB = -80.0
+_FULL_SCALE = 32768.0  # int16 full scale, as pydub's dBFS
+
+def iter_pcm_chunks(
+    video_path: str,
+    sample_rate: int = SAMPLE_RATE,
+    chunk_samples: int = SAMPLE_RATE * 60,
+) -> Iterator[np.ndarray]:
+    """
+    Stream mono int16 PCM from ffmpeg stdout, no temp files.
+
+    Yields views into one reusable buffer of `chunk_samples` samples; copy a
+    chunk if you need it after advancing the iterator.
+    """
     cmd = [
-        "ffmpeg", "-y",
+        "ffmpeg", "-v", "error",
         "-i", video_path,
-        "-vn",
+        "-vn", "-sn",
         "-acodec", "pcm_s16le",
-        "-ar", "16000",
+        "-f", "s16le",
+        "-ar", str(sample_rate),
         "-ac", "1",
-        out_path
+        "-",
     ]
-    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    buf = np.empty(chunk_samples, dtype=np.int16)
+    view = memoryview(buf).cast("B")
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=len(view)
+    )
+    count("subprocesses")
+    try:
+        while True:
+            filled = 0
+            while filled < len(view):
+                n = proc.stdout.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            count("bytes_read", filled)
+            n_samples = filled // 2
+            if n_samples:
+                yield buf[:n_samples]
+            if filled < len(view):
+                break
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+def _windows_db(samples: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """dBFS of samples[start:end] for every window at once (cumulative energy)."""
+    x = samples.astype(np.float64)
+    energy = np.concatenate(([0.0], np.cumsum(x * x)))
+    n = np.maximum(ends - starts, 1)
+    rms = np.sqrt((energy[ends] - energy[starts]) / n)
+    with np.errstate(divide="ignore"):
+        db = 20.0 * np.log10(rms / _FULL_SCALE)
+    db[rms == 0] = SILENCE_DB
+    return db
+
+def _iter_windows(
+    chunks: Iterator[np.ndarray],
+    window_samples: int,
+    hop_samples: int,
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yield (offset, samples, starts, ends) per chunk: the windows of `samples`
+    (carried tail + chunk) that are complete, as offsets into `samples`;
+    `offset` is the absolute index of samples[0]. Windows start every
+    `hop_samples`; the last ones are truncated at end of stream.
+    """
+    carry = np.empty(0, dtype=np.int16)
+    offset = 0  # absolute sample index of carry[0]
+    skip = 0    # samples before the next window start not received yet (hop > window)
+    for chunk in chunks:
+        if skip:
+            dropped = min(skip, len(chunk))
+            chunk = chunk[dropped:]
+            skip -= dropped
+            offset += dropped
+        samples = np.concatenate((carry, chunk))
+        n_full = (len(samples) - window_samples) // hop_samples + 1
+        if n_full > 0:
+            starts = np.arange(n_full) * hop_samples
+            yield offset, samples, starts, starts + window_samples
+            consumed = n_full * hop_samples
+        else:
+            consumed = 0
+        if consumed > len(samples):
+            skip = consumed - len(samples)
+            consumed = len(samples)
+        carry = samples[consumed:]
+        offset += consumed
+
+    if len(carry):
+        starts = np.arange(0, len(carry), hop_samples)
+        yield offset, carry, starts, np.minimum(starts + window_samples, len(carry))
+
+def iter_window_loudness(
+    chunks: Iterator[np.ndarray],
+    window_samples: int,
+    hop_samples: int,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Turn a stream of PCM chunks into loudness windows.
+
+    Yields (start_sample, end_sample, loudness_db) arrays per chunk. Windows
+    start every `hop_samples`; only the unfinished tail of a chunk is carried
+    over, so memory stays bounded by the chunk size. The last windows are
+    truncated at end of stream.
+    """
+    for offset, samples, starts, ends in _iter_windows(chunks, window_samples, hop_samples):
+        yield offset + starts, offset + ends, _windows_db(samples, starts, ends)
 
 def extract_audio_segments(
     video_path: str,
-    min_segment_ms: int = 500
-) -> List[AudioSegmentInfo]:
+    min_segment_ms: int = 500,
+    probe: Optional[VideoProbe] = None,
+    hop_ms: Optional[int] = None,
+    sample_rate: int = SAMPLE_RATE,
+    chunk_seconds: float = 60.0,
+) -> AudioSegmentTable:
     """
     Extract and analyze audio segments from video.
-    
+
+    PCM is streamed from ffmpeg in `chunk_seconds` chunks. Loudness is
+    computed for all windows of a chunk in one vectorized pass and the
+    speech/music/sfx flags come from one STFT of the chunk (see
+    audio_features), so memory does not grow with audio length (beyond the
+    returned segments).
+
     Args:
         video_path: Path to the video file
-        min_segment_ms: Minimum segment length in milliseconds
-        
+        min_segment_ms: Minimum segment length in milliseconds (window size)
+        probe: Cached VideoProbe; files without audio streams are skipped
+        hop_ms: Distance between window starts; defaults to min_segment_ms
+        sample_rate: Decode sample rate in Hz
+        chunk_seconds: Streaming chunk length in seconds
+
     Returns:
-        List of AudioSegmentInfo objects
+        AudioSegmentTable; iterating or indexing it yields rows with the
+        AudioSegmentInfo attributes
     """
     print("[INFO] Extracting audio segments ...")
-    wav_path = os.path.splitext(video_path)[0] + "_tmp_audio.wav"
-    extract_audio_to_wav(video_path, wav_path)
-    audio = AudioSegment.from_wav(wav_path)
-    duration_ms = len(audio)
-    segments = []
+    if probe is not None and not probe.has_audio:
+        print(f"[INFO] No audio stream in {video_path}")
+        return AudioSegmentTable.empty()
 
-    for idx, t_start_ms in enumerate(range(0, duration_ms, min_segment_ms)):
-        t_end_ms = min(t_start_ms + min_segment_ms, duration_ms)
-        seg = audio[t_start_ms:t_end_ms]
-        loudness = seg.dBFS if seg.dBFS != float("-inf") else -80.0
+    window_samples = max(1, sample_rate * min_segment_ms // 1000)
+    hop_samples = max(1, sample_rate * (hop_ms or min_segment_ms) // 1000)
+    chunk_samples = max(hop_samples, int(chunk_seconds * sample_rate) // hop_samples * hop_samples)
 
-        segments.append(
-            AudioSegmentInfo(
-                index=idx,
-                t_start=t_start_ms / 1000.0,
-                t_end=t_end_ms / 1000.0,
-                has_speech=True,  # Placeholder - integrate VAD later
-                has_music=False,
-                has_sfx=False,
-                loudness_db=loudness
-            )
-        )
-
-    try:
-        os.remove(wav_path)
-    except OSError:
-        pass
+    parts = []
+    chunks = iter_pcm_chunks(video_path, sample_rate, chunk_samples)
+    for offset, samples, starts, ends in _iter_windows(chunks, window_samples, hop_samples):
+        features = window_features(samples, starts, ends, sample_rate, offset)
+        parts.append(AudioSegmentTable(
+            t_start=(offset + starts) / sample_rate,
+            t_end=(offset + ends) / sample_rate,
+            loudness_db=_windows_db(samples, starts, ends),
+            flags=classify_windows(features),
+        ))
 
-    return segments
\ No newline at end of file
+    return AudioSegmentTable.concatenate(parts)
@@ -0,0 +1,160 @@
+"""
+Face detectors used by shot classification.
+
+All detectors take batches of frames (optionally downscaled to an analysis
+width first), so callers can queue shot keyframes and pay the per-call
+overhead once per batch. Minimum face size is given as a fraction of frame
+height, so it means the same thing at any analysis resolution; None keeps
+the detector's own minimum (the original classifier's behaviour).
+"""
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+FACE_MODEL_ENV = "EDITDNA_FACE_MODEL_DIR"
+RES10_PROTOTXT = "deploy.prototxt"
+RES10_CAFFEMODEL = "res10_300x300_ssd_iter_140000.caffemodel"
+
+
+def resize_for_analysis(frame: np.ndarray, analysis_width: Optional[int]) -> np.ndarray:
+    """Downscale (never upscale) a frame to `analysis_width`, keeping aspect ratio; None keeps it."""
+    h, w = frame.shape[:2]
+    if analysis_width is None or w <= analysis_width:
+        return frame
+    scale = analysis_width / float(w)
+    return cv2.resize(frame, (analysis_width, int(round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+class HaarFaceDetector:
+    """OpenCV Haar cascade (the original classifier)."""
+
+    name = "haar"
+
+    def __init__(
+        self,
+        min_face_size: Optional[float] = None,
+        scale_factor: float = 1.2,
+        min_neighbors: int = 5,
+    ):
+        self.min_face_size = min_face_size
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self._cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+
+    def count_faces(self, frames: List[np.ndarray]) -> List[int]:
+        counts = []
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+            options = {}
+            if self.min_face_size:
+                # skipping pyramid levels below the minimum size is most of the speed-up
+                min_px = max(24, int(self.min_face_size * gray.shape[0]))
+                options["minSize"] = (min_px, min_px)
+            faces = self._cascade.detectMultiScale(
+                gray,
+                scaleFactor=self.scale_factor,
+                minNeighbors=self.min_neighbors,
+                **options,
+            )
+            counts.append(len(faces))
+        return counts
+
+
+class DnnFaceDetector:
+    """
+    OpenCV DNN res10 SSD (Caffe) face detector, CPU backend.
+
+    The whole batch goes through one blobFromImages + forward() call.
+    Model files are looked up in `model_dir` or EDITDNA_FACE_MODEL_DIR.
+    """
+
+    name = "dnn"
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        confidence: float = 0.6,
+        min_face_size: Optional[float] = 0.06,
+        input_size: int = 300,
+    ):
+        model_dir = model_dir or os.environ.get(FACE_MODEL_ENV, "models")
+        prototxt = os.path.join(model_dir, RES10_PROTOTXT)
+        caffemodel = os.path.join(model_dir, RES10_CAFFEMODEL)
+        if not (os.path.exists(prototxt) and os.path.exists(caffemodel)):
+            raise RuntimeError(
+                f"res10 SSD model not found in {model_dir} "
+                f"(need {RES10_PROTOTXT} and {RES10_CAFFEMODEL})"
+            )
+        self._net = cv2.dnn.readNetFromCaffe(prototxt, caffemodel)
+        self._net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self._net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence = confidence
+        self.min_face_size = min_face_size
+        self.input_size = input_size
+
+    def count_faces(self, frames: List[np.ndarray]) -> List[int]:
+        if not frames:
+            return []
+        size = (self.input_size, self.input_size)
+        blob = cv2.dnn.blobFromImages(frames, 1.0, size, (104.0, 177.0, 123.0))
+        self._net.setInput(blob)
+        # [1, 1, N, 7]: image_id, label, confidence, x0, y0, x1, y1 (relative)
+        det = self._net.forward().reshape(-1, 7)
+        heights = det[:, 6] - det[:, 4]
+        keep = (det[:, 2] >= self.confidence) & (heights >= (self.min_face_size or 0.0))
+        image_ids = det[keep, 0].astype(np.int64)
+        return np.bincount(image_ids, minlength=len(frames))[:len(frames)].tolist()
+
+
+FACE_DETECTORS = {
+    "haar": HaarFaceDetector,
+    "dnn": DnnFaceDetector,
+}
+
+
+# Process-wide pool of built detectors per (class, options). OpenCV nets are
+# not safe to share between threads, so a detector is checked out by one
+# caller at a time and handed back with release_face_detector; callers run
+# in short-lived stage threads, so the pool (not the thread) keeps them warm.
+_idle: Dict[Tuple, List] = {}
+_checked_out: Dict[int, Tuple] = {}
+_pool_lock = threading.Lock()
+
+
+def get_face_detector(name: str = "haar", **kwargs):
+    """
+    Check out a face detector by name ("haar" or "dnn"). An idle one built
+    with the same options is reused, so the cascade / network is loaded once
+    per process; otherwise a new one is built. Pass it to
+    release_face_detector when done (one that is never released is simply
+    not reused).
+    """
+    if name not in FACE_DETECTORS:
+        raise ValueError(f"Unknown face detector: {name}")
+    cls = FACE_DETECTORS[name]
+    try:
+        key = (cls, tuple(sorted(kwargs.items())))
+        hash(key)
+    except TypeError:  # unhashable option values: no reuse
+        return cls(**kwargs)
+    with _pool_lock:
+        idle = _idle.get(key)
+        detector = idle.pop() if idle else None
+    if detector is None:
+        detector = cls(**kwargs)
+    with _pool_lock:
+        _checked_out[id(detector)] = key
+    return detector
+
+
+def release_face_detector(detector) -> None:
+    """Return a detector from get_face_detector to the pool."""
+    with _pool_lock:
+        key = _checked_out.pop(id(detector), None)
+        if key is not None:
+            _idle.setdefault(key, []).append(detector)
@@ -0,0 +1,153 @@
+"""
+Shared sequential frame sampler for per-shot video stages.
+
+Stages register the timestamps they need together with a callback; a single
+forward decode pass (grab/retrieve, no seeks) then hands every decoded frame
+to each stage that asked for it. With `run(close=False)` the pass can be
+resumed: stages register more (later) frames and the next `run()` continues
+from where the previous one stopped, which is how shots from
+detect_shots_iter are consumed while the video is still being written.
+"""
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from ..utils.perf import count
+from ..utils.video_probe import VideoProbe, probe_video
+
+FrameCallback = Callable[[np.ndarray], None]
+
+
+class FrameSampler:
+    """Collect frame requests from several stages and serve them in one pass."""
+
+    def __init__(
+        self,
+        video_path: str,
+        probe: Optional[VideoProbe] = None,
+        follow_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            video_path: Video to decode
+            probe: Cached VideoProbe (for fps)
+            follow_timeout: The file is still being written: at its current
+                end, wait up to this many seconds for more frames instead of
+                stopping.
+        """
+        self.video_path = video_path
+        self.probe = probe
+        self.follow_timeout = follow_timeout
+        self._requests: Dict[int, List[FrameCallback]] = defaultdict(list)
+        self._finishers: List[Callable[[], None]] = []
+        self._cap = None
+        self._frame_idx = -1  # last frame grabbed by the open capture
+        self.frames_decoded = 0
+        self.frames_retrieved = 0
+
+    @property
+    def fps(self) -> float:
+        if self.probe is None:
+            self.probe = probe_video(self.video_path)
+        return self.probe.fps
+
+    def request(self, t: float, callback: FrameCallback) -> None:
+        """Ask for the frame at time `t` (seconds); `callback(frame)` runs during `run()`."""
+        frame_idx = max(0, int(t * self.fps))
+        self._requests[frame_idx].append(callback)
+
+    def on_finish(self, callback: Callable[[], None]) -> None:
+        """Register `callback()` to run once after the decode pass ends."""
+        self._finishers.append(callback)
+
+    def _grab(self) -> bool:
+        ok = self._cap.grab()
+        if ok or self.follow_timeout is None:
+            return ok
+        # growing file: reopen to see the new data and continue after the
+        # last grabbed frame
+        deadline = time.monotonic() + self.follow_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.5)
+            self._cap.release()
+            self._cap = cv2.VideoCapture(self.video_path)
+            if self._frame_idx >= 0:
+                self._cap.set(cv2.CAP_PROP_POS_FRAMES, self._frame_idx + 1)
+                count("seeks")
+            if self._cap.grab():
+                return True
+        return False
+
+    def run(self, close: bool = True) -> int:
+        """
+        Decode forward, dispatching requested frames.
+
+        Args:
+            close: Release the capture afterwards. With False the position
+                is kept and a later run() serves frames registered since;
+                requests for frames already passed are dropped.
+
+        Returns:
+            Number of distinct frames handed to callbacks so far. Requests
+            past the end of the stream are silently dropped, so stages
+            should set their fallback values before registering.
+        """
+        if not self._requests:
+            self._finish()
+            if close:
+                self.close()
+            return self.frames_retrieved
+
+        print(f"[INFO] Sampling {len(self._requests)} frames in one pass ...")
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.video_path)
+            if not self._cap.isOpened():
+                print(f"[ERROR] Cannot open video: {self.video_path}")
+                self._cap = None
+                self._requests.clear()
+                self._finish()
+                return 0
+
+        wanted = sorted(self._requests)
+        first_frame = self._frame_idx
+        for target in wanted:
+            if target < self._frame_idx:
+                continue
+            # grab() only demuxes/decodes; retrieve() (the costly colour
+            # conversion and copy) is paid only for requested frames.
+            ok = True
+            while self._frame_idx < target:
+                ok = self._grab()
+                if not ok:
+                    break
+                self._frame_idx += 1
+                self.frames_decoded += 1
+            if not ok:
+                break
+
+            ret, frame = self._cap.retrieve()
+            if not ret or frame is None:
+                continue
+            self.frames_retrieved += 1
+            for callback in self._requests[target]:
+                callback(frame)
+
+        count("frames_decoded", self._frame_idx - first_frame)
+        self._requests.clear()
+        self._finish()
+        if close:
+            self.close()
+        return self.frames_retrieved
+
+    def close(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    def _finish(self) -> None:
+        finishers, self._finishers = self._finishers, []
+        for callback in finishers:
+            callback()
@@ -0,0 +1,111 @@
+"""
+Pool of long-lived OCR worker processes.
+
+Each worker loads one tesseract API handle (via tesserocr) at start-up and
+keeps it for its lifetime; images are sent as raw NumPy buffers, so there is
+no per-call process spawn, temp image file or TSV parsing. Without tesserocr
+the workers fall back to pytesseract, which still runs in parallel.
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+OCR_WORKERS_ENV = "EDITDNA_OCR_WORKERS"  # default pool size (else one per CPU)
+
+# (text, left, top, width, height) in the coordinates of the submitted image
+Word = Tuple[str, int, int, int, int]
+
+_api = None          # per-worker tesserocr.PyTessBaseAPI
+_use_tesserocr = False
+
+
+def _init_worker(lang: str) -> None:
+    global _api, _use_tesserocr
+    # one core per worker; tesseract's own OpenMP threads would oversubscribe
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    try:
+        import tesserocr
+        _api = tesserocr.PyTessBaseAPI(lang=lang)
+        _use_tesserocr = True
+    except ImportError:
+        _use_tesserocr = False
+
+
+def _ocr_words(image: np.ndarray, psm: int) -> List[Word]:
+    """Worker task: OCR a grayscale uint8 image and return its words."""
+    if _use_tesserocr:
+        import tesserocr
+        image = np.ascontiguousarray(image)
+        h, w = image.shape[:2]
+        _api.SetPageSegMode(psm)
+        _api.SetImageBytes(image.tobytes(), w, h, 1, w)
+        _api.Recognize()
+        words: List[Word] = []
+        level = tesserocr.RIL.WORD
+        for r in tesserocr.iterate_level(_api.GetIterator(), level):
+            text = (r.GetUTF8Text(level) or "").strip()
+            box = r.BoundingBox(level)
+            if text and box:
+                x0, y0, x1, y1 = box
+                words.append((text, x0, y0, x1 - x0, y1 - y0))
+        return words
+
+    import pytesseract
+    try:
+        data = pytesseract.image_to_data(
+            image, config=f"--psm {psm}", output_type=pytesseract.Output.DICT
+        )
+    except Exception as e:
+        # pytesseract's exceptions can't be pickled back to the parent and
+        # would take the whole pool down
+        raise RuntimeError(f"OCR failed: {type(e).__name__}: {e}") from None
+    return [
+        (data["text"][i].strip(), data["left"][i], data["top"][i],
+         data["width"][i], data["height"][i])
+        for i in range(len(data["level"]))
+        if data["text"][i].strip()
+    ]
+
+
+class OCREnginePool:
+    """Submit images for OCR and collect word lists asynchronously."""
+
+    def __init__(self, workers: Optional[int] = None, lang: str = "eng"):
+        self.workers = workers or int(os.environ.get(OCR_WORKERS_ENV) or 0) or os.cpu_count() or 1
+        # spawn: the pool is started from a stage thread while decoder and
+        # reader threads run, and forking a multithreaded process can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=get_context("spawn"),
+            initializer=_init_worker, initargs=(lang,)
+        )
+
+    def submit(self, image: np.ndarray, psm: int = 6) -> "Future[List[Word]]":
+        """Queue one image (BGR or grayscale); the future resolves to its words."""
+        if image.ndim == 3:
+            import cv2
+            # 3x less data to ship to the worker
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return self._executor.submit(_ocr_words, image, psm)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "OCREnginePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_ocr_pool = None
+
+
+def get_ocr_pool() -> OCREnginePool:
+    """Lazily start the shared OCR pool once per process."""
+    global _ocr_pool
+    if _ocr_pool is None:
+        _ocr_pool = OCREnginePool()
+    return _ocr_pool
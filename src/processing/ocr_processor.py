@@ -2,9 +2,14 @@
 OCR processing module for text extraction from video frames.
 """
 import cv2
-import pytesseract
-from typing import List, Dict, Any
-from ..models.data_models import Shot
+import numpy as np
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Tuple
+from ..models.data_models import Shot, OverlayTextBlock
+from ..utils.video_probe import VideoProbe
+from .frame_sampler import FrameSampler
+from .ocr_pool import OCREnginePool, Word, get_ocr_pool
+from .text_regions import find_text_regions
 
 def estimate_text_position(frame_shape, bbox) -> str:
     """Estimate text position in frame (TOP/BOTTOM/CENTER)."""
@@ -14,55 +19,258 @@ def estimate_text_position(frame_shape, bbox) -> str:
     rel = center_y / h
     return "TOP" if rel < 0.33 else "BOTTOM" if rel > 0.66 else "CENTER"
 
-def extract_ocr(video_path: str, shots: List[Shot]) -> List[Shot]:
+def _words_to_overlay(
+    words: List[Word],
+    frame_shape,
+    offset=(0, 0),
+) -> List[Dict[str, Any]]:
+    """Turn OCR words of an image at `offset` into entries in frame coordinates."""
+    overlay_texts = []
+    off_x, off_y = offset
+
+    for text, left, top, w, h in words:
+        (x, y) = (left + off_x, top + off_y)
+        pos = estimate_text_position(frame_shape, (x, y, w, h))
+
+        overlay_texts.append({
+            "text": text,
+            "bbox": {"x": x, "y": y, "w": w, "h": h},
+            "position": pos,
+            "is_caption": (pos == "BOTTOM")
+        })
+
+    return overlay_texts
+
+def submit_frame_ocr(
+    frame: np.ndarray,
+    pool: OCREnginePool,
+    text_prefilter: bool = True,
+) -> List[Tuple["Future[List[Word]]", Tuple[int, int]]]:
+    """
+    Queue OCR for one frame on `pool`; returns (future, offset) pairs.
+
+    With `text_prefilter`, only the candidate regions from find_text_regions
+    are OCR'd (as single text blocks) and frames without candidates never
+    reach tesseract.
+    """
+    if not text_prefilter:
+        return [(pool.submit(frame, psm=3), (0, 0))]
+    return [
+        (pool.submit(frame[y:y + h, x:x + w], psm=6), (x, y))
+        for x, y, w, h in find_text_regions(frame)
+    ]
+
+def collect_frame_ocr(pending, frame_shape) -> List[Dict[str, Any]]:
+    """Wait for submit_frame_ocr() results; boxes in full-frame coordinates."""
+    overlay_texts = []
+    for future, offset in pending:
+        overlay_texts.extend(_words_to_overlay(future.result(), frame_shape, offset))
+    return overlay_texts
+
+def ocr_frame(
+    frame: np.ndarray,
+    text_prefilter: bool = True,
+    pool: Optional[OCREnginePool] = None,
+) -> List[Dict[str, Any]]:
+    """Run OCR on one frame and return overlay text entries."""
+    pending = submit_frame_ocr(frame, pool or get_ocr_pool(), text_prefilter)
+    return collect_frame_ocr(pending, frame.shape)
+
+def extract_ocr(
+    video_path: str,
+    shots: List[Shot],
+    sampler: Optional[FrameSampler] = None,
+    probe: Optional[VideoProbe] = None,
+    text_prefilter: bool = True,
+    pool: Optional[OCREnginePool] = None,
+) -> List[Shot]:
     """
     Extract text from video frames using OCR.
+
+    Frames are submitted to the OCR worker pool as they are decoded and the
+    results are collected once the decode pass is over, so decoding and OCR
+    overlap.
     
     Args:
         video_path: Path to the video file
         shots: List of Shot objects to process
+        sampler: Shared FrameSampler. When given, frame requests are only
+            registered and shots are filled in when the caller runs
+            `sampler.run()`; otherwise a private sampler is run here.
+        probe: Cached VideoProbe used by a private sampler
+        text_prefilter: Only OCR regions that look like text (see submit_frame_ocr)
+        pool: OCREnginePool to use; defaults to the shared pool
         
     Returns:
         Updated list of Shot objects with OCR results
     """
     print(f"[INFO] Extracting OCR for {len(shots)} shots ...")
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"[ERROR] Cannot open video for OCR: {video_path}")
-        return shots
+    owns_sampler = sampler is None
+    if owns_sampler:
+        sampler = FrameSampler(video_path, probe=probe)
+    pool = pool or get_ocr_pool()
+    pending = []
+
+    def _on_frame(shot: Shot, frame: np.ndarray) -> None:
+        pending.append((shot, submit_frame_ocr(frame, pool, text_prefilter), frame.shape))
 
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+    def _collect() -> None:
+        for shot, futures, frame_shape in pending:
+            shot.overlay_texts = collect_frame_ocr(futures, frame_shape)
+        pending.clear()
 
     for shot in shots:
+        shot.overlay_texts = []
         t_mid = (shot.t_start + shot.t_end) / 2.0
-        frame_idx = int(t_mid * fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        
-        if not ret or frame is None:
-            shot.overlay_texts = []
-            continue
+        sampler.request(t_mid, lambda frame, shot=shot: _on_frame(shot, frame))
+
+    sampler.on_finish(_collect)
+    if owns_sampler:
+        sampler.run()
+    return shots
+
+
+# ---------- Temporal overlay tracking ---------- #
+
+def perceptual_hash(image: np.ndarray) -> int:
+    """64-bit DCT perceptual hash of an image region."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()[1:]  # drop the DC term
+    bits = low > np.median(low)
+    return int(np.packbits(bits).tobytes().hex(), 16)
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
 
-        data = pytesseract.image_to_data(frame, output_type=pytesseract.Output.DICT)
-        overlay_texts = []
+def _iou(a, b) -> float:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union else 0.0
 
-        for i in range(len(data['level'])):
-            text = data['text'][i].strip()
+class _OverlayTrack:
+    """A text region seen in consecutive samples; its text is OCR'd once."""
+    __slots__ = ("bbox", "phash", "future", "position", "t_start", "t_end")
+
+    def __init__(self, bbox, phash, future, position, t_start, t_end):
+        self.bbox = bbox
+        self.phash = phash
+        self.future = future
+        self.position = position
+        self.t_start = t_start
+        self.t_end = t_end
+
+def extract_overlay_blocks(
+    video_path: str,
+    shots: List[Shot],
+    sample_fps: float = 1.0,
+    sampler: Optional[FrameSampler] = None,
+    probe: Optional[VideoProbe] = None,
+    hash_distance: int = 8,
+    min_iou: float = 0.5,
+    pool: Optional[OCREnginePool] = None,
+) -> List[OverlayTextBlock]:
+    """
+    Track overlay text over time and return it as OverlayTextBlock spans.
+
+    Frames are sampled at `sample_fps` inside every shot (at least once per
+    shot). Each candidate text region is perceptually hashed; when it matches
+    a region from the previous sample (same place, hash within
+    `hash_distance` bits) OCR is skipped and the existing block is extended,
+    so OCR runs roughly once per distinct caption rather than once per
+    sample. OCR runs on the worker pool while decoding continues; adjacent
+    spans that turn out to carry the same text are merged at the end.
+
+    Args:
+        video_path: Path to the video file
+        shots: Shots defining where to sample
+        sample_fps: Samples per second within each shot
+        sampler: Shared FrameSampler; when given, the returned list is
+            filled in when the caller runs `sampler.run()`
+        probe: Cached VideoProbe used by a private sampler
+        hash_distance: Max Hamming distance for "unchanged" regions
+        min_iou: Min box overlap for a region to continue a track
+        pool: OCREnginePool to use; defaults to the shared pool
+
+    Returns:
+        List of OverlayTextBlock objects ordered by t_start
+    """
+    print(f"[INFO] Tracking overlay text in {len(shots)} shots at {sample_fps} fps ...")
+    owns_sampler = sampler is None
+    if owns_sampler:
+        sampler = FrameSampler(video_path, probe=probe)
+
+    pool = pool or get_ocr_pool()
+    step = 1.0 / sample_fps
+    blocks: List[OverlayTextBlock] = []
+    open_tracks: List[_OverlayTrack] = []
+    closed_tracks: List[_OverlayTrack] = []
+    stats = {"samples": 0, "ocr_calls": 0}
+
+    def on_sample(t: float, t_limit: float, frame: np.ndarray) -> None:
+        stats["samples"] += 1
+        still_open = []
+        for bbox in find_text_regions(frame):
+            x, y, w, h = bbox
+            crop = frame[y:y + h, x:x + w]
+            phash = perceptual_hash(crop)
+            match = next(
+                (tr for tr in open_tracks
+                 if tr not in still_open
+                 and _iou(tr.bbox, bbox) >= min_iou
+                 and _hamming(tr.phash, phash) <= hash_distance),
+                None,
+            )
+            if match is None:
+                stats["ocr_calls"] += 1
+                match = _OverlayTrack(bbox, phash, pool.submit(crop, psm=6),
+                                      estimate_text_position(frame.shape, bbox), t, t)
+            match.bbox, match.phash = bbox, phash
+            # visible at least until the next sample
+            match.t_end = min(t + step, t_limit)
+            still_open.append(match)
+
+        closed_tracks.extend(tr for tr in open_tracks if tr not in still_open)
+        open_tracks[:] = still_open
+
+    for shot in shots:
+        n = max(1, int((shot.t_end - shot.t_start) * sample_fps))
+        for k in range(n):
+            t = shot.t_start + (k + 0.5) * (shot.t_end - shot.t_start) / n
+            sampler.request(
+                t, lambda frame, t=t, end=shot.t_end: on_sample(t, end, frame)
+            )
+
+    def finish() -> None:
+        closed_tracks.extend(open_tracks)
+        open_tracks.clear()
+        closed_tracks.sort(key=lambda tr: tr.t_start)
+        for tr in closed_tracks:
+            text = " ".join(word[0] for word in tr.future.result())
             if not text:
                 continue
-                
-            (x, y, w, h) = (data['left'][i], data['top'][i],
-                            data['width'][i], data['height'][i])
-            pos = estimate_text_position(frame.shape, (x, y, w, h))
-
-            overlay_texts.append({
-                "text": text,
-                "bbox": {"x": x, "y": y, "w": w, "h": h},
-                "position": pos,
-                "is_caption": (pos == "BOTTOM")
-            })
-
-        shot.overlay_texts = overlay_texts
-
-    cap.release()
-    return shots
\ No newline at end of file
+            # same text re-rendered (e.g. background changed under it)
+            prev = next((b for b in reversed(blocks)
+                         if b.text == text and b.position == tr.position), None)
+            if prev is not None and tr.t_start <= prev.t_end + step:
+                prev.t_end = max(prev.t_end, tr.t_end)
+                continue
+            blocks.append(OverlayTextBlock(
+                t_start=tr.t_start,
+                t_end=tr.t_end,
+                text=text,
+                position=tr.position,
+                is_caption=(tr.position == "BOTTOM"),
+            ))
+        closed_tracks.clear()
+        print(f"[INFO] {len(blocks)} overlay blocks from {stats['samples']} samples "
+              f"({stats['ocr_calls']} OCR calls)")
+
+    sampler.on_finish(finish)
+    if owns_sampler:
+        sampler.run()
+    return blocks
@@ -1,50 +1,108 @@
 """
 Shot classification module for video analysis.
 """
-import cv2
+import time
 import numpy as np
-from typing import List
+from typing import List, Optional
 from ..models.data_models import Shot
+from ..utils.video_probe import VideoProbe
+from .face_detection import get_face_detector, release_face_detector, resize_for_analysis
+from .frame_sampler import FrameSampler
 
-def classify_shots(video_path: str, shots: List[Shot]) -> List[Shot]:
+# None: full-resolution frames and each detector's own minimum face size, as
+# the original classifier; profiles opt into downscaling for speed
+DEFAULT_ANALYSIS_WIDTH = None
+DEFAULT_MIN_FACE_SIZE = None
+
+def _apply_face_counts(shots: List[Shot], counts: List[int]) -> None:
+    """Fill shot_type/faces_present from per-shot face counts."""
+    for shot, num_faces in zip(shots, counts):
+        shot.faces_present = num_faces
+        shot.shot_type = "TALKING_HEAD" if num_faces > 0 else "BROLL"
+
+def classify_shots(
+    video_path: str,
+    shots: List[Shot],
+    sampler: Optional[FrameSampler] = None,
+    probe: Optional[VideoProbe] = None,
+    detector: str = "haar",
+    analysis_width: Optional[int] = DEFAULT_ANALYSIS_WIDTH,
+    min_face_size: Optional[float] = DEFAULT_MIN_FACE_SIZE,
+    batch_size: int = 16,
+    detector_kwargs: Optional[dict] = None,
+) -> List[Shot]:
     """
     Classify each shot by analyzing key frames.
-    
+
+    Face detection runs on batches of `batch_size` key frames, optionally
+    downscaled to `analysis_width` as they are decoded.
+
     Args:
         video_path: Path to the video file
         shots: List of Shot objects to classify
-        
+        sampler: Shared FrameSampler. When given, frame requests are only
+            registered and shots are filled in when the caller runs
+            `sampler.run()`; otherwise a private sampler is run here.
+        probe: Cached VideoProbe used by a private sampler
+        detector: "haar" (OpenCV cascade) or "dnn" (res10 SSD, batched)
+        analysis_width: Width key frames are downscaled to before detection
+            (None: full resolution, as the original classifier)
+        min_face_size: Smallest face to count, as a fraction of frame height
+            (None: the detector's own default; faster with e.g. 0.06)
+        batch_size: Key frames per detector call
+        detector_kwargs: Extra options for the detector (e.g. model_dir)
+
     Returns:
         Updated list of Shot objects with classification
     """
     print(f"[INFO] Classifying {len(shots)} shots ...")
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"[ERROR] Cannot open video: {video_path}")
-        return shots
+    owns_sampler = sampler is None
+    if owns_sampler:
+        sampler = FrameSampler(video_path, probe=probe)
+
+    options = dict(detector_kwargs or {})
+    if min_face_size is not None:  # else keep the detector's own default
+        options["min_face_size"] = min_face_size
+    face_detector = get_face_detector(detector, **options)
+    batch_shots: List[Shot] = []
+    batch_frames: List[np.ndarray] = []
+    stats = {"frames": 0, "faces": 0, "seconds": 0.0}
+
+    def flush() -> None:
+        if not batch_frames:
+            return
+        started = time.perf_counter()
+        counts = face_detector.count_faces(batch_frames)
+        stats["seconds"] += time.perf_counter() - started
+        stats["frames"] += len(batch_frames)
+        stats["faces"] += sum(counts)
+        _apply_face_counts(batch_shots, counts)
+        batch_shots.clear()
+        batch_frames.clear()
 
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25
+    def on_frame(shot: Shot, frame: np.ndarray) -> None:
+        batch_shots.append(shot)
+        batch_frames.append(resize_for_analysis(frame, analysis_width))
+        if len(batch_frames) >= batch_size:
+            flush()
+
+    def finish() -> None:
+        flush()
+        release_face_detector(face_detector)
+        if stats["frames"]:
+            rate = stats["frames"] / stats["seconds"] if stats["seconds"] > 0 else float("inf")
+            print(f"[INFO] Face detection ({face_detector.name}): {stats['frames']} frames, "
+                  f"{stats['faces']} faces in {stats['seconds']:.2f}s ({rate:.1f} frames/s)")
 
     for shot in shots:
+        # Fallback if the frame can't be decoded
+        shot.shot_type = "UNKNOWN"
+        shot.faces_present = 0
         # Sample a frame at the middle of the shot
         t_mid = (shot.t_start + shot.t_end) / 2.0
-        frame_idx = int(t_mid * fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        
-        if not ret or frame is None:
-            shot.shot_type = "UNKNOWN"
-            shot.faces_present = 0
-            continue
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=5)
-        num_faces = len(faces)
-        shot.faces_present = num_faces
-        shot.shot_type = "TALKING_HEAD" if num_faces > 0 else "BROLL"
+        sampler.request(t_mid, lambda frame, shot=shot: on_frame(shot, frame))
 
-    cap.release()
-    return shots
\ No newline at end of file
+    sampler.on_finish(finish)
+    if owns_sampler:
+        sampler.run()
+    return shots
@@ -2,21 +2,13 @@
 Shot detection module for video analysis.
 """
 from typing import List
-import subprocess
 from ..models.data_models import Shot
+from ..utils.video_probe import probe_video
 
 def get_video_duration(video_path: str) -> float:
-    """Return video duration in seconds using ffprobe."""
-    cmd = [
-        "ffprobe", "-v", "error",
-        "-select_streams", "v:0",
-        "-show_entries", "format=duration",
-        "-of", "default=nokey=1:noprint_wrappers=1",
-        video_path,
-    ]
+    """Return video duration in seconds (memoized ffprobe, see probe_video)."""
     try:
-        out = subprocess.check_output(cmd).decode().strip()
-        return float(out)
+        return probe_video(video_path).duration
     except Exception as e:
         print(f"[WARN] Could not get duration for {video_path}: {e}")
         return 0.0
@@ -0,0 +1,101 @@
+"""
+Cheap text-likelihood detector used to gate OCR.
+
+Overlay text shows up as dense clusters of strong, high-contrast edges
+arranged in horizontal runs. We look for those on a downscaled grayscale
+frame with a few vectorized OpenCV ops and return candidate boxes in
+full-frame coordinates, so OCR only has to look at small crops (or nothing).
+"""
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+BBox = Tuple[int, int, int, int]  # x, y, w, h
+
+
+def find_text_regions(
+    frame: np.ndarray,
+    analysis_width: int = 960,
+    min_edge_density: float = 0.25,
+    min_height_ratio: float = 0.012,
+    max_height_ratio: float = 0.25,
+    pad_ratio: float = 0.15,
+    min_row_transitions: float = 2.0,
+    min_stroke_ratio: float = 1.0,
+) -> List[BBox]:
+    """
+    Return candidate text boxes (x, y, w, h) in full-frame pixel coordinates.
+
+    Args:
+        frame: BGR or grayscale frame
+        analysis_width: Width the frame is downscaled to before analysis
+        min_edge_density: Fraction of edge pixels a box must contain
+        min_height_ratio: Smallest box height relative to frame height
+        max_height_ratio: Largest box height relative to frame height
+        pad_ratio: Padding added around each box, relative to its height
+        min_row_transitions: Average edge on/off transitions per box row;
+            a run of glyphs crosses many strokes, a smooth contour only a few
+        min_stroke_ratio: Row transitions required per box-height of width,
+            so long thin contours need proportionally more strokes
+
+    Returns:
+        List of boxes, empty when the frame most likely has no text
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    full_h, full_w = gray.shape[:2]
+    scale = min(1.0, analysis_width / float(full_w))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+    h, w = small.shape[:2]
+
+    # Morphological gradient lights up glyph strokes; Otsu keeps the strong ones
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    _, edges = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Join characters of a line into one blob
+    kernel_w = max(3, w // 40)
+    joined = cv2.morphologyEx(
+        edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_w, 1))
+    )
+    joined = cv2.morphologyEx(
+        joined, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 2))
+    )
+
+    n, _, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=8)
+    if n <= 1:
+        return []
+    stats = stats[1:]  # drop background
+    xs, ys, ws, hs = stats[:, 0], stats[:, 1], stats[:, 2], stats[:, 3]
+
+    # Per-box sums via integral images (no per-box loops)
+    def box_sums(mask: np.ndarray) -> np.ndarray:
+        integral = cv2.integral(mask)
+        return (
+            integral[ys + hs, xs + ws] - integral[ys, xs + ws]
+            - integral[ys + hs, xs] + integral[ys, xs]
+        )
+
+    on = (edges > 0).astype(np.uint8)
+    transitions = np.zeros_like(on)
+    transitions[:, 1:] = on[:, 1:] != on[:, :-1]
+    density = box_sums(on) / np.maximum(ws * hs, 1)
+    row_transitions = box_sums(transitions) / np.maximum(hs, 1)
+
+    keep = (
+        (hs >= max(4, min_height_ratio * h))
+        & (hs <= max_height_ratio * h)
+        & (ws >= 1.5 * hs)          # text lines are wider than tall
+        & (density >= min_edge_density)
+        & (row_transitions >= np.maximum(min_row_transitions, min_stroke_ratio * ws / hs))
+    )
+
+    boxes: List[BBox] = []
+    inv = 1.0 / scale
+    for x, y, bw, bh in zip(xs[keep], ys[keep], ws[keep], hs[keep]):
+        pad = int(round(bh * pad_ratio * inv)) + 2
+        x0 = max(0, int(x * inv) - pad)
+        y0 = max(0, int(y * inv) - pad)
+        x1 = min(full_w, int((x + bw) * inv) + pad)
+        y1 = min(full_h, int((y + bh) * inv) + pad)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+    return boxes
@@ -0,0 +1,169 @@
+"""
+Lightweight per-stage instrumentation for the analysis pipeline.
+
+A PerfRecorder times each `with recorder.stage(name):` block (wall and CPU
+time, process peak RSS) while the code inside reports work counters through
+`count()`: frames decoded, seeks, subprocesses spawned, bytes read and
+frames re-checked by the cascade shot engine. Stage
+code calls `count()` once per batch or subprocess, never per frame, and it
+is a single context-variable lookup when no stage is being recorded, so
+leaving the calls in costs nothing measurable.
+
+Finished stages are handed to hooks: plain callables taking a StageMetrics,
+e.g. `logging_hook()` or a `PrometheusTextfileHook`. Counters from worker
+processes (chunked shot detection, the OCR pool) are not collected.
+"""
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+COUNTERS = ("frames_decoded", "seeks", "subprocesses", "bytes_read", "frames_refined")
+
+
+@dataclass
+class StageMetrics:
+    """Measurements for one run of one pipeline stage."""
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0  # whole-process CPU time, so it overlaps for concurrent stages
+    frames_decoded: int = 0
+    seeks: int = 0
+    subprocesses: int = 0
+    bytes_read: int = 0
+    frames_refined: int = 0  # frames the shot cascade sent to its expensive model
+    peak_rss_mb: Optional[float] = None        # process high-water mark at stage end
+    peak_child_rss_mb: Optional[float] = None  # largest finished subprocess so far
+
+
+PerfHook = Callable[[StageMetrics], None]
+
+_current: ContextVar[Optional[StageMetrics]] = ContextVar("editdna_perf_stage", default=None)
+
+
+def count(counter: str, n: int = 1) -> None:
+    """Add `n` to `counter` of the stage being recorded, if any."""
+    metrics = _current.get()
+    if metrics is not None:
+        setattr(metrics, counter, getattr(metrics, counter) + n)
+
+
+def _maxrss_mb(who) -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1 << 20) if sys.platform == "darwin" else rss / 1024.0
+
+
+class PerfRecorder:
+    """Record StageMetrics for a pipeline run and pass them to hooks."""
+
+    def __init__(self, hooks: Optional[List[PerfHook]] = None, enabled: bool = True):
+        self.hooks = list(hooks or [])
+        self.enabled = enabled
+        self.stages: List[StageMetrics] = []
+
+    @contextlib.contextmanager
+    def _record(self, name: str) -> Iterator[StageMetrics]:
+        metrics = StageMetrics(stage=name)
+        token = _current.set(metrics)
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield metrics
+        finally:
+            metrics.wall_s = time.perf_counter() - wall0
+            metrics.cpu_s = time.process_time() - cpu0
+            _current.reset(token)
+            if resource is not None:
+                metrics.peak_rss_mb = _maxrss_mb(resource.RUSAGE_SELF)
+                metrics.peak_child_rss_mb = _maxrss_mb(resource.RUSAGE_CHILDREN)
+            self.stages.append(metrics)
+            for hook in self.hooks:
+                try:
+                    hook(metrics)
+                except Exception as e:
+                    print(f"[WARN] perf hook failed for {name}: {e}")
+
+    def stage(self, name: str):
+        """Context manager recording one stage; a no-op when disabled."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._record(name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The `perf` block of analysis_json."""
+        return {
+            "stages": [asdict(m) for m in self.stages],
+            "total_wall_s": sum(m.wall_s for m in self.stages),
+            "total_cpu_s": sum(m.cpu_s for m in self.stages),
+        }
+
+
+def logging_hook(logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> PerfHook:
+    """Hook logging each stage as one JSON object per line."""
+    logger = logger or logging.getLogger("editdna.perf")
+
+    def hook(metrics: StageMetrics) -> None:
+        logger.log(level, json.dumps(asdict(metrics), sort_keys=True))
+
+    return hook
+
+
+class PrometheusTextfileHook:
+    """
+    Accumulate stage metrics and rewrite `path` in the Prometheus text
+    exposition format after every stage (for node_exporter's textfile
+    collector or a plain scrape of the file).
+    """
+
+    def __init__(self, path: str, prefix: str = "editdna"):
+        self.path = path
+        self.prefix = prefix
+        self._totals: Dict[str, Dict[str, float]] = {}
+        self._peak_rss: Dict[str, float] = {}
+
+    def __call__(self, metrics: StageMetrics) -> None:
+        totals = self._totals.setdefault(metrics.stage, {})
+        totals["runs"] = totals.get("runs", 0) + 1
+        totals["wall_seconds"] = totals.get("wall_seconds", 0.0) + metrics.wall_s
+        totals["cpu_seconds"] = totals.get("cpu_seconds", 0.0) + metrics.cpu_s
+        for name in COUNTERS:
+            totals[name] = totals.get(name, 0) + getattr(metrics, name)
+        if metrics.peak_rss_mb is not None:
+            self._peak_rss[metrics.stage] = max(
+                self._peak_rss.get(metrics.stage, 0.0), metrics.peak_rss_mb
+            )
+        self.write()
+
+    def render(self) -> str:
+        lines = []
+        names = ["runs", "wall_seconds", "cpu_seconds", *COUNTERS]
+        for name in names:
+            metric = f"{self.prefix}_stage_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for stage, totals in sorted(self._totals.items()):
+                lines.append(f'{metric}{{stage="{stage}"}} {totals.get(name, 0)}')
+        metric = f"{self.prefix}_stage_peak_rss_bytes"
+        lines.append(f"# TYPE {metric} gauge")
+        for stage, mb in sorted(self._peak_rss.items()):
+            lines.append(f'{metric}{{stage="{stage}"}} {int(mb * (1 << 20))}')
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,252 @@
+"""
+Named analysis profiles and a time-budgeted profile picker.
+
+A profile (see config.ANALYSIS_PROFILES) fixes every stage's cost knobs at
+once: shot engine preset, histogram frame step, face detector and the
+width key frames are analyzed at, OCR sampling rate for overlay spans and
+the audio window hop. `AnalysisProfile.analyze_kwargs()` turns one into
+analyze_video arguments.
+
+For a latency budget ("finish within 0.1x realtime") `choose_profile`
+estimates each profile's wall time on a video from its probed duration and
+resolution and per-stage rates (seconds per media-second at 720p), and
+picks the most thorough profile that fits. Rates start from the nominal
+values in the config and are replaced by measurements as runs complete
+(`StageCostTable.record`), so the picker adapts to the machine it runs on.
+Profiles whose shot engine or face detector cannot load on this install
+(no TransNet weights, no res10 model files, ...) are left out first
+(`available_profiles`).
+"""
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .perf import StageMetrics
+from .video_probe import VideoProbe
+
+COST_TABLE_ENV = "EDITDNA_STAGE_COSTS"
+
+# stages whose cost depends on the profile; the first two read video frames
+VIDEO_STAGES = ("detect_shots", "classify_shots+extract_ocr")
+AUDIO_STAGES = ("extract_audio_segments",)
+REFERENCE_PIXELS = 1280 * 720
+_EMA_WEIGHT = 0.3  # weight of a new measurement against the stored rate
+
+
+@dataclass
+class AnalysisProfile:
+    """Per-stage settings of one named profile."""
+    name: str
+    shot_engine: str
+    shot_params: Dict[str, Any] = field(default_factory=dict)
+    frame_step: int = 1                  # histogram engine only
+    face_detector: str = "haar"
+    analysis_width: int = 640            # key frames are downscaled to this width
+    overlay_sample_fps: Optional[float] = 1.0
+    audio_hop_ms: Optional[int] = None   # None: the window length
+    stage_costs: Dict[str, float] = field(default_factory=dict)  # nominal rates
+
+    @classmethod
+    def from_config(
+        cls,
+        name: str,
+        profiles: Mapping[str, Dict[str, Any]],
+        shot_presets: Mapping[str, Dict[str, Any]],
+    ) -> "AnalysisProfile":
+        """Resolve a config.ANALYSIS_PROFILES entry and its shot preset."""
+        if name not in profiles:
+            raise ValueError(f"Unknown analysis profile: {name} (have {sorted(profiles)})")
+        spec = dict(profiles[name])
+        preset_name = spec.pop("shot_preset")
+        if preset_name not in shot_presets:
+            raise ValueError(f"Profile {name} uses unknown shot preset {preset_name}")
+        preset = shot_presets[preset_name]
+        # the profile may adjust preset params, e.g. frame counts for frame_step
+        shot_params = dict(preset.get("params", {}), **spec.pop("shot_params", {}))
+        return cls(name=name, shot_engine=preset["engine"], shot_params=shot_params, **spec)
+
+    def analyze_kwargs(self) -> Dict[str, Any]:
+        """analyze_video keyword arguments for this profile."""
+        shot_params = dict(self.shot_params)
+        if self.frame_step > 1:
+            shot_params["frame_step"] = self.frame_step
+        return {
+            "shot_engine": self.shot_engine,
+            "shot_engine_kwargs": shot_params,
+            "classify_kwargs": {"detector": self.face_detector,
+                                "analysis_width": self.analysis_width},
+            "overlay_sample_fps": self.overlay_sample_fps,
+            "audio_hop_ms": self.audio_hop_ms,
+        }
+
+
+def load_profiles(
+    profiles: Mapping[str, Dict[str, Any]], shot_presets: Mapping[str, Dict[str, Any]]
+) -> List[AnalysisProfile]:
+    """All profiles in config order (cheapest first)."""
+    return [AnalysisProfile.from_config(name, profiles, shot_presets) for name in profiles]
+
+
+def _load_scenedetect() -> None:
+    import scenedetect  # noqa: F401
+
+
+def _load_transnet() -> None:
+    from ..shot_detection import get_transnet_model
+    get_transnet_model()
+
+
+# shot engines that need more than OpenCV and ffmpeg; cascade runs without
+# TransNet (it keeps the cheap engine's decisions)
+ENGINE_REQUIREMENTS: Dict[str, Callable[[], None]] = {
+    "pyscenedetect": _load_scenedetect,
+    "transnetv2": _load_transnet,
+}
+
+_unavailable: Dict[Tuple[str, str], Optional[str]] = {}
+_unavailable_lock = threading.Lock()
+
+
+def unavailable_reason(profile: AnalysisProfile) -> Optional[str]:
+    """
+    Why `profile` cannot run on this install, or None if it can. Loads the
+    profile's shot engine model and face detector (both are cached by their
+    modules, so this also warms them); the answer is kept per process.
+    """
+    key = (profile.shot_engine, profile.face_detector)
+    with _unavailable_lock:
+        if key not in _unavailable:
+            reason = None
+            try:
+                load = ENGINE_REQUIREMENTS.get(profile.shot_engine)
+                if load is not None:
+                    load()
+                from ..processing.face_detection import get_face_detector, release_face_detector
+                # classify_shots' default options for profiles
+                release_face_detector(get_face_detector(profile.face_detector))
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+            _unavailable[key] = reason
+        return _unavailable[key]
+
+
+def available_profiles(profiles: List[AnalysisProfile]) -> List[AnalysisProfile]:
+    """The profiles that can run here, in the same order; warns about the rest."""
+    usable = []
+    for profile in profiles:
+        reason = unavailable_reason(profile)
+        if reason is None:
+            usable.append(profile)
+        else:
+            print(f"[WARN] Profile {profile.name} unavailable: {reason}")
+    if not usable:
+        raise RuntimeError(f"No analysis profile can run on this install (tried {[p.name for p in profiles]})")
+    return usable
+
+
+def _pixel_scale(probe: VideoProbe) -> float:
+    if not probe.width or not probe.height:
+        return 1.0
+    return probe.width * probe.height / REFERENCE_PIXELS
+
+
+class StageCostTable:
+    """
+    Measured per-stage rates (wall seconds per media-second, normalized to
+    720p for video stages) per profile, persisted as JSON at `path`
+    (default: $EDITDNA_STAGE_COSTS, or in memory only).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else os.environ.get(COST_TABLE_ENV)
+        self._rates: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._rates = json.load(f).get("profiles", {})
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Ignoring unreadable stage cost table {self.path}: {e}")
+
+    def rate(self, profile: AnalysisProfile, stage: str) -> float:
+        """Measured rate if there is one, else the profile's nominal rate."""
+        measured = self._rates.get(profile.name, {}).get(stage)
+        if measured is not None:
+            return measured["rate"]
+        return profile.stage_costs.get(stage, 0.0)
+
+    def estimate(self, profile: AnalysisProfile, probe: VideoProbe, concurrent: bool = True) -> float:
+        """Expected wall seconds of the profile's stages on this video."""
+        scale = _pixel_scale(probe)
+        video = sum(self.rate(profile, s) for s in VIDEO_STAGES) * probe.duration * scale
+        audio = sum(self.rate(profile, s) for s in AUDIO_STAGES) * probe.duration
+        # audio runs next to the video stages when stages are concurrent
+        return max(video, audio) if concurrent else video + audio
+
+    def record(self, profile_name: str, probe: VideoProbe, stages: List[StageMetrics]) -> None:
+        """Fold one run's stage timings into the table and save it."""
+        if probe.duration <= 0:
+            return
+        scale = _pixel_scale(probe)
+        with self._lock:
+            rates = self._rates.setdefault(profile_name, {})
+            for metrics in stages:
+                if metrics.stage not in VIDEO_STAGES + AUDIO_STAGES:
+                    continue
+                norm = probe.duration * (scale if metrics.stage in VIDEO_STAGES else 1.0)
+                rate = metrics.wall_s / norm
+                entry = rates.get(metrics.stage)
+                if entry is None:
+                    rates[metrics.stage] = {"rate": rate, "runs": 1}
+                else:
+                    entry["rate"] += _EMA_WEIGHT * (rate - entry["rate"])
+                    entry["runs"] += 1
+            self.save()
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"profiles": self._rates}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def choose_profile(
+    profiles: List[AnalysisProfile],
+    probe: VideoProbe,
+    budget: float,
+    costs: Optional[StageCostTable] = None,
+    concurrent: bool = True,
+) -> Tuple[AnalysisProfile, float]:
+    """
+    Most thorough profile expected to finish within `budget` x the video's
+    duration, with its estimated wall seconds.
+
+    `profiles` are ordered cheapest first; if even the first one does not
+    fit it is returned anyway (with a warning).
+    """
+    if not profiles:
+        raise ValueError("No analysis profiles to choose from")
+    costs = costs or StageCostTable()
+    budget_s = budget * probe.duration
+    estimates = [(p, costs.estimate(p, probe, concurrent)) for p in profiles]
+    fitting = [(p, est) for p, est in estimates if est <= budget_s]
+    if fitting:
+        profile, est = fitting[-1]
+    else:
+        profile, est = estimates[0]
+        print(f"[WARN] No profile fits {budget:g}x realtime ({budget_s:.1f}s); "
+              f"using {profile.name} (~{est:.1f}s)")
+    print(f"[INFO] Profile {profile.name}: ~{est:.1f}s estimated, budget {budget_s:.1f}s")
+    return profile, est
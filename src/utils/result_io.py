@@ -0,0 +1,261 @@
+"""
+Writers and lazy readers for analyze_video results.
+
+Besides plain JSON, results can be written as
+
+- NDJSON (.ndjson / .jsonl): one record per line, written incrementally.
+  Small sections come first and every shot, audio segment and overlay
+  block is its own line, so nothing but the current record is ever
+  serialized in memory. (analyze_video still builds the whole result
+  dict first, since the blueprint prompt needs all of it; only the
+  serialized copy is avoided.)
+- msgpack (.msgpack, needs the optional `msgpack` package): a framed
+  container with one length-prefixed blob per section. Row lists are
+  stored as columns (no repeated keys).
+
+Both formats are split into sections (video, edit_stats, editing_blueprint,
+perf, transcript_outline, overlay_text_blocks, shots, audio_pattern).
+`read_sections` returns only the sections asked for: it stops reading NDJSON
+once they are complete and seeks past other msgpack sections.
+"""
+import json
+import os
+import struct
+import tempfile
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+MSGPACK_MAGIC = b"EDNAMP1\n"
+_FRAME_HEADER = struct.Struct("<HQ")  # name length, payload length
+
+# small sections first so lazy readers can stop early
+SECTION_ORDER = (
+    "video", "edit_stats", "editing_blueprint", "perf", "transcript_outline",
+    "overlay_text_blocks", "shots", "audio_pattern",
+)
+FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".msgpack": "msgpack"}
+
+
+def result_sections(result: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Flatten an analyze_video result into ordered (section, value) pairs."""
+    flat = dict(result.get("analysis_json", {}))
+    if "editing_blueprint" in result:
+        flat["editing_blueprint"] = result["editing_blueprint"]
+    ordered = [name for name in SECTION_ORDER if name in flat]
+    ordered += [name for name in flat if name not in SECTION_ORDER]
+    return [(name, flat[name]) for name in ordered]
+
+
+def sections_to_result(sections: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of result_sections()."""
+    analysis = {k: v for k, v in sections.items() if k != "editing_blueprint"}
+    result: Dict[str, Any] = {"analysis_json": analysis}
+    if "editing_blueprint" in sections:
+        result["editing_blueprint"] = sections["editing_blueprint"]
+    return result
+
+
+def _row_lists(value: Any) -> Tuple[Any, Dict[str, list]]:
+    """Split a section into its small part and its lists of rows."""
+    if isinstance(value, list):
+        return [], {"": value}
+    if isinstance(value, dict):
+        lists = {k: v for k, v in value.items() if isinstance(v, list)}
+        return {k: v for k, v in value.items() if k not in lists}, lists
+    return value, {}
+
+
+# ---------- NDJSON ---------- #
+
+class NDJSONWriter:
+    """
+    Write result sections as NDJSON records, one line at a time.
+
+    Records are {"section", "data", "lists"} headers followed by
+    {"section", "field", "row"} rows ("field" is "" for list sections).
+    Sections can be written as soon as the stage producing them finishes.
+    """
+
+    def __init__(self, f: IO[str]):
+        self._f = f
+
+    def _line(self, record: Dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, separators=(",", ":")))
+        self._f.write("\n")
+
+    def write_section(self, name: str, value: Any) -> None:
+        data, lists = _row_lists(value)
+        self._line({"section": name, "data": data, "lists": list(lists)})
+        for field, rows in lists.items():
+            self.write_rows(name, rows, field)
+
+    def write_rows(self, name: str, rows: Iterable[Any], field: str = "") -> None:
+        """Append rows to a section whose header was already written."""
+        for row in rows:
+            self._line({"section": name, "field": field, "row": row})
+
+
+def _iter_ndjson_sections(f: IO[str], wanted: Optional[set]) -> Iterator[Tuple[str, Any]]:
+    current: Optional[str] = None
+    value: Any = None
+    for line in f:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        name = record["section"]
+        if name != current:
+            if current is not None and (wanted is None or current in wanted):
+                yield current, value
+                if wanted is not None:
+                    wanted.discard(current)
+                    if not wanted:
+                        return
+            current = name
+            value = None
+        if wanted is not None and name not in wanted:
+            continue
+        if "data" in record:
+            value = record["data"]
+            for field in record.get("lists", []):
+                if field:
+                    value[field] = []
+        elif record["field"]:
+            value[record["field"]].append(record["row"])
+        else:
+            value.append(record["row"])
+    if current is not None and (wanted is None or current in wanted):
+        yield current, value
+
+
+# ---------- msgpack ---------- #
+
+def _import_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack output needs the msgpack package: pip install editdna[msgpack]")
+    return msgpack
+
+
+def _to_columns(rows: list) -> Any:
+    """List of same-keyed dicts -> {"__columns__": {key: [values]}}."""
+    if not rows or not all(isinstance(r, dict) for r in rows):
+        return rows
+    keys = list(rows[0])
+    if any(list(r) != keys for r in rows):
+        return rows
+    return {"__columns__": {k: [r[k] for r in rows] for k in keys}}
+
+
+def _from_columns(value: Any) -> Any:
+    if isinstance(value, dict) and "__columns__" in value:
+        columns = value["__columns__"]
+        keys = list(columns)
+        return [dict(zip(keys, row)) for row in zip(*(columns[k] for k in keys))]
+    return value
+
+
+def _pack_section(value: Any) -> Any:
+    if isinstance(value, list):
+        return _to_columns(value)
+    if isinstance(value, dict):
+        return {k: _to_columns(v) if isinstance(v, list) else v for k, v in value.items()}
+    return value
+
+
+def _unpack_section(value: Any) -> Any:
+    if isinstance(value, dict) and "__columns__" not in value:
+        return {k: _from_columns(v) for k, v in value.items()}
+    return _from_columns(value)
+
+
+def _write_msgpack(f: IO[bytes], sections: List[Tuple[str, Any]]) -> None:
+    msgpack = _import_msgpack()
+    f.write(MSGPACK_MAGIC)
+    for name, value in sections:
+        payload = msgpack.packb(_pack_section(value), use_bin_type=True)
+        encoded = name.encode()
+        f.write(_FRAME_HEADER.pack(len(encoded), len(payload)))
+        f.write(encoded)
+        f.write(payload)
+
+
+def _iter_msgpack_sections(f: IO[bytes], wanted: Optional[set]) -> Iterator[Tuple[str, Any]]:
+    msgpack = _import_msgpack()
+    if f.read(len(MSGPACK_MAGIC)) != MSGPACK_MAGIC:
+        raise ValueError("Not an EditDNA msgpack result file")
+    while True:
+        header = f.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size:
+            return
+        name_len, payload_len = _FRAME_HEADER.unpack(header)
+        name = f.read(name_len).decode()
+        if wanted is not None and name not in wanted:
+            f.seek(payload_len, os.SEEK_CUR)
+            continue
+        yield name, _unpack_section(msgpack.unpackb(f.read(payload_len), raw=False))
+        if wanted is not None:
+            wanted.discard(name)
+            if not wanted:
+                return
+
+
+# ---------- public API ---------- #
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unknown result format for {path} (use one of {sorted(FORMATS)})")
+    return FORMATS[ext]
+
+
+def write_result(result: Dict[str, Any], path: str, fmt: Optional[str] = None) -> None:
+    """
+    Write an analyze_video result atomically; `fmt` ("json", "ndjson" or
+    "msgpack") defaults to the one implied by the file extension.
+    """
+    fmt = fmt or detect_format(path)
+    binary = fmt == "msgpack"
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            if fmt == "json":
+                json.dump(result, f)
+            elif fmt == "ndjson":
+                writer = NDJSONWriter(f)
+                for name, value in result_sections(result):
+                    writer.write_section(name, value)
+            elif fmt == "msgpack":
+                _write_msgpack(f, result_sections(result))
+            else:
+                raise ValueError(f"Unknown result format: {fmt}")
+        os.replace(tmp_path, path)  # readers never see partial files
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_sections(path: str, sections: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Read the named sections (all if None) of a result file.
+
+    For NDJSON and msgpack only what is needed is parsed, so e.g.
+    `read_sections(p, ["edit_stats"])` never touches the audio segments.
+    Missing sections are simply absent from the returned dict.
+    """
+    wanted = set(sections) if sections is not None else None
+    fmt = detect_format(path)
+    if fmt == "json":
+        with open(path) as f:
+            flat = dict(result_sections(json.load(f)))
+        return {k: v for k, v in flat.items() if wanted is None or k in wanted}
+    if fmt == "ndjson":
+        with open(path) as f:
+            return dict(_iter_ndjson_sections(f, wanted))
+    with open(path, "rb") as f:
+        return dict(_iter_msgpack_sections(f, wanted))
+
+
+def read_result(path: str) -> Dict[str, Any]:
+    """Load a whole result back into the analyze_video return shape."""
+    return sections_to_result(read_sections(path))
@@ -0,0 +1,196 @@
+"""
+Persistent, content-addressed cache for pipeline stage outputs.
+
+Entries are keyed by a fingerprint of the video's bytes, the stage name, the
+stage parameters and the stage's code version, so re-running a corpus with
+unchanged inputs only pays for the stages that actually changed. The cache
+is a directory of pickle files shared safely by several worker processes:
+writes are atomic renames and eviction runs under an exclusive file lock.
+Eviction walks the whole tree, so it only runs when this process's running
+size estimate crosses the budget, or every EVICT_CHECK_PUTS writes to
+account for the other processes' entries.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .perf import count
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction runs unlocked
+    fcntl = None
+
+STAGE_CACHE_ENV = "EDITDNA_STAGE_CACHE_DIR"
+
+# Bump a stage's version whenever its output for the same input changes.
+STAGE_VERSIONS: Dict[str, str] = {
+    "detect_shots": "1",
+    "cut_signal": "1",
+    "classify_shots": "3",
+    "extract_ocr": "2",
+    "extract_overlay_blocks": "1",
+    "extract_audio_segments": "4",
+    "call_llm_blueprint": "1",
+}
+
+_FINGERPRINT_SAMPLE = 1 << 20  # bytes hashed at head, middle and tail
+
+EVICT_CHECK_PUTS = 256  # writes between full scans while the estimate is under budget
+
+# per cache directory: (estimated total bytes, writes since the last scan);
+# shared by all StageCache instances of this process
+_size_estimates: Dict[str, List[int]] = {}
+_estimates_lock = threading.Lock()
+
+
+def fingerprint_file(path: str, sample_bytes: int = _FINGERPRINT_SAMPLE) -> str:
+    """
+    Fast content fingerprint: file size plus the head, middle and tail
+    `sample_bytes`. Renamed or copied files keep their fingerprint; files
+    smaller than three samples are hashed in full.
+    """
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=20)
+    h.update(str(size).encode())
+    with open(path, "rb") as f:
+        if size <= 3 * sample_bytes:
+            h.update(f.read())
+        else:
+            for offset in (0, size // 2 - sample_bytes // 2, size - sample_bytes):
+                f.seek(offset)
+                h.update(f.read(sample_bytes))
+    count("bytes_read", min(size, 3 * sample_bytes))
+    return h.hexdigest()
+
+
+class StageCache:
+    """Size-bounded LRU cache of stage outputs on local disk."""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 2 << 30):
+        self.cache_dir = cache_dir or os.environ.get(STAGE_CACHE_ENV) or os.path.join(
+            os.path.expanduser("~"), ".cache", "editdna", "stages"
+        )
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._estimate_key = os.path.abspath(self.cache_dir)
+
+    def _key(self, stage: str, fingerprint: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            [stage, STAGE_VERSIONS.get(stage, "0"), fingerprint, params],
+            sort_keys=True,
+            default=repr,
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".pkl")
+
+    def get(self, stage: str, fingerprint: str, params: Dict[str, Any]) -> Optional[Any]:
+        """Return the cached output, or None on a miss."""
+        path = self._path(self._key(stage, fingerprint, params))
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except OSError:
+            self.misses += 1
+            return None
+        except (EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            # truncated, or pickled from a class that has since moved: recompute
+            print(f"[WARN] Dropping unreadable stage cache entry for {stage}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mtime doubles as last-access time for LRU
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, stage: str, fingerprint: str, params: Dict[str, Any], value: Any) -> None:
+        """Store a stage output; evict least recently used entries when over budget."""
+        path = self._path(self._key(stage, fingerprint, params))
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                size = f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Could not write stage cache entry for {stage}: {e}")
+            return
+        if self._note_write(size):
+            self.evict()
+
+    def _note_write(self, size: int) -> bool:
+        """Count a write; True when a full eviction scan is due."""
+        with _estimates_lock:
+            estimate = _size_estimates.get(self._estimate_key)
+            if estimate is None:  # first write from this process: scan once
+                return True
+            estimate[0] += size
+            estimate[1] += 1
+            return estimate[0] > self.max_bytes or estimate[1] >= EVICT_CHECK_PUTS
+
+    def get_or_compute(
+        self,
+        stage: str,
+        fingerprint: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        value = self.get(stage, fingerprint, params)
+        if value is None:
+            value = compute()
+            self.put(stage, fingerprint, params, value)
+        return value
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits `max_bytes`."""
+        lock_path = os.path.join(self.cache_dir, ".lock")
+        with open(lock_path, "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = []
+                total = 0
+                for sub in os.scandir(self.cache_dir):
+                    if not sub.is_dir():
+                        continue
+                    for entry in os.scandir(sub.path):
+                        if not entry.name.endswith(".pkl"):
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+                        total += st.st_size
+                if total > self.max_bytes:
+                    # trim to 90% so we don't evict on every subsequent put
+                    target = int(self.max_bytes * 0.9)
+                    for _, size, path in sorted(entries):
+                        if total <= target:
+                            break
+                        try:
+                            os.remove(path)
+                            total -= size
+                        except OSError:
+                            pass
+                with _estimates_lock:
+                    _size_estimates[self._estimate_key] = [total, 0]
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
@@ -0,0 +1,74 @@
+"""
+Minimal dependency-graph scheduler for pipeline stages.
+
+Stages are added with the names of the stages whose results they need and
+run on a thread pool as soon as those results exist, so independent stages
+(e.g. audio analysis and shot detection) overlap. Threads are enough here:
+the heavy lifting happens in ffmpeg subprocesses, OpenCV and NumPy (which
+release the GIL) or in the OCR process pool.
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .perf import PerfRecorder
+
+
+@dataclass
+class _StageNode:
+    name: str
+    func: Callable[..., Any]
+    deps: Tuple[str, ...]
+
+
+class StageGraph:
+    """
+    Run stages in dependency order with as much overlap as the graph allows.
+
+    Each stage function is called with the results of its dependencies as
+    positional arguments, in the order they were listed.
+    """
+
+    def __init__(self, recorder: Optional[PerfRecorder] = None):
+        self.recorder = recorder or PerfRecorder(enabled=False)
+        self._nodes: Dict[str, _StageNode] = {}
+
+    def add(self, name: str, func: Callable[..., Any], deps: Tuple[str, ...] = ()) -> None:
+        """Add a stage; dependencies must already be in the graph (so no cycles)."""
+        if name in self._nodes:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [d for d in deps if d not in self._nodes]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self._nodes[name] = _StageNode(name, func, tuple(deps))
+
+    def _run_node(self, node: _StageNode, args: List[Any]) -> Any:
+        with self.recorder.stage(node.name):
+            return node.func(*args)
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Execute every stage and return their results by name.
+
+        max_workers=1 runs the stages one at a time in insertion order. The
+        first stage to fail stops any further stages from starting and its
+        exception is re-raised once the running ones have finished.
+        """
+        results: Dict[str, Any] = {}
+        pending = list(self._nodes.values())
+        running: Dict[Future, str] = {}
+        workers = max_workers or max(1, len(self._nodes))
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as pool:
+            while pending or running:
+                ready = [n for n in pending if all(d in results for d in n.deps)]
+                for node in ready[:max(0, workers - len(running))]:
+                    pending.remove(node)
+                    args = [results[d] for d in node.deps]
+                    running[pool.submit(self._run_node, node, args)] = node.name
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    # raises on failure; the pool waits for running stages
+                    results[name] = future.result()
+        return results
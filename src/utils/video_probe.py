@@ -0,0 +1,215 @@
+"""
+Single-call ffprobe metadata for a video file, memoized per process and
+optionally on disk.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass, field, asdict, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from .perf import count
+
+PROBE_CACHE_ENV = "EDITDNA_PROBE_CACHE_DIR"
+_MEMO_MAX_ENTRIES = 4096
+
+_memo: Dict[Tuple[str, int, int], "VideoProbe"] = {}
+_memo_lock = threading.Lock()
+
+
+@dataclass
+class AudioStreamInfo:
+    """One audio stream of a media file."""
+    index: int
+    codec: Optional[str]
+    sample_rate: int
+    channels: int
+
+
+@dataclass
+class VideoProbe:
+    """Everything the pipeline stages need to know about a file up front."""
+    path: str
+    duration: float
+    fps: float
+    frame_count: int
+    width: int
+    height: int
+    codec: Optional[str]
+    audio_streams: List[AudioStreamInfo] = field(default_factory=list)
+    keyframes: Optional[List[float]] = None  # seconds; None if not probed
+
+    @property
+    def has_audio(self) -> bool:
+        return bool(self.audio_streams)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VideoProbe":
+        data = dict(data)
+        data["audio_streams"] = [AudioStreamInfo(**a) for a in data.get("audio_streams", [])]
+        return cls(**data)
+
+
+def _parse_rate(rate: Optional[str]) -> float:
+    num, _, den = (rate or "0/1").partition("/")
+    try:
+        den_f = float(den or 1)
+        return float(num) / den_f if den_f else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _run_ffprobe(video_path: str) -> VideoProbe:
+    entries = (
+        "format=duration:"
+        "stream=index,codec_type,codec_name,width,height,avg_frame_rate,"
+        "r_frame_rate,nb_frames,duration,sample_rate,channels"
+    )
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries", entries,
+        "-of", "json",
+        video_path,
+    ]
+    info = json.loads(subprocess.check_output(cmd).decode() or "{}")
+    count("subprocesses")
+
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = [s for s in streams if s.get("codec_type") == "audio"]
+
+    duration = float(info.get("format", {}).get("duration") or video.get("duration") or 0.0)
+    fps = _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")) or 25.0
+    nb_frames = video.get("nb_frames")
+    frame_count = int(nb_frames) if str(nb_frames or "").isdigit() else int(round(duration * fps))
+
+    return VideoProbe(
+        path=video_path,
+        duration=duration,
+        fps=fps,
+        frame_count=frame_count,
+        width=int(video.get("width") or 0),
+        height=int(video.get("height") or 0),
+        codec=video.get("codec_name"),
+        audio_streams=[
+            AudioStreamInfo(
+                index=int(a["index"]),
+                codec=a.get("codec_name"),
+                sample_rate=int(a.get("sample_rate") or 0),
+                channels=int(a.get("channels") or 0),
+            )
+            for a in audio
+        ],
+    )
+
+
+def _probe_keyframes(video_path: str) -> List[float]:
+    """
+    Keyframe times of the first video stream. Packet flags come from the
+    demuxer (no decoding); only video packets are listed, as CSV lines that
+    are parsed as they arrive, so long files are never held in memory.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags",
+        "-of", "csv=print_section=0",
+        video_path,
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    count("subprocesses")
+    keyframes: List[float] = []
+    try:
+        for line in proc.stdout:
+            fields = line.strip().split(",")
+            pts_time, flags = fields[0], fields[-1]
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+    keyframes.sort()  # packets are listed in decode order
+    return keyframes
+
+
+def _disk_cache_path(cache_dir: str, key: Tuple[str, int, int]) -> str:
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    return os.path.join(cache_dir, f"probe_{digest}.json")
+
+
+def _load_from_disk(path: str) -> Optional[VideoProbe]:
+    try:
+        with open(path, "r") as f:
+            return VideoProbe.from_dict(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _save_to_disk(path: str, probe: VideoProbe) -> None:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(probe), f)
+        os.replace(tmp_path, path)  # atomic: concurrent writers never see partial files
+    except OSError as e:
+        print(f"[WARN] Could not write probe cache {path}: {e}")
+
+
+def probe_video(
+    video_path: str,
+    with_keyframes: bool = False,
+    cache_dir: Optional[str] = None,
+) -> VideoProbe:
+    """
+    Probe a file once and reuse the result.
+
+    Results are memoized in-process and, if `cache_dir` (or the
+    EDITDNA_PROBE_CACHE_DIR env var) is set, stored on disk. Both caches are
+    keyed by absolute path + size + mtime, so edited files are re-probed.
+
+    Args:
+        video_path: Path to the video file
+        with_keyframes: Also list keyframe timestamps (a second, demux-only
+            ffprobe pass over the video packets; added to a cached probe)
+        cache_dir: Optional directory for the on-disk cache
+
+    Returns:
+        VideoProbe for the file
+    """
+    st = os.stat(video_path)
+    key = (os.path.abspath(video_path), st.st_size, st.st_mtime_ns)
+
+    with _memo_lock:
+        cached = _memo.get(key)
+    if cached is not None and (cached.keyframes is not None or not with_keyframes):
+        return cached
+
+    cache_dir = cache_dir or os.environ.get(PROBE_CACHE_ENV)
+    disk_path = _disk_cache_path(cache_dir, key) if cache_dir else None
+    probe = _load_from_disk(disk_path) if disk_path and os.path.exists(disk_path) else None
+    if probe is None:
+        probe = cached
+
+    changed = probe is None
+    if probe is None:
+        probe = _run_ffprobe(video_path)
+    if with_keyframes and probe.keyframes is None:
+        # only the keyframe pass; the metadata is already known
+        probe = replace(probe, keyframes=_probe_keyframes(video_path))
+        changed = True
+    if changed and disk_path:
+        _save_to_disk(disk_path, probe)
+    probe.path = video_path
+
+    with _memo_lock:
+        if len(_memo) >= _MEMO_MAX_ENTRIES:
+            _memo.pop(next(iter(_memo)))
+        _memo[key] = probe
+    return probe
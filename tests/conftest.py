@@ -0,0 +1,25 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+def _predict_shot_probabilities(model, windows):
+    frames = windows.astype(np.float32)
+    diff = np.abs(frames[:, 1:] - frames[:, :-1]).mean(axis=(2, 3, 4))
+    probs = np.zeros(windows.shape[:2], dtype=np.float32)
+    probs[:, 1:] = np.minimum(diff / 40.0, 1.0)
+    return probs
+
+
+@pytest.fixture
+def fake_transnet(monkeypatch):
+    """Stand-in TransNet: a boundary wherever consecutive frames differ a lot."""
+    from src import shot_detection
+
+    module = types.SimpleNamespace(load_model=lambda: object(),
+                                   predict_shot_probabilities=_predict_shot_probabilities)
+    monkeypatch.setitem(sys.modules, "src.transnetv2_model", module)
+    monkeypatch.setattr(shot_detection, "_transnet_model", None)
+    return module
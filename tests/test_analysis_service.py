@@ -0,0 +1,118 @@
+import http.client
+import json
+import time
+import urllib.error
+import urllib.request
+import threading
+
+import pytest
+from analysis_service import AnalysisService, QueueFull, make_server
+
+
+def _sleepy_runner(path, options, output, fmt):
+    time.sleep(options.get("video_meta", {}).get("sleep", 0.0))
+    with open(output, "w") as f:
+        json.dump({"analysis_json": {"video": {"id": path}}}, f)
+    return {"media_seconds": 1.0}
+
+
+def _wait_for(predicate, timeout=30.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def service(tmp_path):
+    svc = AnalysisService(str(tmp_path / "out"), workers=1, queue_size=1,
+                          runner=_sleepy_runner, warm=False)
+    svc.start()
+    _wait_for(lambda: svc.ready_workers() == 1)
+    yield svc
+    svc.close()
+
+
+def test_queue_backpressure_and_results(service, tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x")
+    slow = {"video_meta": {"sleep": 0.5}}
+
+    first = service.submit(str(video), slow)
+    _wait_for(lambda: service.job(first.id).state == "running")
+    second = service.submit(str(video), slow)     # fills the one queue slot
+    with pytest.raises(QueueFull) as full:
+        service.submit(str(video), slow)
+    assert full.value.retry_after >= 1
+    assert service.stats()["queue_depth"] == 1
+
+    with pytest.raises(ValueError):
+        service.submit(str(video), {"not_an_option": 1})
+    with pytest.raises(ValueError):
+        service.submit(str(tmp_path / "missing.mp4"))
+
+    _wait_for(lambda: service.job(second.id).state == "done")
+    assert service.job(first.id).info == {"media_seconds": 1.0}
+    worker = service.stats()["workers"][0]
+    assert worker["jobs_done"] == 2 and 0.0 < worker["utilization"] <= 1.0
+
+
+def test_http_endpoints(service, tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x")
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(method, path, body=None):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(base + path, data=data, method=method)
+        try:
+            with urllib.request.urlopen(req) as resp:
+                return resp.status, dict(resp.headers), resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+
+    try:
+        code, headers, body = call("POST", "/jobs", {"path": str(video)})
+        assert code == 202
+        job_id = json.loads(body)["id"]
+        assert headers["Location"] == f"/jobs/{job_id}"
+        _wait_for(lambda: json.loads(call("GET", f"/jobs/{job_id}")[2])["state"] == "done")
+        code, _, body = call("GET", f"/jobs/{job_id}/result")
+        assert code == 200 and json.loads(body)["analysis_json"]["video"]["id"] == str(video)
+
+        assert call("GET", "/jobs/nope")[0] == 404
+        assert call("POST", "/jobs", {"path": str(video), "options": {"bogus": 1}})[0] == 400
+        for bad_length in ("abc", "-5"):
+            conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+            conn.putrequest("POST", "/jobs")
+            conn.putheader("Content-Length", bad_length)
+            conn.endheaders()
+            assert conn.getresponse().status == 400
+            conn.close()
+        assert call("GET", "/health")[0] == 200
+        stats = json.loads(call("GET", "/stats")[2])
+        assert stats["queue_capacity"] == 1 and len(stats["workers"]) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_close_respects_timeout_with_more_workers_than_slots(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x")
+    svc = AnalysisService(str(tmp_path / "out"), workers=2, queue_size=1,
+                          runner=_sleepy_runner, warm=False)
+    svc.start()
+    _wait_for(lambda: svc.ready_workers() == 2)
+    slow = {"video_meta": {"sleep": 3.0}}
+    jobs = [svc.submit(str(video), slow) for _ in range(2)]
+    _wait_for(lambda: all(svc.job(j.id).state == "running" for j in jobs))
+    queued = svc.submit(str(video), slow)
+
+    started = time.time()
+    svc.close(timeout=0.5)
+    # the running jobs are cut off, not waited for
+    assert time.time() - started < 2.5
+    assert svc.job(queued.id).state == "failed"
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from src.processing.audio_processor import iter_window_loudness, SILENCE_DB
+
+
+def _collect(chunks, window, hop):
+    starts, ends, dbs = [], [], []
+    for s, e, db in iter_window_loudness(iter(chunks), window, hop):
+        starts.extend(s.tolist())
+        ends.extend(e.tolist())
+        dbs.extend(db.tolist())
+    return starts, ends, dbs
+
+
+def test_loudness_independent_of_chunking():
+    rng = np.random.default_rng(0)
+    pcm = (rng.standard_normal(10_050) * 3000).astype(np.int16)
+    pcm[2000:4000] = 0
+    whole = _collect([pcm], 1000, 500)
+    chunked = _collect(np.array_split(pcm, 7), 1000, 500)
+
+    assert whole[0] == chunked[0] and whole[1] == chunked[1]
+    np.testing.assert_allclose(whole[2], chunked[2])
+    assert whole[0][-1] == 10_000 and whole[1][-1] == 10_050
+    assert whole[2][4:7] == [SILENCE_DB] * 3
+
+
+def test_hop_longer_than_window_across_chunks():
+    x = np.arange(1, 11, dtype=np.int16) * 1000
+    # the chunk ends inside the gap between windows 0-1 / 5-6 and the next start
+    assert _collect([x[:8], x[8:]], 2, 5)[:2] == _collect([x], 2, 5)[:2] == ([0, 5], [2, 7])
+
+    rng = np.random.default_rng(3)
+    pcm = (rng.standard_normal(5003) * 3000).astype(np.int16)
+    whole = _collect([pcm], 300, 700)
+    for n_chunks in (2, 7, 40):
+        chunked = _collect(np.array_split(pcm, n_chunks), 300, 700)
+        assert chunked[:2] == whole[:2]
+        np.testing.assert_allclose(chunked[2], whole[2])
+
+
+def test_full_scale_square_wave_is_0_dbfs():
+    pcm = np.tile(np.array([-32768, -32768], dtype=np.int16), 500)
+    _, _, dbs = _collect([pcm], 500, 500)
+    assert dbs == [pytest.approx(0.0), pytest.approx(0.0)]
+
+
+def _flags(pcm, window, hop, n_chunks=1):
+    from src.processing.audio_processor import _iter_windows
+    from src.processing.audio_features import classify_windows, window_features
+    flags = []
+    for offset, samples, starts, ends in _iter_windows(iter(np.array_split(pcm, n_chunks)), window, hop):
+        flags.extend(classify_windows(window_features(samples, starts, ends, 16000, offset)).tolist())
+    return flags
+
+
+def test_tone_silence_noise_flags():
+    from src.models.tables import MUSIC, SFX
+    t = np.arange(16000) / 16000
+    tone = (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+    noise = (np.random.default_rng(0).standard_normal(16000) * 8000).astype(np.int16)
+    pcm = np.concatenate((tone, np.zeros(16000, dtype=np.int16), noise))
+    assert _flags(pcm, 8000, 8000) == [MUSIC] * 2 + [0] * 2 + [SFX] * 2
+
+
+def test_flags_independent_of_chunking():
+    rng = np.random.default_rng(1)
+    t = np.arange(40_000) / 16000
+    pcm = (np.sin(2 * np.pi * 300 * t) * 6000 * (t > 1.2)
+           + rng.standard_normal(len(t)) * 2000 * (t < 0.7)).astype(np.int16)
+    assert _flags(pcm, 4000, 2000) == _flags(pcm, 4000, 2000, n_chunks=9)
+
+
+def test_frame_hop_is_fixed_and_features_independent_of_chunking():
+    from src.processing.audio_features import stft_params, window_features
+    from src.processing.audio_processor import _iter_windows
+    # ~10 ms whatever the window hop (a 333 ms hop used to force 1-2 sample hops)
+    assert stft_params(16000) == (512, 160)
+    assert stft_params(22050) == (1024, 220)
+
+    rng = np.random.default_rng(2)
+    t = np.arange(48_000) / 16000
+    pcm = (np.sin(2 * np.pi * 220 * t) * 5000 * (t > 1.0)
+           + rng.standard_normal(len(t)) * 1500).astype(np.int16)
+
+    def features(n_chunks):
+        parts = [window_features(samples, starts, ends, 16000, offset)
+                 for offset, samples, starts, ends
+                 in _iter_windows(iter(np.array_split(pcm, n_chunks)), 8000, 5328)]
+        return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+    whole, chunked = features(1), features(7)
+    for name in whole:
+        np.testing.assert_allclose(chunked[name], whole[name], rtol=1e-5, atol=1e-6, err_msg=name)
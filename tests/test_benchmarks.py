@@ -0,0 +1,52 @@
+import shutil
+
+import cv2
+import pytest
+from benchmarks.run_benchmarks import compare_results
+from benchmarks.synthetic import SyntheticSpec, make_synthetic_video
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_synthetic_video_matches_its_truth(tmp_path):
+    spec = SyntheticSpec(name="tiny", width=160, height=90, duration=4.0, fps=10.0,
+                         min_shot=0.5, max_shot=1.5)
+    path, truth = make_synthetic_video(spec, str(tmp_path))
+
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 40
+    cap.release()
+    assert truth.cut_times == sorted(truth.cut_times)
+    assert all(0 < t < spec.duration for t in truth.cut_times)
+    assert truth.tone_spans[0] == (0.0, 2.0)
+    assert truth.silence_spans == [(2.0, 4.0)]
+
+    # reused from disk (truth round-trips through JSON) rather than re-rendered
+    _, again = make_synthetic_video(spec, str(tmp_path))
+    assert again.cut_times == truth.cut_times
+
+
+def test_compare_results_reports_wall_ratio():
+    old = {"results": [{"video": "v", "stage": "detect_shots", "engine": "ffmpeg",
+                        "wall_s": 2.0, "peak_rss_mb": 100.0}]}
+    new = {"results": [{"video": "v", "stage": "detect_shots", "engine": "ffmpeg",
+                        "wall_s": 3.0, "peak_rss_mb": 90.0},
+                       {"video": "v", "stage": "extract_ocr", "engine": None,
+                        "error": "boom"}]}
+    rows = compare_results(old, new)
+    assert rows == [{"video": "v", "stage": "detect_shots", "engine": "ffmpeg",
+                     "wall_ratio": 1.5, "rss_delta_mb": -10.0}]
+
+
+def test_match_cuts_is_one_to_one_within_tolerance():
+    from benchmarks.eval_shot_engines import match_cuts
+    truth = [1.0, 2.0, 5.0]
+    # two predictions near 1.0 can only claim it once; 3.0 is a false positive
+    assert match_cuts([0.96, 1.04, 2.05, 3.0], truth, tolerance_s=0.08) == (2, 2, 1)
+    assert match_cuts([], truth, tolerance_s=0.08) == (0, 0, 3)
+
+
+def test_pareto_front_marks_non_dominated_points():
+    from benchmarks.eval_shot_engines import pareto_front
+    # (f1, frames/s)
+    points = [(0.9, 100.0), (0.7, 500.0), (0.6, 400.0), (0.9, 50.0)]
+    assert pareto_front(points) == [True, True, False, False]
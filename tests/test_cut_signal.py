@@ -0,0 +1,103 @@
+import shutil
+
+import numpy as np
+import pytest
+from src.shot_detection import CutSignal, resegment, split_engine_kwargs
+
+
+def _signal(engine="transnetv2", fps=25.0, n=250):
+    scores = np.zeros(n, dtype=np.float32)
+    scores[[50, 53, 120, 200]] = [0.9, 0.7, 0.6, 0.95]
+    return CutSignal(engine=engine, times=np.arange(n) / fps, scores=scores,
+                     start_time=0.0, end_time=n / fps, duration=n / fps)
+
+
+def test_resegment_applies_threshold_and_min_gap():
+    signal = _signal()
+    cuts = lambda shots: [round(s.t_start * 25) for s in shots[1:]]
+    assert cuts(resegment(signal, probability_threshold=0.5, min_gap_frames=5)) == [50, 120, 200]
+    # the 3-frame shot at 50 is kept as a cut but dropped by _normalize_shots (< 0.2 s)
+    assert cuts(resegment(signal, probability_threshold=0.5, min_gap_frames=1)) == [53, 120, 200]
+    assert cuts(resegment(signal, probability_threshold=0.8)) == [50, 200]
+    # _normalize_shots drops shots shorter than min_length
+    shots = resegment(signal, probability_threshold=0.5, min_gap_frames=1, min_length=0.5)
+    assert [s.index for s in shots] == list(range(len(shots)))
+    assert all(s.t_end - s.t_start >= 0.5 for s in shots)
+    assert shots[-1].t_end == signal.duration
+
+
+def test_save_load_round_trip(tmp_path):
+    signal = _signal(engine="ffmpeg")
+    signal.params = {"note": "x"}
+    path = str(tmp_path / "sig.npz")
+    signal.save(path)
+    loaded = CutSignal.load(path)
+    assert loaded.engine == "ffmpeg" and loaded.params == {"note": "x"}
+    np.testing.assert_array_equal(loaded.scores, signal.scores)
+    assert [(s.t_start, s.t_end) for s in resegment(loaded, scene_threshold=0.65)] == \
+        [(s.t_start, s.t_end) for s in resegment(signal, scene_threshold=0.65)]
+
+
+def test_split_engine_kwargs():
+    signal_kw, segment_kw = split_engine_kwargs(
+        "histogram", {"threshold": 0.3, "min_scene_len": 10, "color_space": "hsv", "bins": 16}
+    )
+    assert signal_kw == {"color_space": "hsv", "bins": 16}
+    assert segment_kw == {"threshold": 0.3, "min_scene_len": 10}
+    with pytest.raises(TypeError):
+        resegment(_signal(engine="histogram"), color_space="hsv")
+
+
+def test_adaptive_cut_stream_matches_batch_rule():
+    from src.shot_detection import _AdaptiveCutStream, _adaptive_cut_frames
+
+    rng = np.random.default_rng(0)
+    scores = (rng.random(2000) ** 8).astype(np.float32)
+    expected = _adaptive_cut_frames(scores, 0.25, 3.0, 8, 15)
+    stream = _AdaptiveCutStream(threshold=0.25, adaptive_ratio=3.0, adaptive_window=8, min_scene_len=15)
+    cuts, pos = [], 0
+    for size in rng.integers(1, 100, size=100):
+        cuts += stream.push(scores[pos:pos + size])
+        pos += size
+    cuts += stream.push(scores[pos:])
+    cuts += stream.finish()
+    assert expected and cuts == expected
+
+
+def test_cascade_regions_skip_confident_and_merge():
+    from src.shot_detection import _cascade_regions
+    scores = np.zeros(200, dtype=np.float32)
+    scores[50] = 0.9                 # confident cut
+    scores[52] = 0.2                 # borderline, but next to the confident cut
+    scores[[100, 110]] = 0.2         # close borderline frames share one region
+    scores[180] = 0.1
+    regions = _cascade_regions(scores, [50], low=0.08, radius=3, context=25, min_gap=5)
+    assert regions == [(72, 139, 97, 114), (152, 200, 177, 184)]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize("engine", ["pyscenedetect", "ffmpeg", "transnetv2", "histogram"])
+def test_cached_shot_stage_matches_uncached(engine, tmp_path, request):
+    from benchmarks.synthetic import SyntheticSpec, make_synthetic_video, synthetic_probe
+    from src.utils.stage_cache import StageCache, fingerprint_file
+    from video_analysis_pipeline import detect_shots_cached
+
+    if engine == "pyscenedetect":
+        pytest.importorskip("scenedetect")
+    if engine == "transnetv2":
+        request.getfixturevalue("fake_transnet")
+
+    spec = SyntheticSpec(name="stage", width=160, height=90, duration=8.0, fps=25.0,
+                         min_shot=1.0, max_shot=2.5)
+    path, _ = make_synthetic_video(spec, str(tmp_path))
+    probe = synthetic_probe(spec, path)
+    cache = StageCache(str(tmp_path / "cache"))
+    fp = fingerprint_file(path)
+    kwargs = {"threshold": 0.2} if engine == "histogram" else {}
+
+    bounds = lambda shots: [(s.index, s.t_start, s.t_end) for s in shots]
+    uncached = bounds(detect_shots_cached(path, engine, kwargs, probe))
+    assert len(uncached) > 1
+    assert bounds(detect_shots_cached(path, engine, kwargs, probe, cache, fp)) == uncached
+    # second call is served from the cache
+    assert bounds(detect_shots_cached(path, engine, kwargs, probe, cache, fp)) == uncached
@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+import pytest
+from src.processing.frame_sampler import FrameSampler
+from src.utils.video_probe import VideoProbe
+
+
+@pytest.fixture
+def ramp_video(tmp_path):
+    """30 frames whose brightness encodes the frame index."""
+    path = str(tmp_path / "ramp.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(30):
+        writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def _probe(path):
+    return VideoProbe(path=path, duration=3.0, fps=10.0, frame_count=30,
+                      width=64, height=48, codec="mjpeg")
+
+
+def test_sampler_serves_all_stages_in_one_pass(ramp_video):
+    sampler = FrameSampler(ramp_video, probe=_probe(ramp_video))
+    seen_a, seen_b = [], []
+    sampler.request(2.0, lambda f: seen_a.append(int(f.mean())))
+    sampler.request(0.5, lambda f: seen_a.append(int(f.mean())))
+    sampler.request(0.5, lambda f: seen_b.append(int(f.mean())))
+
+    assert sampler.run() == 2
+    # delivered in decode order, shared frame handed to both stages
+    assert seen_a == [pytest.approx(40, abs=3), pytest.approx(160, abs=3)]
+    assert seen_b == [pytest.approx(40, abs=3)]
+    assert sampler.frames_decoded == 21
+
+
+def test_sampler_drops_requests_past_end(ramp_video):
+    sampler = FrameSampler(ramp_video, probe=_probe(ramp_video))
+    seen = []
+    sampler.request(99.0, seen.append)
+    assert sampler.run() == 0
+    assert seen == []
+
+
+def test_sampler_resumes_between_runs(ramp_video):
+    sampler = FrameSampler(ramp_video, probe=_probe(ramp_video))
+    seen = []
+    sampler.request(0.5, lambda f: seen.append(int(f.mean())))
+    assert sampler.run(close=False) == 1
+    sampler.request(0.2, seen.append)  # already passed: dropped
+    sampler.request(2.0, lambda f: seen.append(int(f.mean())))
+    assert sampler.run() == 2
+    assert seen == [pytest.approx(40, abs=3), pytest.approx(160, abs=3)]
+    assert sampler.frames_decoded == 21
@@ -0,0 +1,121 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.analysis.llm_client import LLMClient, LLMError
+from src.analysis.llm_integration import call_llm_blueprint
+from src.analysis.prompt_compaction import compact_analysis, estimate_tokens
+from src.utils.stage_cache import StageCache
+
+BLUEPRINT = {"editing_style": "calm", "recommended_aspect_ratio": "9:16"}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so the client can reuse connections
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        server.requests.append((self.path, self.headers.get("Authorization"), body))
+        if server.fail_first and len(server.requests) <= server.fail_first:
+            status, payload = 503, {"error": "busy"}
+        else:
+            status = 200
+            payload = {"choices": [{"message": {"content": json.dumps(BLUEPRINT)}}]}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    server.fail_first = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **kwargs):
+    host, port = server.server_address
+    return LLMClient(base_url=f"http://{host}:{port}/v1", api_key="test-key",
+                     model="stub-model", backoff=0.01, **kwargs)
+
+
+def _big_analysis(n_shots=2000, n_audio=20000):
+    shots = [{"index": i, "t_start": i * 1.0, "t_end": i + 1.0,
+              "shot_type": "TALKING_HEAD" if i % 3 else "BROLL", "faces_present": 1,
+              "overlay_text": [{"text": f"word{i % 50}", "bbox": {}}]}
+             for i in range(n_shots)]
+    segments = [{"index": i, "t_start": i * 0.5, "t_end": i * 0.5 + 0.5,
+                 "has_speech": i % 7 != 0, "has_music": False, "has_sfx": False,
+                 "loudness_db": -80.0 if i % 7 == 0 else -20.0}
+                for i in range(n_audio)]
+    return {"video": {"title": "t", "duration_seconds": 2000.0},
+            "edit_stats": {"total_shots": n_shots},
+            "shots": shots, "audio_pattern": {"segments": segments},
+            "overlay_text_blocks": [], "transcript_outline": {}}
+
+
+def test_compaction_fits_budget():
+    analysis = _big_analysis()
+    assert estimate_tokens(analysis) > 500_000
+    compact = compact_analysis(analysis, token_budget=3000)
+    assert estimate_tokens(compact) <= 3000
+    assert compact["edit_stats"] == {"total_shots": 2000}
+    assert "bins" in compact["shot_timeline"]
+    assert compact["audio_stats"]["silence_ratio"] == pytest.approx(1 / 7, abs=0.01)
+
+
+def test_small_analysis_keeps_runs():
+    analysis = _big_analysis(n_shots=6, n_audio=4)
+    compact = compact_analysis(analysis)
+    assert compact["shot_timeline"]["runs"][:2] == [["BROLL", 0.0, 1.0, 1], ["TALKING_HEAD", 1.0, 3.0, 2]]
+    assert [e[3] for e in compact["overlay_text"]] == [f"word{i}" for i in range(6)]
+
+
+def test_blueprint_call_retries_pools_and_caches(stub_server, tmp_path):
+    stub_server.fail_first = 2
+    client = _client(stub_server)
+    cache = StageCache(str(tmp_path))
+    analysis = _big_analysis(n_shots=50, n_audio=200)
+
+    assert call_llm_blueprint(analysis, client=client, cache=cache) == BLUEPRINT
+    path, auth, body = stub_server.requests[-1]
+    assert (path, auth) == ("/v1/chat/completions", "Bearer test-key")
+    assert body["model"] == "stub-model"
+    assert len(stub_server.requests) == 3  # two 503s, then success
+
+    # same compacted prompt + model: served from the cache
+    assert call_llm_blueprint(analysis, client=client, cache=cache) == BLUEPRINT
+    assert len(stub_server.requests) == 3
+    # a different model is a different cache entry
+    call_llm_blueprint(analysis, model_name="other", client=client, cache=cache)
+    assert len(stub_server.requests) == 4
+    client.close()
+
+
+def test_client_gives_up_after_retries(stub_server):
+    stub_server.fail_first = 10
+    client = _client(stub_server, max_retries=1)
+    with pytest.raises(LLMError):
+        client.chat([{"role": "user", "content": "hi"}])
+    assert len(stub_server.requests) == 2
+
+
+def test_no_endpoint_returns_placeholder(monkeypatch):
+    monkeypatch.delenv("EDITDNA_LLM_BASE_URL", raising=False)
+    blueprint = call_llm_blueprint({"shots": []})
+    assert "editing_style" in blueprint
@@ -0,0 +1,50 @@
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+import pytest
+from src.models.data_models import Shot
+from src.processing import ocr_processor
+from src.utils.video_probe import VideoProbe
+
+
+@pytest.fixture
+def captioned_video(tmp_path):
+    """8 s at 10 fps: caption A for 0-3 s, caption B for 3-6 s, no text after."""
+    path = str(tmp_path / "captions.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (640, 360))
+    for i in range(80):
+        frame = np.full((360, 640, 3), 40, dtype=np.uint8)
+        cv2.circle(frame, (100 + i * 5, 150), 40, (0, 120, 200), -1)  # moving background
+        caption = "First caption here" if i < 30 else "Second one below" if i < 60 else None
+        if caption:
+            cv2.putText(frame, caption, (120, 320), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+        writer.write(frame)
+    writer.release()
+    probe = VideoProbe(path=path, duration=8.0, fps=10.0, frame_count=80,
+                       width=640, height=360, codec="mjpeg")
+    return path, probe
+
+
+def test_unchanged_captions_extend_blocks_without_ocr(captioned_video, monkeypatch):
+    path, probe = captioned_video
+    calls = []
+
+    class FakePool:
+        def submit(self, image, psm=6):
+            calls.append(image.shape)
+            future = Future()
+            future.set_result([(f"caption{len(calls)}", 0, 0, 10, 10)])
+            return future
+
+    shots = [Shot(index=0, t_start=0.0, t_end=4.0), Shot(index=1, t_start=4.0, t_end=8.0)]
+    blocks = ocr_processor.extract_overlay_blocks(
+        path, shots, sample_fps=4.0, probe=probe, pool=FakePool()
+    )
+
+    assert len(calls) == 2  # one OCR per distinct caption, not per sample (32)
+    assert [b.text for b in blocks] == ["caption1", "caption2"]
+    assert blocks[0].t_start < 0.5 and blocks[0].t_end == pytest.approx(3.0, abs=0.3)
+    assert blocks[1].t_start == pytest.approx(3.0, abs=0.3)
+    assert blocks[1].t_end == pytest.approx(6.0, abs=0.3)
+    assert all(b.is_caption and b.position == "BOTTOM" for b in blocks)
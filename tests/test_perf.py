@@ -0,0 +1,45 @@
+import json
+import logging
+
+from src.utils.perf import PerfRecorder, PrometheusTextfileHook, count, logging_hook
+
+
+def test_recorder_collects_counters_and_calls_hooks():
+    seen = []
+    recorder = PerfRecorder([seen.append])
+    with recorder.stage("detect_shots"):
+        count("subprocesses")
+        count("frames_decoded", 250)
+        count("bytes_read", 4096)
+    count("frames_decoded", 99)  # outside any stage: dropped
+
+    assert [m.stage for m in seen] == ["detect_shots"]
+    m = seen[0]
+    assert (m.subprocesses, m.frames_decoded, m.bytes_read, m.seeks) == (1, 250, 4096, 0)
+    assert m.wall_s >= 0 and m.peak_rss_mb > 0
+    perf = recorder.as_dict()
+    assert perf["stages"][0]["frames_decoded"] == 250
+    assert perf["total_wall_s"] == m.wall_s
+
+
+def test_disabled_recorder_records_nothing():
+    seen = []
+    recorder = PerfRecorder([seen.append], enabled=False)
+    with recorder.stage("detect_shots"):
+        count("frames_decoded", 10)
+    assert seen == [] and recorder.stages == []
+
+
+def test_prometheus_and_logging_hooks(tmp_path, caplog):
+    path = str(tmp_path / "editdna.prom")
+    recorder = PerfRecorder([PrometheusTextfileHook(path), logging_hook()])
+    with caplog.at_level(logging.INFO, logger="editdna.perf"):
+        for _ in range(2):
+            with recorder.stage("extract_audio_segments"):
+                count("subprocesses")
+
+    text = open(path).read()
+    assert 'editdna_stage_runs_total{stage="extract_audio_segments"} 2' in text
+    assert 'editdna_stage_subprocesses_total{stage="extract_audio_segments"} 2' in text
+    assert "# TYPE editdna_stage_peak_rss_bytes gauge" in text
+    assert json.loads(caplog.records[0].getMessage())["stage"] == "extract_audio_segments"
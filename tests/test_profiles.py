@@ -0,0 +1,82 @@
+from config import ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS
+from src.processing import face_detection
+from src.utils import profiles as profiles_mod
+from src.utils.perf import StageMetrics
+from src.utils.profiles import (
+    AnalysisProfile, StageCostTable, available_profiles, choose_profile, load_profiles,
+)
+from src.utils.video_probe import VideoProbe
+
+
+def _probe(duration=100.0, width=1280, height=720):
+    return VideoProbe(path="x.mp4", duration=duration, fps=25.0, frame_count=int(duration * 25),
+                      width=width, height=height, codec="h264")
+
+
+def test_config_profiles_resolve():
+    profiles = load_profiles(ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS)
+    assert [p.name for p in profiles] == list(ANALYSIS_PROFILES)
+    interactive = AnalysisProfile.from_config("interactive", ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS)
+    kwargs = interactive.analyze_kwargs()
+    assert kwargs["shot_engine"] == "histogram"
+    assert kwargs["shot_engine_kwargs"]["frame_step"] == 2
+    assert set(kwargs) == {"shot_engine", "shot_engine_kwargs", "classify_kwargs",
+                           "overlay_sample_fps", "audio_hop_ms"}
+
+
+def _profiles():
+    costs = {"cheap": 0.01, "mid": 0.05, "slow": 0.5}
+    return [AnalysisProfile(name, "histogram", stage_costs={"detect_shots": rate})
+            for name, rate in costs.items()]
+
+
+def test_choose_profile_fits_budget_and_resolution():
+    profiles = _profiles()
+    assert choose_profile(profiles, _probe(), 0.1)[0].name == "mid"
+    assert choose_profile(profiles, _probe(width=320, height=180), 0.1)[0].name == "slow"
+    # nothing fits: cheapest
+    assert choose_profile(profiles, _probe(), 0.001)[0].name == "cheap"
+
+
+def test_measured_costs_replace_nominal(tmp_path):
+    path = str(tmp_path / "costs.json")
+    table = StageCostTable(path)
+    mid = _profiles()[1]
+    # mid measured at 0.2 s per media-second: no longer fits 0.1x
+    table.record("mid", _probe(), [StageMetrics(stage="detect_shots", wall_s=20.0),
+                                   StageMetrics(stage="probe_video", wall_s=5.0)])
+    assert table.rate(mid, "detect_shots") == 0.2
+    reloaded = StageCostTable(path)
+    assert reloaded.rate(mid, "probe_video") == 0.0
+    assert choose_profile(_profiles(), _probe(), 0.1, reloaded)[0].name == "cheap"
+
+
+class _FakeDetector:
+    name = "fake"
+
+    def __init__(self, **kwargs):
+        pass
+
+    def count_faces(self, frames):
+        return [0] * len(frames)
+
+
+def _missing_model():
+    raise ImportError("no model weights")
+
+
+def test_unavailable_profiles_are_skipped(monkeypatch):
+    monkeypatch.setitem(face_detection.FACE_DETECTORS, "test_ok", _FakeDetector)
+    monkeypatch.setitem(profiles_mod.ENGINE_REQUIREMENTS, "test_needs_model", _missing_model)
+    profiles = [
+        AnalysisProfile("cheap", "histogram", face_detector="test_ok",
+                        stage_costs={"detect_shots": 0.01}),
+        AnalysisProfile("mid", "histogram", face_detector="test_ok",
+                        stage_costs={"detect_shots": 0.05}),
+        # the most thorough one fits the budget but its model is missing
+        AnalysisProfile("slow", "test_needs_model", face_detector="test_ok",
+                        stage_costs={"detect_shots": 0.06}),
+    ]
+    usable = available_profiles(profiles)
+    assert [p.name for p in usable] == ["cheap", "mid"]
+    assert choose_profile(usable, _probe(), 0.1)[0].name == "mid"
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from src.utils.result_io import NDJSONWriter, read_result, read_sections, write_result
+
+
+def _result(n_segments=50):
+    return {
+        "analysis_json": {
+            "video": {"id": "v", "duration_seconds": 25.0},
+            "transcript_outline": {"intro": "hi"},
+            "shots": [{"index": i, "t_start": i * 5.0, "t_end": i * 5.0 + 5.0,
+                       "shot_type": "BROLL", "faces_present": None, "overlay_text": []}
+                      for i in range(5)],
+            "audio_pattern": {
+                "segment_length_s": 0.5,
+                "segments": [{"index": i, "t_start": i * 0.5, "t_end": i * 0.5 + 0.5,
+                              "has_speech": i % 2 == 0, "loudness_db": -20.0 - i}
+                             for i in range(n_segments)],
+            },
+            "overlay_text_blocks": [],
+            "edit_stats": {"num_shots": 5, "avg_shot_length_s": 5.0},
+        },
+        "editing_blueprint": {"editing_style": "dynamic"},
+    }
+
+
+@pytest.mark.parametrize("ext", [".json", ".ndjson"])
+def test_round_trip(tmp_path, ext):
+    path = str(tmp_path / f"r{ext}")
+    write_result(_result(), path)
+    assert read_result(path) == _result()
+
+
+def test_msgpack_round_trip_and_lazy_read(tmp_path):
+    pytest.importorskip("msgpack")
+    path = str(tmp_path / "r.msgpack")
+    write_result(_result(), path)
+    assert read_result(path) == _result()
+    assert read_sections(path, ["edit_stats"]) == {"edit_stats": _result()["analysis_json"]["edit_stats"]}
+
+
+def test_ndjson_lazy_read_stops_after_requested_sections(tmp_path):
+    path = tmp_path / "r.ndjson"
+    write_result(_result(), str(path))
+    # corrupt the tail: a lazy reader of the leading sections never parses it
+    with open(path, "a") as f:
+        f.write("not json\n")
+    sections = read_sections(str(path), ["video", "edit_stats"])
+    assert sections["edit_stats"]["num_shots"] == 5
+    assert set(sections) == {"video", "edit_stats"}
+    with pytest.raises(json.JSONDecodeError):
+        read_sections(str(path))
+
+
+def test_ndjson_rows_can_be_streamed(tmp_path):
+    path = tmp_path / "r.ndjson"
+    with open(path, "w") as f:
+        writer = NDJSONWriter(f)
+        writer.write_section("video", {"id": "v"})
+        writer.write_section("shots", [])
+        writer.write_rows("shots", ({"index": i} for i in range(3)))
+    assert read_sections(str(path))["shots"] == [{"index": 0}, {"index": 1}, {"index": 2}]
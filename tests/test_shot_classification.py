@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+import pytest
+from src.models.data_models import Shot
+from src.processing import face_detection
+from src.processing.face_detection import resize_for_analysis
+from src.processing.shot_classification import classify_shots
+from src.utils.video_probe import VideoProbe
+
+
+@pytest.fixture
+def bright_video(tmp_path):
+    """5 s of frames; the second half is bright."""
+    path = str(tmp_path / "bright.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (320, 240))
+    for i in range(50):
+        writer.write(np.full((240, 320, 3), 200 if i >= 25 else 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class BrightnessDetector:
+    """Counts a 'face' in bright frames and records batch sizes."""
+    name = "fake"
+    batches = []
+
+    def __init__(self, min_face_size=0.06):
+        self.min_face_size = min_face_size
+
+    def count_faces(self, frames):
+        BrightnessDetector.batches.append([f.shape for f in frames])
+        return [int(f.mean() > 100) for f in frames]
+
+
+def test_resize_for_analysis_only_downscales():
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    assert resize_for_analysis(frame, 640).shape == (360, 640, 3)
+    small = np.zeros((120, 160, 3), dtype=np.uint8)
+    assert resize_for_analysis(small, 640) is small
+
+
+def test_classify_shots_batches_downscaled_frames(bright_video, monkeypatch):
+    monkeypatch.setitem(face_detection.FACE_DETECTORS, "fake", BrightnessDetector)
+    BrightnessDetector.batches = []
+    probe = VideoProbe(path=bright_video, duration=5.0, fps=10.0, frame_count=50,
+                       width=320, height=240, codec="mjpeg")
+    shots = [Shot(index=i, t_start=i * 0.5, t_end=(i + 1) * 0.5) for i in range(10)]
+
+    classify_shots(bright_video, shots, probe=probe, detector="fake",
+                   analysis_width=160, batch_size=4)
+
+    assert [len(b) for b in BrightnessDetector.batches] == [4, 4, 2]
+    assert BrightnessDetector.batches[0][0] == (120, 160, 3)
+    assert [s.shot_type for s in shots] == ["BROLL"] * 5 + ["TALKING_HEAD"] * 5
+    assert [s.faces_present for s in shots] == [0] * 5 + [1] * 5
+
+
+def test_detector_is_reused_across_stage_threads(bright_video, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    built = []
+
+    class CountingDetector(BrightnessDetector):
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            built.append(self)
+
+    monkeypatch.setitem(face_detection.FACE_DETECTORS, "counting", CountingDetector)
+    probe = VideoProbe(path=bright_video, duration=5.0, fps=10.0, frame_count=50,
+                       width=320, height=240, codec="mjpeg")
+
+    def job():
+        shots = [Shot(index=i, t_start=i * 1.0, t_end=(i + 1) * 1.0) for i in range(5)]
+        return classify_shots(bright_video, shots, probe=probe, detector="counting")
+
+    # like analyze_video: every call runs its stages on a fresh thread pool
+    for _ in range(2):
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            shots = pool.submit(job).result()
+        assert shots[-1].shot_type == "TALKING_HEAD"
+    assert len(built) == 1
+
+
+def test_defaults_keep_original_haar_behaviour(bright_video, monkeypatch):
+    # no downscaling and no minimum face size unless asked for
+    monkeypatch.setitem(face_detection.FACE_DETECTORS, "fake", BrightnessDetector)
+    monkeypatch.setattr(face_detection, "_idle", {})
+    BrightnessDetector.batches = []
+    built = []
+    monkeypatch.setattr(BrightnessDetector, "__init__",
+                        lambda self, min_face_size=0.06: built.append(min_face_size))
+    probe = VideoProbe(path=bright_video, duration=5.0, fps=10.0, frame_count=50,
+                       width=320, height=240, codec="mjpeg")
+    shots = [Shot(index=0, t_start=3.0, t_end=4.0)]
+    classify_shots(bright_video, shots, probe=probe, detector="fake")
+    assert built == [0.06]                      # the detector's own default
+    assert BrightnessDetector.batches == [[(240, 320, 3)]]
+    assert shots[0].shot_type == "TALKING_HEAD"
+    classify_shots(bright_video, shots, probe=probe, detector="fake", min_face_size=0.1)
+    assert built == [0.06, 0.1]
@@ -0,0 +1,217 @@
+import shutil
+
+import cv2
+import numpy as np
+import pytest
+from src.shot_detection import (
+    TRANSNET_CONTEXT, TRANSNET_WINDOW, _adaptive_cut_frames, _decode_start, _iter_transnet_windows, _signal_transnet, _stitch_cuts, detect_shots,
+    detect_shots_histogram, plan_chunks,
+)
+from src.utils.video_probe import VideoProbe
+
+FPS = 25.0
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def _write_cut_video(path, cut_frames, n_frames=250, size=(160, 120)):
+    """A static colour gradient per shot, hard cuts at `cut_frames`."""
+    palette = [(140, 0, 0), (200, 255, 255), (0, 140, 0), (255, 200, 255), (0, 0, 140), (255, 255, 200)]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, size)
+    bounds = [0] + list(cut_frames) + [n_frames]
+    ramp = np.linspace(0.3, 1.0, size[0], dtype=np.float32)
+    for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        row = ramp if i % 2 else ramp[::-1]
+        frame = np.broadcast_to(row[None, :, None] * palette[i % len(palette)], (size[1], size[0], 3))
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        for _ in range(hi - lo):
+            writer.write(frame)
+    writer.release()
+    return VideoProbe(path=path, duration=n_frames / FPS, fps=FPS, frame_count=n_frames,
+                      width=size[0], height=size[1], codec="mjpeg",
+                      keyframes=[float(t) for t in range(0, int(n_frames / FPS), 2)])
+
+
+INDEX_BITS = 9
+
+
+def _write_index_video(path, n_frames=280):
+    """Frame i shows the bits of i as black/white vertical bars."""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (16 * INDEX_BITS, 48))
+    for i in range(n_frames):
+        frame = np.zeros((48, 16 * INDEX_BITS, 3), dtype=np.uint8)
+        for b in range(INDEX_BITS):
+            if i >> b & 1:
+                frame[:, 16 * b:16 * (b + 1)] = 255
+        writer.write(frame)
+    writer.release()
+    return VideoProbe(path=path, duration=n_frames / FPS, fps=FPS, frame_count=n_frames,
+                      width=16 * INDEX_BITS, height=48, codec="mjpeg")
+
+
+def _frame_indices(windows):
+    """Decode the index bars of [B, window, H, W, 3] TransNet input windows."""
+    width = windows.shape[3]
+    cols = [int((b + 0.5) * width / INDEX_BITS) for b in range(INDEX_BITS)]
+    bits = windows[:, :, windows.shape[2] // 2, cols, 0] > 127
+    return (bits * (1 << np.arange(INDEX_BITS))).sum(axis=-1)
+
+
+def _cut_frames(shots):
+    return [round(s.t_start * FPS) for s in shots[1:]]
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize("color_space", ["gray", "hsv"])
+def test_histogram_engine_finds_cuts(color_space, tmp_path):
+    cuts = [40, 82, 125, 167, 200]
+    probe = _write_cut_video(str(tmp_path / "cuts.avi"), cuts)
+    shots = detect_shots_histogram(probe.path, color_space=color_space, bins=16,
+                                   batch_size=64, probe=probe)
+    assert _cut_frames(shots) == cuts
+    assert shots[0].t_start == 0.0 and shots[-1].t_end == pytest.approx(10.0)
+    # a range keeps absolute times
+    ranged = detect_shots_histogram(probe.path, color_space=color_space, probe=probe,
+                                    start_time=4.0, end_time=8.0)
+    assert _cut_frames(ranged) == [125, 167]
+    assert ranged[0].t_start == 4.0
+
+
+@pytest.mark.parametrize("bins", [0, 24, 512])
+def test_histogram_bins_must_be_a_power_of_two(bins):
+    probe = VideoProbe(path="x", duration=1.0, fps=FPS, frame_count=25, width=1, height=1, codec="")
+    with pytest.raises(ValueError):
+        detect_shots_histogram("x.mp4", bins=bins, probe=probe)
+    with pytest.raises(ValueError):
+        detect_shots_histogram("x.mp4", color_space="rgb", probe=probe)
+
+
+def test_adaptive_cut_frames_keeps_spikes_and_drops_motion():
+    scores = np.zeros(200, dtype=np.float32)
+    scores[50] = 0.6                 # isolated spike: a cut
+    scores[100:130] = 0.5            # sustained motion: no cuts
+    scores[115] = 0.6
+    scores[160] = 0.6                # too close to 150 for min_scene_len
+    scores[150] = 0.7
+    assert _adaptive_cut_frames(scores, 0.25, 3.0, 8, 15) == [50, 150]
+    assert _adaptive_cut_frames(scores, 0.65, 3.0, 8, 15) == [150]
+    # frame 0 only starts a cut after min_scene_len frames
+    assert _adaptive_cut_frames(scores, 0.25, 3.0, 8, 60) == [150]
+
+
+class _IndexCapture:
+    """cv2.VideoCapture stand-in whose frame i is filled with the value i."""
+
+    def __init__(self, n_frames):
+        self.n_frames = n_frames
+        self.pos = 0
+
+    def read(self):
+        if self.pos >= self.n_frames:
+            return False, None
+        frame = np.full((54, 96, 3), self.pos, dtype=np.uint8)
+        self.pos += 1
+        return True, frame
+
+
+@pytest.mark.parametrize("n_frames", [1, 30, TRANSNET_WINDOW, 173, 250])
+@pytest.mark.parametrize("batch_size", [1, 3])
+def test_transnet_windows_predict_every_frame_once(n_frames, batch_size):
+    stitched = []
+    for batch, keep in _iter_transnet_windows(_IndexCapture(n_frames), TRANSNET_WINDOW,
+                                              TRANSNET_CONTEXT, batch_size):
+        assert batch.shape[1:] == (TRANSNET_WINDOW, 27, 48, 3) and len(batch) == len(keep)
+        # a "model" that predicts each frame's own index
+        stitched.extend(int(v) for w, (lo, hi) in enumerate(keep) for v in batch[w, lo:hi, 0, 0, 0])
+    assert stitched == list(range(n_frames))
+
+
+def test_transnet_windows_stop_at_max_frames():
+    windows = _iter_transnet_windows(_IndexCapture(250), TRANSNET_WINDOW, TRANSNET_CONTEXT, 2,
+                                     max_frames=120)
+    stitched = [int(v) for batch, keep in windows
+                for w, (lo, hi) in enumerate(keep) for v in batch[w, lo:hi, 0, 0, 0]]
+    assert stitched == list(range(120))
+
+
+@pytest.mark.parametrize("start_time", [0.0, 0.04, 1.0, 2.02, 3.3333, 5.98, 7.5])
+def test_transnet_range_labels_frames_exactly(start_time, tmp_path, fake_transnet, monkeypatch):
+    probe = _write_index_video(str(tmp_path / "index.avi"))
+    # a "model" that predicts each frame's own index
+    monkeypatch.setattr(fake_transnet, "predict_shot_probabilities",
+                        lambda model, windows: _frame_indices(windows).astype(np.float32))
+    signal = _signal_transnet(probe.path, probe=probe, start_time=start_time,
+                              end_time=start_time + 2.0)
+    first = int(np.ceil(start_time * FPS - 1e-6))
+    assert signal.scores.tolist() == list(range(first, first + 50))
+    np.testing.assert_allclose(signal.times * FPS, signal.scores)
+
+
+def test_cascade_refines_cut_on_exact_frame(tmp_path, fake_transnet, monkeypatch):
+    from src import shot_detection
+    probe = _write_index_video(str(tmp_path / "index.avi"))
+    cut = {}
+    monkeypatch.setattr(fake_transnet, "predict_shot_probabilities",
+                        lambda model, windows: (_frame_indices(windows) == cut["frame"]).astype(np.float32))
+
+    def borderline_signal(video_path, probe, start_time=0.0, end_time=None):
+        scores = np.zeros(probe.frame_count, dtype=np.float32)
+        scores[cut["frame"]] = 0.2          # inside the histogram band [0.08, 0.4)
+        return shot_detection.CutSignal(engine="histogram", times=np.arange(len(scores)) / FPS,
+                                        scores=scores, start_time=0.0, end_time=probe.duration,
+                                        duration=probe.duration)
+
+    monkeypatch.setitem(shot_detection.SIGNAL_FUNCS, "histogram",
+                        (borderline_signal, shot_detection._cuts_histogram))
+    for frame in range(40, 240):
+        cut["frame"] = frame
+        stats = {}
+        shots = shot_detection.detect_shots_cascade(probe.path, probe=probe, stats=stats)
+        assert stats["regions"] == 1
+        assert _cut_frames(shots) == [frame]
+
+
+def test_plan_chunks_splits_evenly():
+    probe = VideoProbe(path="x", duration=10.0, fps=FPS, frame_count=250, width=1, height=1, codec="")
+    assert plan_chunks(probe, 4) == [(0.0, 2.5), (2.5, 5.0), (5.0, 7.5), (7.5, 10.0)]
+    assert plan_chunks(probe, 1) == [(0.0, 10.0)]
+
+
+def test_decode_start_snaps_lead_in_to_keyframe():
+    probe = VideoProbe(path="x", duration=10.0, fps=FPS, frame_count=250, width=1, height=1,
+                       codec="", keyframes=[0.0, 2.0, 4.0, 6.0])
+    assert _decode_start(probe, 5.0, 2.0) == 2.0
+    assert _decode_start(probe, 6.0, 2.0) == 4.0
+    assert _decode_start(probe, 1.0, 2.0) == 0.0
+    probe.keyframes = None
+    assert _decode_start(probe, 5.0, 2.0) == 3.0
+
+
+def test_stitch_cuts_merges_seam_duplicates():
+    # 5.0 was seen from both sides of the seam; 0.0 is the video start
+    assert _stitch_cuts([5.04, 1.6, 0.0, 5.0, 8.0], tolerance=0.06) == [1.6, 5.0, 8.0]
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize("engine", ["histogram", "ffmpeg", "transnetv2"])
+def test_chunked_detection_matches_serial(engine, tmp_path, request):
+    if engine == "transnetv2":
+        request.getfixturevalue("fake_transnet")
+    # seams of 2 chunks at frame 125, of 3 chunks at frames 83 and 167
+    cuts = [40, 82, 125, 167, 200]
+    probe = _write_cut_video(str(tmp_path / "cuts.avi"), cuts)
+    serial = detect_shots(probe.path, engine=engine, probe=probe)
+    assert _cut_frames(serial) == cuts
+    for workers in (2, 3):
+        chunked = detect_shots(probe.path, engine=engine, probe=probe, workers=workers,
+                               chunk_overlap=1.0)
+        assert [(s.t_start, s.t_end) for s in chunked] == [(s.t_start, s.t_end) for s in serial]
+
+
+@needs_ffmpeg
+def test_chunked_signal_matches_serial(tmp_path):
+    from src.shot_detection import compute_cut_signal
+    probe = _write_cut_video(str(tmp_path / "cuts.avi"), [40, 82, 125, 167, 200])
+    serial = compute_cut_signal(probe.path, "histogram", probe=probe)
+    chunked = compute_cut_signal(probe.path, "histogram", probe=probe, workers=3, chunk_overlap=1.0)
+    np.testing.assert_allclose(chunked.times, serial.times)
+    np.testing.assert_allclose(chunked.scores, serial.scores, atol=1e-6)
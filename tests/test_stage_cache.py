@@ -0,0 +1,90 @@
+import os
+import sys
+import types
+
+from src.utils import stage_cache
+from src.utils.stage_cache import StageCache, fingerprint_file
+
+
+def test_fingerprint_follows_content_not_name(tmp_path):
+    a, b, c = tmp_path / "a.mp4", tmp_path / "b.mp4", tmp_path / "c.mp4"
+    a.write_bytes(b"x" * 5000)
+    b.write_bytes(b"x" * 5000)
+    c.write_bytes(b"x" * 4999 + b"y")
+    assert fingerprint_file(str(a)) == fingerprint_file(str(b))
+    assert fingerprint_file(str(a)) != fingerprint_file(str(c))
+
+
+def test_get_put_and_params_in_key(tmp_path):
+    cache = StageCache(str(tmp_path))
+    cache.put("detect_shots", "fp", {"engine": "ffmpeg"}, [1, 2, 3])
+    assert cache.get("detect_shots", "fp", {"engine": "ffmpeg"}) == [1, 2, 3]
+    assert cache.get("detect_shots", "fp", {"engine": "histogram"}) is None
+    assert cache.get("extract_ocr", "fp", {"engine": "ffmpeg"}) is None
+
+    calls = []
+    value = cache.get_or_compute("extract_ocr", "fp", {}, lambda: calls.append(1) or "ocr")
+    value = cache.get_or_compute("extract_ocr", "fp", {}, lambda: calls.append(1) or "ocr")
+    assert value == "ocr" and calls == [1]
+
+
+def test_lru_eviction(tmp_path):
+    cache = StageCache(str(tmp_path), max_bytes=3500)
+    for i in range(3):
+        cache.put("detect_shots", f"fp{i}", {}, b"z" * 1000)
+        # distinct, increasing access times
+        path = cache._path(cache._key("detect_shots", f"fp{i}", {}))
+        os.utime(path, (i, i))
+    cache.get("detect_shots", "fp0", {})  # fp0 becomes most recently used
+    cache.put("detect_shots", "fp3", {}, b"z" * 1000)
+
+    assert cache.get("detect_shots", "fp0", {}) is not None
+    assert cache.get("detect_shots", "fp1", {}) is None
+    assert cache.get("detect_shots", "fp3", {}) is not None
+
+
+def test_eviction_scans_only_when_estimate_crosses_budget(tmp_path, monkeypatch):
+    scans = []
+    evict = StageCache.evict
+    monkeypatch.setattr(StageCache, "evict", lambda self: scans.append(1) or evict(self))
+    monkeypatch.setattr(stage_cache, "EVICT_CHECK_PUTS", 50)
+
+    cache = StageCache(str(tmp_path), max_bytes=20_000)
+    for i in range(10):
+        cache.put("detect_shots", f"fp{i}", {}, b"z" * 1000)
+    assert len(scans) == 1  # first write of the process only
+    # a second instance on the same directory shares the estimate
+    other = StageCache(str(tmp_path), max_bytes=20_000)
+    for i in range(10, 20):
+        other.put("detect_shots", f"fp{i}", {}, b"z" * 1000)
+    assert len(scans) == 2  # estimate crossed 20 kB
+    assert sum(e.stat().st_size for d in os.scandir(tmp_path) if d.is_dir()
+               for e in os.scandir(d.path)) <= 20_000
+
+    # other processes' writes are picked up by the periodic scan
+    small = StageCache(str(tmp_path), max_bytes=10**9)
+    before = len(scans)
+    for i in range(50):
+        small.put("extract_ocr", f"fp{i}", {}, b"")
+    assert len(scans) == before + 1
+
+
+def test_stale_pickle_is_a_miss(tmp_path, monkeypatch):
+    module = types.ModuleType("stale_stage_module")
+    Moved = type("Moved", (), {"__module__": module.__name__})
+    module.Moved = Moved
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    cache = StageCache(str(tmp_path))
+    path = cache._path(cache._key("classify_shots", "fp", {}))
+
+    cache.put("classify_shots", "fp", {}, Moved())
+    del module.Moved                            # class renamed: AttributeError
+    assert cache.get("classify_shots", "fp", {}) is None
+    assert not os.path.exists(path)
+
+    module.Moved = Moved
+    cache.put("classify_shots", "fp", {}, Moved())
+    monkeypatch.delitem(sys.modules, module.__name__)   # module gone: ImportError
+    assert cache.get("classify_shots", "fp", {}) is None
+    assert not os.path.exists(path)
+    assert cache.misses == 2
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+from src.utils.perf import PerfRecorder
+from src.utils.stage_graph import StageGraph
+
+
+def test_independent_stages_overlap_and_results_flow_to_dependents():
+    recorder = PerfRecorder()
+    graph = StageGraph(recorder)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow(value):
+        barrier.wait()  # only passes if both stages run at the same time
+        return value
+
+    graph.add("probe", lambda: 10)
+    graph.add("audio", lambda p: slow(p + 1), deps=("probe",))
+    graph.add("shots", lambda p: slow(p + 2), deps=("probe",))
+    graph.add("json", lambda shots, audio: (shots, audio), deps=("shots", "audio"))
+
+    results = graph.run()
+    assert results["json"] == (12, 11)
+    assert {m.stage for m in recorder.stages} == {"probe", "audio", "shots", "json"}
+
+
+def test_single_worker_runs_in_insertion_order():
+    order = []
+    graph = StageGraph()
+    graph.add("a", lambda: order.append("a"))
+    graph.add("b", lambda _: order.append("b"), deps=("a",))
+    graph.add("c", lambda _: order.append("c"), deps=("a",))
+    graph.run(max_workers=1)
+    assert order == ["a", "b", "c"]
+
+
+def test_failure_stops_dependents_and_is_raised():
+    ran = []
+    graph = StageGraph()
+    graph.add("a", lambda: 1 / 0)
+    graph.add("b", lambda _: ran.append("b"), deps=("a",))
+    with pytest.raises(ZeroDivisionError):
+        graph.run()
+    assert ran == []
+
+
+def test_unknown_dependency_is_rejected():
+    graph = StageGraph()
+    with pytest.raises(ValueError):
+        graph.add("b", lambda _: None, deps=("a",))
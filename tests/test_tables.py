@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+import pytest
+from src.analysis.video_analyzer import build_analysis_json
+from src.models.data_models import AudioSegmentInfo, Shot
+from src.models.tables import AudioSegmentTable, ShotTable, SPEECH, MUSIC
+
+
+def _shots():
+    types = ["TALKING_HEAD", "BROLL", "SCREEN", None, "BROLL"]
+    return [Shot(index=i, t_start=i * 2.0, t_end=i * 2.0 + 1.5 + i, shot_type=t,
+                 faces_present=None if t is None else i % 2, overlay_texts=[{"text": "x"}] if i == 1 else None)
+            for i, t in enumerate(types)]
+
+
+def _segments(n=7):
+    return [AudioSegmentInfo(index=i, t_start=i * 0.5, t_end=i * 0.5 + 0.5,
+                             has_speech=i % 2 == 0, has_music=i % 3 == 0, has_sfx=False,
+                             loudness_db=-20.0 - i)
+            for i in range(n)]
+
+
+def test_table_and_list_inputs_give_identical_json():
+    meta = {"id": "v", "duration_seconds": 12.0}
+    from_lists = build_analysis_json(meta, _shots(), _segments(), {})
+    from_tables = build_analysis_json(meta, ShotTable.from_shots(_shots()),
+                                      AudioSegmentTable.from_segments(_segments()), {})
+    assert from_lists == from_tables
+
+    stats = from_lists["edit_stats"]
+    lengths = [s.t_end - s.t_start for s in _shots()]
+    assert stats["broll_ratio"] == pytest.approx((lengths[1] + lengths[4]) / sum(lengths))
+    assert stats["screen_record_ratio"] == pytest.approx(lengths[2] / sum(lengths))
+    assert from_lists["shots"][3]["shot_type"] is None
+    assert from_lists["shots"][3]["faces_present"] is None
+    assert from_lists["shots"][1]["overlay_text"] == [{"text": "x"}]
+    seg = from_lists["audio_pattern"]["segments"][3]
+    assert seg == {"index": 3, "t_start": 1.5, "t_end": 2.0, "has_speech": False,
+                   "has_music": True, "has_sfx": False, "loudness_db": -23.0}
+
+
+def test_row_views_write_through():
+    table = ShotTable.from_shots(_shots())
+    row = table[0]
+    row.shot_type, row.faces_present = "SCREEN", 3
+    assert table.type_code[0] == table.type_names.index("SCREEN")
+    assert table[0].to_shot() == Shot(0, 0.0, 1.5, "SCREEN", 3, None)
+    table[-1].shot_type = "ANIMATION"  # unknown types get a new code
+    assert table[4].shot_type == "ANIMATION"
+    assert [s.t_start for s in table] == [0.0, 2.0, 4.0, 6.0, 8.0]
+
+
+def test_audio_table_flags_and_concatenate():
+    a = AudioSegmentTable(np.array([0.0, 0.5]), np.array([0.5, 1.0]), np.array([-10.0, -80.0]),
+                          np.array([SPEECH, SPEECH | MUSIC]))
+    both = AudioSegmentTable.concatenate([a, a])
+    assert len(both) == 4
+    assert both.flag(MUSIC).tolist() == [False, True, False, True]
+    assert both[3].index == 3 and both[3].has_music and both[3].loudness_db == -80.0
+    assert len(AudioSegmentTable.empty()) == 0
+
+
+def test_build_is_fast_for_long_audio():
+    n = 21_600  # 3 h of 500 ms windows
+    table = AudioSegmentTable(np.arange(n) * 0.5, np.arange(n) * 0.5 + 0.5,
+                              np.full(n, -20.0), np.full(n, SPEECH))
+    start = time.perf_counter()
+    out = build_analysis_json({"duration_seconds": n * 0.5}, [], table, {})
+    assert len(out["audio_pattern"]["segments"]) == n
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+from src.processing.ocr_processor import estimate_text_position
+from src.processing.text_regions import find_text_regions
+
+
+def _background():
+    yy, xx = np.mgrid[0:720, 0:1280]
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+    frame[..., 0] = (xx / 1280 * 200).astype(np.uint8)
+    frame[..., 1] = (yy / 720 * 150).astype(np.uint8)
+    cv2.circle(frame, (600, 300), 150, (30, 200, 90), -1)
+    return frame
+
+
+def test_no_regions_without_text():
+    assert find_text_regions(_background()) == []
+
+
+def test_caption_region_in_full_frame_coordinates():
+    frame = _background()
+    cv2.putText(frame, "Link in the description", (300, 650),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.6, (255, 255, 255), 3)
+    boxes = find_text_regions(frame)
+    assert len(boxes) == 1
+    x, y, w, h = boxes[0]
+    assert x <= 300 and x + w >= 800 and y <= 620 and y + h >= 650
+    assert estimate_text_position(frame.shape, boxes[0]) == "BOTTOM"
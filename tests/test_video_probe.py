@@ -0,0 +1,74 @@
+import io
+import json
+import pytest
+from src.utils import video_probe
+from src.utils.video_probe import probe_video
+
+FFPROBE_OUT = {
+    "format": {"duration": "12.5"},
+    "streams": [
+        {"index": 0, "codec_type": "video", "codec_name": "h264", "width": 1920,
+         "height": 1080, "avg_frame_rate": "30000/1001", "nb_frames": "375"},
+        {"index": 1, "codec_type": "audio", "codec_name": "aac",
+         "sample_rate": "48000", "channels": 2},
+    ],
+}
+# -select_streams v:0 -show_entries packet=pts_time,flags -of csv, in decode order
+KEYFRAME_CSV = "0.000000,K__\n0.100100,___\n0.033367,___\n2.002000,K__\nN/A,K__\n"
+
+
+class FakePopen:
+    def __init__(self, cmd, stdout=None, text=None):
+        self.stdout = io.StringIO(KEYFRAME_CSV)
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def fake_ffprobe(monkeypatch, tmp_path):
+    calls = []
+
+    def check_output(cmd):
+        calls.append(cmd)
+        return json.dumps(FFPROBE_OUT).encode()
+
+    def popen(cmd, **kwargs):
+        calls.append(cmd)
+        return FakePopen(cmd, **kwargs)
+
+    monkeypatch.setattr(video_probe.subprocess, "check_output", check_output)
+    monkeypatch.setattr(video_probe.subprocess, "Popen", popen)
+    monkeypatch.setattr(video_probe, "_memo", {})
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(b"\0" * 16)
+    return str(path), calls
+
+
+def test_probe_parses_and_memoizes(fake_ffprobe):
+    path, calls = fake_ffprobe
+    probe = probe_video(path)
+    assert probe.duration == 12.5
+    assert probe.fps == pytest.approx(29.97, abs=0.01)
+    assert (probe.width, probe.height, probe.frame_count) == (1920, 1080, 375)
+    assert probe.has_audio and probe.audio_streams[0].sample_rate == 48000
+    assert probe_video(path) is probe
+    assert len(calls) == 1
+
+    # keyframes need one more call, then are memoized too
+    assert probe_video(path, with_keyframes=True).keyframes == [0.0, 2.002]
+    probe_video(path, with_keyframes=True)
+    assert len(calls) == 2
+    # only the video stream's packets are listed, as streamed CSV
+    assert calls[1][calls[1].index("-select_streams") + 1] == "v:0"
+    assert "csv=print_section=0" in calls[1]
+    assert probe.keyframes is None  # the memoized metadata-only probe is not mutated
+
+
+def test_probe_disk_cache(fake_ffprobe, tmp_path, monkeypatch):
+    path, calls = fake_ffprobe
+    cache_dir = str(tmp_path / "cache")
+    probe_video(path, cache_dir=cache_dir)
+    monkeypatch.setattr(video_probe, "_memo", {})
+    assert probe_video(path, cache_dir=cache_dir).duration == 12.5
+    assert len(calls) == 1
@@ -2,20 +2,65 @@
 
 import os
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
 # ⬇️ adjust the import based on where you put shot_detection.py
 # If using src package layout with name "editdna", it might be:
 #   from editdna.shot_detection import detect_shots
 # If you're running scripts from repo root, this may be enough:
-from src.shot_detection import detect_shots   # or just `from shot_detection import detect_shots`
+from src.shot_detection import (   # or just `from shot_detection import detect_shots`
+    REPLAYABLE_ENGINES, Shot, compute_cut_signal, detect_shots, resegment, split_engine_kwargs,
+)
 
-from src.classification import classify_shots        # whatever your actual modules are
-from src.ocr import extract_ocr
-from src.audio import extract_audio_segments
-from src.analysis import build_analysis_json
-from src.llm import call_llm_blueprint
-from src.utils import get_video_duration             # or wherever you defined it
+from src.utils.video_probe import probe_video
+from src.utils.stage_cache import StageCache, fingerprint_file
+from src.utils.perf import PerfHook, PerfRecorder
+from src.utils.result_io import write_result
+from src.utils.profiles import (
+    AnalysisProfile, StageCostTable, available_profiles, choose_profile, load_profiles,
+    unavailable_reason,
+)
+from src.utils.stage_graph import StageGraph
+from src.processing.frame_sampler import FrameSampler
+from src.processing.shot_classification import classify_shots
+from src.processing.ocr_processor import extract_ocr, extract_overlay_blocks
+from src.processing.audio_processor import extract_audio_segments
+from src.analysis.video_analyzer import build_analysis_json
+from src.analysis.llm_integration import call_llm_blueprint
+from config import ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS
+
+
+def detect_shots_cached(
+    video_path: str,
+    engine: str,
+    engine_kwargs: Dict[str, Any],
+    probe: Any,
+    cache: Optional[StageCache] = None,
+    cache_fp: Optional[str] = None,
+) -> List[Shot]:
+    """
+    detect_shots through the stage cache; same shots with or without one.
+
+    For engines whose shots are an exact replay of their per-frame signal
+    (REPLAYABLE_ENGINES) the signal is cached rather than the shots, so a
+    threshold change only re-segments. Other engines, and chunked runs
+    (workers > 1, which stitch seams differently), cache the shots.
+    """
+    if (cache is None or engine not in REPLAYABLE_ENGINES
+            or engine_kwargs.get("workers", 1) > 1):
+        params = {"engine": engine, **engine_kwargs}
+        compute = lambda: detect_shots(video_path, engine=engine, probe=probe, **engine_kwargs)
+        if cache is None:
+            return compute()
+        return cache.get_or_compute("detect_shots", cache_fp, params, compute)
+    signal_kwargs, segment_kwargs = split_engine_kwargs(engine, engine_kwargs)
+    signal = cache.get_or_compute(
+        "cut_signal",
+        cache_fp,
+        {"engine": engine, **signal_kwargs},
+        lambda: compute_cut_signal(video_path, engine, probe=probe, **signal_kwargs),
+    )
+    return resegment(signal, **segment_kwargs)
 
 
 def analyze_video(
@@ -24,6 +69,16 @@ def analyze_video(
     video_meta: Optional[Dict[str, Any]] = None,
     shot_engine: str = "pyscenedetect",
     shot_engine_kwargs: Optional[Dict[str, Any]] = None,
+    cache: Optional[StageCache] = None,
+    overlay_sample_fps: Optional[float] = 1.0,
+    classify_kwargs: Optional[Dict[str, Any]] = None,
+    perf: bool = False,
+    perf_hooks: Optional[List[PerfHook]] = None,
+    concurrent_stages: bool = True,
+    audio_hop_ms: Optional[int] = None,
+    profile: Optional[str] = None,
+    budget: Optional[float] = None,
+    cost_table: Optional[StageCostTable] = None,
 ) -> Dict[str, Any]:
     """
     High-level convenience function:
@@ -31,15 +86,70 @@ def analyze_video(
     - build analysis_json
     - call LLM to get editing blueprint
 
-    shot_engine: "pyscenedetect" | "ffmpeg" | "transnetv2"
+    shot_engine: "pyscenedetect" | "ffmpeg" | "transnetv2" | "histogram" | "cascade"
     shot_engine_kwargs: engine-specific tuning params
+    cache: optional StageCache; stage outputs are reused when the video
+        content, stage params and stage code version are unchanged
+    overlay_sample_fps: OCR sampling rate for overlay text spans; None skips
+    classify_kwargs: face detection options for classify_shots
+        (detector, analysis_width, min_face_size, batch_size, ...)
+    perf: add a "perf" block (per-stage wall/CPU time, frames decoded,
+        seeks, subprocesses, bytes read, peak RSS) to analysis_json
+    perf_hooks: callables receiving each stage's StageMetrics as it
+        finishes (see src.utils.perf); also enables instrumentation
+    concurrent_stages: run independent stages (audio vs. shot detection and
+        frame stages) at the same time; False runs them one by one
+    audio_hop_ms: hop between audio windows (default: the window length)
+    profile: name of a config.ANALYSIS_PROFILES entry setting the shot
+        engine, face detector, analysis width, overlay OCR rate and audio
+        hop; it replaces shot_engine, overlay_sample_fps and audio_hop_ms,
+        while shot_engine_kwargs / classify_kwargs are merged over its own
+    budget: target wall time as a fraction of the video duration (0.1 =
+        0.1x realtime); picks the most thorough profile expected to fit
+        from the probed duration/resolution and measured stage costs,
+        among the profiles whose models load on this install.
+        Mutually exclusive with profile
+    cost_table: StageCostTable with per-stage rates for budget mode; runs
+        with a profile and without a cache add their timings to it
+        (default: $EDITDNA_STAGE_COSTS or in-memory nominal rates)
     """
+    if profile is not None and budget is not None:
+        raise ValueError("Pass either profile or budget, not both")
+    if budget is not None and cost_table is None:
+        cost_table = StageCostTable()
+    # a cache hit would make a stage look free, so only uncached runs are measured
+    measure = cost_table is not None and (profile is not None or budget is not None) and cache is None
+    recorder = PerfRecorder(perf_hooks, enabled=perf or bool(perf_hooks) or measure)
+
+    # single ffprobe for the whole run; every stage reuses it
+    with recorder.stage("probe_video"):
+        probe = probe_video(video_path)
+
+    chosen: Optional[AnalysisProfile] = None
+    estimate_s: Optional[float] = None
+    if budget is not None:
+        chosen, estimate_s = choose_profile(
+            available_profiles(load_profiles(ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS)), probe, budget,
+            cost_table, concurrent=concurrent_stages,
+        )
+    elif profile is not None:
+        chosen = AnalysisProfile.from_config(profile, ANALYSIS_PROFILES, SHOT_ENGINE_CONFIGS)
+        reason = unavailable_reason(chosen)
+        if reason is not None:
+            raise RuntimeError(f"Analysis profile {profile} cannot run here: {reason}")
+    if chosen is not None:
+        settings = chosen.analyze_kwargs()
+        shot_engine = settings["shot_engine"]
+        shot_engine_kwargs = dict(settings["shot_engine_kwargs"], **(shot_engine_kwargs or {}))
+        classify_kwargs = dict(settings["classify_kwargs"], **(classify_kwargs or {}))
+        overlay_sample_fps = settings["overlay_sample_fps"]
+        audio_hop_ms = settings["audio_hop_ms"]
+
     if video_meta is None:
-        duration = get_video_duration(video_path)
         video_meta = {
             "id": os.path.basename(video_path),
             "title": os.path.basename(video_path),
-            "duration_seconds": duration,
+            "duration_seconds": probe.duration,
             "url": None,
             "metrics": {},
         }
@@ -48,26 +158,103 @@ def analyze_video(
         transcript_outline = {}
 
     shot_engine_kwargs = shot_engine_kwargs or {}
+    classify_kwargs = classify_kwargs or {}
 
-    # ⬇️ HERE is the important change
-    shots = detect_shots(
-        video_path,
-        engine=shot_engine,
-        **shot_engine_kwargs,
-    )
+    def fingerprint():
+        return fingerprint_file(video_path) if cache is not None else None
 
-    shots = classify_shots(video_path, shots)
-    shots = extract_ocr(video_path, shots)
-    audio_segments = extract_audio_segments(video_path)
+    def cached(cache_fp, stage, params, compute):
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(stage, cache_fp, params, compute)
 
-    analysis_json = build_analysis_json(
-        video_meta=video_meta,
-        shots=shots,
-        audio_segments=audio_segments,
-        transcript_outline=transcript_outline,
-    )
+    def shot_stage(cache_fp):
+        return detect_shots_cached(video_path, shot_engine, shot_engine_kwargs, probe, cache, cache_fp)
+
+    def audio_stage(cache_fp):
+        return cached(
+            cache_fp,
+            "extract_audio_segments",
+            {} if audio_hop_ms is None else {"hop_ms": audio_hop_ms},
+            lambda: extract_audio_segments(video_path, probe=probe, hop_ms=audio_hop_ms),
+        )
+
+    def frame_stage(cache_fp, shots):
+        # classification + OCR only depend on the shot boundaries
+        shot_params = {"shots": [(s.t_start, s.t_end) for s in shots]}
+        classify_params = dict(shot_params, **classify_kwargs)
+        classes = cache.get("classify_shots", cache_fp, classify_params) if cache else None
+        texts = cache.get("extract_ocr", cache_fp, shot_params) if cache else None
+        overlay_params = dict(shot_params, sample_fps=overlay_sample_fps)
+        overlay_blocks = None
+        if overlay_sample_fps and cache is not None:
+            overlay_blocks = cache.get("extract_overlay_blocks", cache_fp, overlay_params)
+        overlay_miss = bool(overlay_sample_fps) and overlay_blocks is None
 
-    blueprint = call_llm_blueprint(analysis_json)
+        # classification + OCR share one forward decode pass (no per-shot
+        # seeks); the calls below only register frame requests and the
+        # work (decode, face detection, OCR) happens in sampler.run()
+        sampler = FrameSampler(video_path, probe=probe)
+        if classes is None:
+            shots = classify_shots(video_path, shots, sampler=sampler, **classify_kwargs)
+        if texts is None:
+            shots = extract_ocr(video_path, shots, sampler=sampler)
+        if overlay_miss:
+            overlay_blocks = extract_overlay_blocks(
+                video_path, shots, sample_fps=overlay_sample_fps, sampler=sampler
+            )
+        sampler.run()
+
+        if classes is None:
+            classes = [(s.shot_type, s.faces_present) for s in shots]
+            if cache is not None:
+                cache.put("classify_shots", cache_fp, classify_params, classes)
+        if texts is None:
+            texts = [s.overlay_texts for s in shots]
+            if cache is not None:
+                cache.put("extract_ocr", cache_fp, shot_params, texts)
+        if overlay_miss and cache is not None:
+            cache.put("extract_overlay_blocks", cache_fp, overlay_params, overlay_blocks)
+        for shot, (shot_type, faces), overlay_texts in zip(shots, classes, texts):
+            shot.shot_type, shot.faces_present = shot_type, faces
+            shot.overlay_texts = overlay_texts
+        return shots, overlay_blocks
+
+    def analysis_stage(frame_result, audio_segments):
+        shots, overlay_blocks = frame_result
+        return build_analysis_json(
+            video_meta=video_meta,
+            shots=shots,
+            audio_segments=audio_segments,
+            transcript_outline=transcript_outline,
+            overlay_blocks=overlay_blocks,
+        )
+
+    # audio only needs the file, so it runs while shots are detected and
+    # while the frame stages run on the detected shots
+    graph = StageGraph(recorder)
+    graph.add("fingerprint", fingerprint)
+    graph.add("detect_shots", shot_stage, deps=("fingerprint",))
+    graph.add("extract_audio_segments", audio_stage, deps=("fingerprint",))
+    graph.add("classify_shots+extract_ocr", frame_stage, deps=("fingerprint", "detect_shots"))
+    graph.add("build_analysis_json", analysis_stage,
+              deps=("classify_shots+extract_ocr", "extract_audio_segments"))
+    graph.add("call_llm_blueprint", lambda analysis: call_llm_blueprint(analysis, cache=cache),
+              deps=("build_analysis_json",))
+    results = graph.run(max_workers=None if concurrent_stages else 1)
+
+    analysis_json = results["build_analysis_json"]
+    blueprint = results["call_llm_blueprint"]
+
+    if measure:
+        cost_table.record(chosen.name, probe, recorder.stages)
+
+    # added after the LLM call so timings never end up in the prompt
+    if perf:
+        analysis_json["perf"] = recorder.as_dict()
+    if chosen is not None:
+        analysis_json["profile"] = {"name": chosen.name, "budget": budget,
+                                    "estimated_s": estimate_s}
 
     return {
         "analysis_json": analysis_json,
@@ -75,6 +262,52 @@ def analyze_video(
     }
 
 
+def analyze_shots_iter(
+    video_path: str,
+    shots: Iterable[Shot],
+    probe: Optional[Any] = None,
+    classify_kwargs: Optional[Dict[str, Any]] = None,
+    ocr: bool = True,
+    group_size: int = 4,
+    follow_timeout: Optional[float] = None,
+) -> Iterator[Shot]:
+    """
+    Classify and OCR shots as they arrive, e.g. from detect_shots_iter on a
+    recording that is still being written.
+
+    Every `group_size` shots the key frames are decoded (forward only, the
+    sampler keeps its position between groups) and the finished shots are
+    yielded. Needs a readable file: for stdin input, tee the stream to disk
+    and pass that path with follow_timeout set.
+
+    Example:
+        shots = detect_shots_iter("live.mkv", follow=True)
+        for shot in analyze_shots_iter("live.mkv", shots, follow_timeout=10.0):
+            print(shot.index, shot.shot_type, shot.overlay_texts)
+    """
+    classify_kwargs = classify_kwargs or {}
+    sampler = FrameSampler(video_path, probe=probe, follow_timeout=follow_timeout)
+    group: List[Shot] = []
+
+    def process(group: List[Shot]) -> List[Shot]:
+        classify_shots(video_path, group, sampler=sampler, **classify_kwargs)
+        if ocr:
+            extract_ocr(video_path, group, sampler=sampler)
+        sampler.run(close=False)
+        return group
+
+    try:
+        for shot in shots:
+            group.append(shot)
+            if len(group) >= group_size:
+                yield from process(group)
+                group = []
+        if group:
+            yield from process(group)
+    finally:
+        sampler.close()
+
+
 if __name__ == "__main__":
     test_video = "example.mp4"
     if os.path.exists(test_video):
@@ -83,7 +316,9 @@ if __name__ == "__main__":
             shot_engine="pyscenedetect",
             shot_engine_kwargs={"threshold": 27.0, "min_scene_len": 15},
         )
-        print(json.dumps(result["analysis_json"], indent=2))
-        print(json.dumps(result["editing_blueprint"], indent=2))
+        out_path = os.path.splitext(test_video)[0] + ".analysis.ndjson"
+        write_result(result, out_path)
+        print(f"[INFO] Wrote {out_path}")
+        print(json.dumps(result["analysis_json"]["edit_stats"]))
     else:
         print(f"[INFO] Put a video file named {test_video} next to this script to test.")